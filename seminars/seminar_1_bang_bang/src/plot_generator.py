@@ -15,6 +15,8 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import pickle
 
+from trajectory_store import TrajectoryStore
+
 # Set Seaborn style and context
 sns.set_theme(style="whitegrid")
 sns.set_context("notebook", font_scale=1.2)
@@ -31,12 +33,15 @@ def calculate_control_params(p0, v0, a_m):
     - The final time tf10 (when target is reached)
     - The control values a111 and a222 for the two control phases
     
+    Works element-wise on arrays, so millions of initial conditions
+    are handled in one call without Python loops.
+    
     Parameters:
     -----------
-    p0 : float
-        Initial position
-    v0 : float
-        Initial velocity
+    p0 : float or ndarray
+        Initial position(s)
+    v0 : float or ndarray
+        Initial velocity(ies), broadcastable with p0
     a_m : float
         Maximum allowed acceleration magnitude
         
@@ -44,6 +49,7 @@ def calculate_control_params(p0, v0, a_m):
     --------
     tuple
         (k10, g10, ts10, tf10, a111, a222)
+        Scalars for scalar inputs, otherwise arrays of the broadcast shape.
         
         k10 : int
             Region parameter determining control direction
@@ -58,28 +64,24 @@ def calculate_control_params(p0, v0, a_m):
         a222 : float
             Second phase control value
     """
+    scalar_input = np.ndim(p0) == 0 and np.ndim(v0) == 0
+    p0 = np.asarray(p0, dtype=float)
+    v0 = np.asarray(v0, dtype=float)
+
     # Calculate k10 as per the bang-bang principle
-    if v0**2 * np.sign(v0) >= -2 * a_m * p0:
-        k10 = 1
-    else:
-        k10 = -1
+    k10 = np.where(v0**2 * np.sign(v0) >= -2 * a_m * p0, 1, -1)
 
     # Calculate g10 - determines the sign based on position
-    if p0 == 0:
-        if v0 < 0:  # This condition is from the formula, always false in practice
-            g10 = -1
-        else:
-            g10 = 1
-    else:
-        g10 = 1
+    # (p0 == 0 and v0 < 0 is from the formula, it does not change ts10 in practice)
+    g10 = np.where((p0 == 0) & (v0 < 0), -1, 1)
 
     # Normalized time parameter
     t0 = v0/a_m
 
     # Calculate switching time ts10 
     # (when control switches from maximum to minimum or vice versa)
-    sqrt_arg = g10 * k10 * p0 / a_m + 0.5 * t0**2
-    ts10 = np.sqrt(abs(sqrt_arg)) + k10 * t0  # Using abs to ensure we get a real number
+    sqrt_arg = g10 * k10 * p0 / a_m + 0.5 * t0 * t0
+    ts10 = np.sqrt(np.abs(sqrt_arg)) + k10 * t0  # Using abs to ensure we get a real number
 
     # Calculate final time tf10 (when system reaches origin)
     tf10 = 2 * ts10 - k10 * t0
@@ -88,6 +90,8 @@ def calculate_control_params(p0, v0, a_m):
     a111 = -k10 * a_m  # First phase control
     a222 = -a111       # Second phase control (opposite of first)
 
+    if scalar_input:
+        return int(k10), int(g10), ts10[()], tf10[()], a111[()], a222[()]
     return k10, g10, ts10, tf10, a111, a222
 
 def control_function(t, p0, v0, a_m):
@@ -203,6 +207,208 @@ def simulate(p0, v0, a_m, dt=0.01):
 
     return t_array, p_array, v_array, a_array, ts10, tf10
 
+def evaluate_trajectories(p0, v0, a_m, t):
+    """
+    Evaluate the exact bang-bang trajectories on a time grid.
+    
+    Under bang-bang control the double integrator moves with constant
+    acceleration on each phase, so position and velocity are piecewise
+    quadratic/linear in time:
+    - 0 <= t < ts10:    a = a111
+    - ts10 <= t < tf10: a = a222
+    - t >= tf10:        a = 0 (target reached)
+    The control parameters are computed once per initial condition, and the
+    whole grid is evaluated in one shot without discretization error.
+    
+    Parameters:
+    -----------
+    p0 : float or ndarray
+        Initial position(s), shape () or (n,)
+    v0 : float or ndarray
+        Initial velocity(ies), same shape as p0
+    a_m : float
+        Maximum allowed acceleration magnitude
+    t : ndarray
+        Time grid, shape (m,) (shared by all initial conditions) or (n, m)
+        
+    Returns:
+    --------
+    tuple
+        (p, v, a, ts10, tf10)
+        
+        p, v, a : ndarray
+            Position, velocity and acceleration, shape (m,) for scalar
+            initial conditions or (n, m)
+        ts10, tf10 : float or ndarray
+            Switching and final times, shape () or (n,)
+    """
+    p0 = np.asarray(p0, dtype=float)
+    v0 = np.asarray(v0, dtype=float)
+    t = np.asarray(t, dtype=float)
+
+    # Control parameters once per initial condition (not per time step)
+    k10, g10, ts10, tf10, a111, a222 = calculate_control_params(p0, v0, a_m)
+    ts10, tf10 = np.asarray(ts10, dtype=float), np.asarray(tf10, dtype=float)
+    a111, a222 = np.asarray(a111, dtype=float), np.asarray(a222, dtype=float)
+
+    # Add a time axis to the per-trajectory quantities
+    p0_, v0_ = p0[..., None], v0[..., None]
+    ts, tf = ts10[..., None], tf10[..., None]
+    a1, a2 = a111[..., None], a222[..., None]
+
+    # State at the switching time and at the final time
+    p_s = p0_ + v0_ * ts + 0.5 * a1 * ts**2
+    v_s = v0_ + a1 * ts
+    p_f = p_s + v_s * (tf - ts) + 0.5 * a2 * (tf - ts)**2
+    v_f = v_s + a2 * (tf - ts)
+
+    # Elapsed time within each phase (clipped to the phase duration)
+    tau1 = np.clip(t, 0, ts)
+    tau2 = np.clip(t - ts, 0, tf - ts)
+    tau3 = np.maximum(t - tf, 0)
+
+    p = np.where(t < ts, p0_ + v0_ * tau1 + 0.5 * a1 * tau1**2,
+                 np.where(t < tf, p_s + v_s * tau2 + 0.5 * a2 * tau2**2,
+                          p_f + v_f * tau3))
+    v = np.where(t < ts, v0_ + a1 * tau1,
+                 np.where(t < tf, v_s + a2 * tau2, v_f))
+    a = np.where((t >= 0) & (t < ts), a1, np.where((t >= ts) & (t < tf), a2, 0.0))
+
+    # No control for the (0, 0) initial condition (see control_function)
+    at_origin = (p0_ == 0.0) & (v0_ == 0.0)
+    a = np.where(at_origin, 0.0, a)
+
+    return p, v, a, ts10, tf10
+
+def minimum_time_field(p_grid, v_grid, a_m):
+    """
+    Evaluate the minimum time to reach the origin on a grid of initial states.
+    
+    Parameters:
+    -----------
+    p_grid : ndarray
+        Initial positions (e.g. from np.meshgrid)
+    v_grid : ndarray
+        Initial velocities, broadcastable with p_grid
+    a_m : float
+        Maximum allowed acceleration magnitude
+        
+    Returns:
+    --------
+    tuple
+        (tf, ts, k)
+        
+        tf : ndarray
+            Minimum time to reach the origin (final time tf10)
+        ts : ndarray
+            Switching time ts10
+        k : ndarray
+            Region parameter k10 (sign of the first control phase is -k)
+    """
+    k10, _, ts10, tf10, _, _ = calculate_control_params(np.asarray(p_grid), np.asarray(v_grid), a_m)
+    return tf10, ts10, k10
+
+def switching_curve(v, a_m):
+    """
+    Position of the switching curve p = -v|v| / (2 a_m) for given velocities.
+    
+    Parameters:
+    -----------
+    v : ndarray
+        Velocities
+    a_m : float
+        Maximum allowed acceleration magnitude
+        
+    Returns:
+    --------
+    ndarray
+        Positions on the switching curve
+    """
+    v = np.asarray(v, dtype=float)
+    return -v * np.abs(v) / (2 * a_m)
+
+def plot_minimum_time_map(a_m=1.0, p_range=(-3.0, 3.0), v_range=(-3.0, 3.0), resolution=1000,
+                          save_path="images/minimum_time_map.png"):
+    """
+    Plot the time-optimal contour map with the switching curve.
+    
+    The minimum time to the origin is evaluated on a resolution x resolution
+    grid in one vectorized call and shown as a heatmap with contour lines.
+    
+    Parameters:
+    -----------
+    a_m : float, optional
+        Maximum allowed acceleration magnitude (default: 1.0)
+    p_range : tuple, optional
+        (min, max) of the initial position axis
+    v_range : tuple, optional
+        (min, max) of the initial velocity axis
+    resolution : int, optional
+        Number of grid points per axis (default: 1000)
+    save_path : str or None, optional
+        Path where the map is saved; if None the figure is returned unsaved
+        
+    Returns:
+    --------
+    matplotlib.figure.Figure
+        The figure with the map
+    """
+    p = np.linspace(p_range[0], p_range[1], resolution)
+    v = np.linspace(v_range[0], v_range[1], resolution)
+    P, V = np.meshgrid(p, v)
+    tf, _, _ = minimum_time_field(P, V, a_m)
+
+    fig, ax = plt.subplots(figsize=(12, 10))
+    mesh = ax.pcolormesh(P, V, tf, cmap="viridis", shading="auto")
+    contours = ax.contour(P, V, tf, levels=10, colors="white", linewidths=0.8, alpha=0.8)
+    ax.clabel(contours, fmt="%.1f", fontsize=9)
+    fig.colorbar(mesh, ax=ax, label="Minimum time to origin")
+
+    # Switching curve
+    ax.plot(switching_curve(v, a_m), v, color="red", linewidth=2, label="Switching curve")
+    ax.scatter(0, 0, color="red", s=200, marker="*", label="Target",
+               edgecolor="white", linewidth=1.5, zorder=11)
+
+    ax.set_xlim(p_range)
+    ax.set_ylim(v_range)
+    ax.set_xlabel("Position", fontweight="bold")
+    ax.set_ylabel("Velocity", fontweight="bold")
+    ax.set_title("Minimum Time to Origin under Bang-Bang Control", fontsize=16, fontweight="bold")
+    ax.legend(loc="upper right")
+
+    if save_path is not None:
+        fig.savefig(save_path, dpi=300, bbox_inches="tight")
+    return fig
+
+def simulate_analytic(p0, v0, a_m, dt=0.01):
+    """
+    Exact counterpart of simulate() using the closed-form trajectory.
+    
+    Uses the same time grid as simulate() and returns the same tuple,
+    so it can be used as a drop-in replacement.
+    
+    Parameters:
+    -----------
+    p0 : float
+        Initial position
+    v0 : float
+        Initial velocity
+    a_m : float
+        Maximum allowed acceleration magnitude
+    dt : float
+        Time step of the output grid (default: 0.01)
+        
+    Returns:
+    --------
+    tuple
+        (t_array, p_array, v_array, a_array, ts10, tf10)
+    """
+    _, _, _, tf10, _, _ = calculate_control_params(p0, v0, a_m)
+    t_max = max(tf10 * 1.2, 0.1)  # Same horizon as simulate()
+    t_array = np.arange(0, t_max + dt, dt)
+    p_array, v_array, a_array, ts10, tf10 = evaluate_trajectories(p0, v0, a_m, t_array)
+    return t_array, p_array, v_array, a_array, float(ts10), float(tf10)
+
 def plot_phase_portrait(simulation_results, save_path="images/phase_portrait.png"):
     """
     Create a phase portrait showing multiple trajectories in position-velocity space.
@@ -278,7 +484,7 @@ def plot_phase_portrait(simulation_results, save_path="images/phase_portrait.png
     plt.savefig(save_path, dpi=300, bbox_inches='tight')
     plt.close()
 
-def run_multiple_simulations(a_m=1.0, dt=0.01):
+def run_multiple_simulations(a_m=1.0, dt=0.01, method="analytic", initial_conditions=None):
     """
     Run multiple simulations with different initial conditions.
     
@@ -291,6 +497,11 @@ def run_multiple_simulations(a_m=1.0, dt=0.01):
         Maximum allowed acceleration magnitude (default: 1.0)
     dt : float, optional
         Time step for simulation (default: 0.01)
+    method : str, optional
+        "analytic" for the exact closed-form trajectories (simulate_analytic)
+        or "euler" for Euler integration (simulate) (default: "analytic")
+    initial_conditions : list of tuple, optional
+        (p0, v0) pairs to simulate (default: a fixed set of ten points)
         
     Returns:
     --------
@@ -299,48 +510,86 @@ def run_multiple_simulations(a_m=1.0, dt=0.01):
         each element is a tuple (t_array, p_array, v_array, a_array, ts10, tf10, p0, v0)
     """
     # Define a range of initial conditions
-    initial_conditions = [
-        (1.0, 0.0),    # Right of origin, zero velocity
-        (-1.0, 0.0),   # Left of origin, zero velocity
-        (0.0, 1.0),    # At origin, upward velocity
-        (0.0, -1.0),   # At origin, downward velocity
-        (1.0, 1.0),    # First quadrant
-        (-1.0, 1.0),   # Second quadrant
-        (-1.0, -1.0),  # Third quadrant
-        (1.0, -1.0),   # Fourth quadrant
-        (2.0, 0.5),    # Custom point
-        (-1.5, -0.8)   # Custom point
-    ]
+    if initial_conditions is None:
+        initial_conditions = [
+            (1.0, 0.0),    # Right of origin, zero velocity
+            (-1.0, 0.0),   # Left of origin, zero velocity
+            (0.0, 1.0),    # At origin, upward velocity
+            (0.0, -1.0),   # At origin, downward velocity
+            (1.0, 1.0),    # First quadrant
+            (-1.0, 1.0),   # Second quadrant
+            (-1.0, -1.0),  # Third quadrant
+            (1.0, -1.0),   # Fourth quadrant
+            (2.0, 0.5),    # Custom point
+            (-1.5, -0.8)   # Custom point
+        ]
     
+    if method == "analytic":
+        simulate_fn = simulate_analytic
+    elif method == "euler":
+        simulate_fn = simulate
+    else:
+        raise ValueError(f"Unknown method '{method}', expected 'analytic' or 'euler'")
+
     # Run simulations for each initial condition
     simulation_results = []
     for p0, v0 in initial_conditions:
         # Run simulation
-        t_array, p_array, v_array, a_array, ts10, tf10 = simulate(p0, v0, a_m, dt)
+        t_array, p_array, v_array, a_array, ts10, tf10 = simulate_fn(p0, v0, a_m, dt)
         
         # Store results
         simulation_results.append((t_array, p_array, v_array, a_array, ts10, tf10, p0, v0))
     
     return simulation_results
 
-def save_trajectories(simulation_results, filename="examples/random_trajectories.pkl"):
+def save_trajectories(simulation_results, filename="examples/random_trajectories", append=False):
     """
-    Save simulation results to a pickle file for later use.
+    Save simulation results to a memory-mapped trajectory store for later use.
+    
+    See trajectory_store.py for the format: one contiguous file per field,
+    an offsets index and a JSON header.
     
     Parameters:
     -----------
     simulation_results : list
         List of simulation results
     filename : str, optional
-        Path to save the pickle file (default: "examples/random_trajectories.pkl")
+        Directory of the store (default: "examples/random_trajectories")
+    append : bool, optional
+        Append to an existing store instead of overwriting it (default: False)
         
     Returns:
     --------
-    None
+    TrajectoryStore
+        The store containing the saved trajectories
+    """
+    store = TrajectoryStore(filename, mode='a' if append else 'w')
+    store.extend(simulation_results)
+    print(f"Saved {len(simulation_results)} trajectories to {filename}")
+    return store
+
+def load_trajectories(filename="examples/random_trajectories"):
+    """
+    Load simulation results saved by save_trajectories.
+    
+    Trajectories are not read into memory: the returned store gives zero-copy
+    views of single trajectories on access. Legacy pickle files (*.pkl)
+    are still supported and are loaded completely.
+    
+    Parameters:
+    -----------
+    filename : str, optional
+        Directory of the store, or path of a legacy .pkl file
+        
+    Returns:
+    --------
+    TrajectoryStore or list
+        Sequence of tuples (t_array, p_array, v_array, a_array, ts10, tf10, p0, v0)
     """
-    with open(filename, 'wb') as f:
-        pickle.dump(simulation_results, f)
-    print(f"Saved trajectories to {filename}")
+    if filename.endswith(".pkl"):
+        with open(filename, 'rb') as f:
+            return pickle.load(f)
+    return TrajectoryStore(filename, mode='r')
 
 def main():
     """
@@ -0,0 +1,235 @@
+"""
+Trajectory Store
+
+This module provides an append-only on-disk format for bang-bang simulation
+results, replacing pickled lists of tuples.
+
+A store is a directory containing:
+- one raw little-endian float64 file per time series field (t, p, v, a),
+  holding all trajectories back to back,
+- one raw float64 file per scalar field (ts10, tf10, p0, v0), one value per trajectory,
+- offsets.i8: int64 start offsets of the trajectories (length n + 1),
+- meta.json: header with the format version, field names and counts.
+
+Readers memory-map the files, so opening a store or a single trajectory does not
+read the whole file, and the returned arrays are zero-copy views.
+"""
+
+import os
+import json
+import numpy as np
+
+FORMAT_NAME = "bang_bang_trajectory_store"
+FORMAT_VERSION = 1
+
+SERIES_FIELDS = ('t', 'p', 'v', 'a')
+SCALAR_FIELDS = ('ts10', 'tf10', 'p0', 'v0')
+
+_DTYPE = np.dtype('<f8')
+_OFFSET_DTYPE = np.dtype('<i8')
+
+class TrajectoryStore:
+    """
+    Memory-mapped store of bang-bang trajectories.
+
+    Each trajectory is exposed as the same tuple that simulate() results use:
+    (t_array, p_array, v_array, a_array, ts10, tf10, p0, v0).
+    """
+
+    def __init__(self, path, mode='r'):
+        """
+        Open or create a trajectory store.
+
+        Parameters:
+        -----------
+        path : str
+            Directory of the store
+        mode : str
+            'r' to read an existing store, 'a' to append (creating the store
+            if needed), 'w' to create an empty store (overwriting existing data)
+        """
+        if mode not in ('r', 'a', 'w'):
+            raise ValueError("mode must be 'r', 'a' or 'w'")
+        self.path = path
+        self.mode = mode
+        self._cache = {}
+
+        meta_path = os.path.join(path, "meta.json")
+        if mode == 'w' or (mode == 'a' and not os.path.exists(meta_path)):
+            os.makedirs(path, exist_ok=True)
+            for name in SERIES_FIELDS + SCALAR_FIELDS:
+                open(self._field_path(name), 'wb').close()
+            with open(self._offsets_path(), 'wb') as f:
+                f.write(np.zeros(1, dtype=_OFFSET_DTYPE).tobytes())
+            self._meta = {
+                "format": FORMAT_NAME,
+                "version": FORMAT_VERSION,
+                "dtype": _DTYPE.str,
+                "series_fields": list(SERIES_FIELDS),
+                "scalar_fields": list(SCALAR_FIELDS),
+                "num_trajectories": 0,
+                "num_samples": 0,
+            }
+            self._write_meta()
+        else:
+            with open(meta_path) as f:
+                self._meta = json.load(f)
+            if self._meta.get("format") != FORMAT_NAME:
+                raise ValueError(f"{path} is not a trajectory store")
+            if self._meta.get("version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported trajectory store version {self._meta.get('version')}")
+
+    def _field_path(self, name):
+        return os.path.join(self.path, f"{name}.f8")
+
+    def _offsets_path(self):
+        return os.path.join(self.path, "offsets.i8")
+
+    def _write_meta(self):
+        # Write to a temporary file first so readers never see a partial header
+        tmp_path = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self._meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, "meta.json"))
+
+    def _memmap(self, name, path, dtype, length):
+        """Return a cached read-only memory map of the first length items of a file."""
+        key = (name, length)
+        if key not in self._cache:
+            if length == 0:
+                self._cache[key] = np.zeros(0, dtype=dtype)
+            else:
+                self._cache[key] = np.memmap(path, dtype=dtype, mode='r', shape=(length,))
+        return self._cache[key]
+
+    def __len__(self):
+        return self._meta["num_trajectories"]
+
+    @property
+    def offsets(self):
+        """Start offsets of the trajectories in the series files (length n + 1)."""
+        return self._memmap("offsets", self._offsets_path(), _OFFSET_DTYPE, len(self) + 1)
+
+    def field(self, name):
+        """
+        Return a whole field as a zero-copy memory-mapped array.
+
+        Parameters:
+        -----------
+        name : str
+            One of SERIES_FIELDS (all samples back to back, split with offsets)
+            or SCALAR_FIELDS (one value per trajectory)
+
+        Returns:
+        --------
+        numpy.memmap
+            Read-only view of the field
+        """
+        if name in SERIES_FIELDS:
+            return self._memmap(name, self._field_path(name), _DTYPE, self._meta["num_samples"])
+        if name in SCALAR_FIELDS:
+            return self._memmap(name, self._field_path(name), _DTYPE, len(self))
+        raise KeyError(f"Unknown field '{name}'")
+
+    def get(self, index):
+        """
+        Return one trajectory without reading the others.
+
+        Parameters:
+        -----------
+        index : int
+            Trajectory index (negative indices count from the end)
+
+        Returns:
+        --------
+        tuple
+            (t_array, p_array, v_array, a_array, ts10, tf10, p0, v0) where the
+            arrays are zero-copy views into the store
+        """
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError(f"Trajectory index {index} out of range for store of size {n}")
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        series = tuple(self.field(name)[start:stop] for name in SERIES_FIELDS)
+        scalars = tuple(float(self.field(name)[index]) for name in SCALAR_FIELDS)
+        return series + scalars
+
+    def __getitem__(self, index):
+        return self.get(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.get(index)
+
+    def append(self, t_array, p_array, v_array, a_array, ts10, tf10, p0, v0):
+        """
+        Append one trajectory to the end of the store.
+
+        Parameters:
+        -----------
+        t_array, p_array, v_array, a_array : ndarray
+            Time series of equal length
+        ts10, tf10, p0, v0 : float
+            Switching time, final time and initial state
+        """
+        self.extend([(t_array, p_array, v_array, a_array, ts10, tf10, p0, v0)])
+
+    def extend(self, simulation_results):
+        """
+        Append several trajectories in one write per file.
+
+        Parameters:
+        -----------
+        simulation_results : list
+            List of tuples (t_array, p_array, v_array, a_array, ts10, tf10, p0, v0)
+        """
+        if self.mode == 'r':
+            raise IOError("Trajectory store is opened read-only")
+        simulation_results = list(simulation_results)
+        if not simulation_results:
+            return
+
+        lengths = []
+        for result in simulation_results:
+            length = len(result[0])
+            if any(len(series) != length for series in result[1:4]):
+                raise ValueError("Time series of a trajectory must have equal length")
+            lengths.append(length)
+
+        for i, name in enumerate(SERIES_FIELDS):
+            data = np.concatenate([np.asarray(result[i], dtype=_DTYPE) for result in simulation_results])
+            with open(self._field_path(name), 'ab') as f:
+                f.write(data.tobytes())
+        for i, name in enumerate(SCALAR_FIELDS):
+            data = np.array([result[4 + i] for result in simulation_results], dtype=_DTYPE)
+            with open(self._field_path(name), 'ab') as f:
+                f.write(data.tobytes())
+
+        new_offsets = self._meta["num_samples"] + np.cumsum(lengths, dtype=_OFFSET_DTYPE)
+        with open(self._offsets_path(), 'ab') as f:
+            f.write(new_offsets.astype(_OFFSET_DTYPE).tobytes())
+
+        self._meta["num_trajectories"] += len(simulation_results)
+        self._meta["num_samples"] = int(new_offsets[-1])
+        self._write_meta()
+        self._cache.clear()
+
+def load_trajectory(path, index):
+    """
+    Open a store and return a single trajectory without reading the whole store.
+
+    Parameters:
+    -----------
+    path : str
+        Directory of the store
+    index : int
+        Trajectory index
+
+    Returns:
+    --------
+    tuple
+        (t_array, p_array, v_array, a_array, ts10, tf10, p0, v0)
+    """
+    return TrajectoryStore(path, mode='r').get(index)
@@ -2,6 +2,13 @@ from .phase import *
 from .check_k import check_k
 import matplotlib.pyplot as plt
 import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Bump when the figure layout changes, so that cached images are re-rendered
+RENDER_VERSION = 1
+CACHE_FILE = "render_cache.json"
 
 def analyze_region(region_type):
     """
@@ -11,7 +18,7 @@ def analyze_region(region_type):
     -----------
     region_type : int
         Region type (1-8)
-        
+    
     Returns:
     --------
     plt : matplotlib.pyplot
@@ -24,32 +31,127 @@ def analyze_region(region_type):
     result = simulate_system(region_type)
     return plot_trajectories(result)
 
-def save_all_regions(output_dir='analysis_results'):
+def render_key(region_type, num_points=100, num_steps=200, dt=0.05, method="exact", seed=42, dpi=150):
+    """
+    Content hash of everything that determines a region image.
+    
+    Returns:
+    --------
+    str
+        Hex digest of the inputs (k1, k2, num_points, num_steps, dt, method, seed, dpi)
+    """
+    k1, k2 = get_k_values(region_type)
+    inputs = {
+        "version": RENDER_VERSION,
+        "region_type": region_type,
+        "k1": float(k1), "k2": float(k2),
+        "num_points": num_points, "num_steps": num_steps, "dt": float(dt),
+        "method": method, "seed": seed, "dpi": dpi,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+def render_region(region_type, path, num_points=100, num_steps=200, dt=0.05, method="exact", seed=42, dpi=150):
+    """
+    Simulates a region and saves its trajectory plot, using an explicit Agg
+    Figure instead of the global pyplot state (safe in worker processes).
+    
+    Parameters:
+    -----------
+    region_type : int
+        Region type (1-8)
+    path : str
+        Output image path
+    
+    Returns:
+    --------
+    str
+        The output path
+    """
+    result = simulate_system(region_type, num_points=num_points, num_steps=num_steps,
+                             dt=dt, method=method, seed=seed)
+    fig = trajectory_figure(result)
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    return path
+
+def _load_cache(output_dir):
+    cache_path = os.path.join(output_dir, CACHE_FILE)
+    if not os.path.exists(cache_path):
+        return {}
+    with open(cache_path) as f:
+        return json.load(f)
+
+def _save_cache(output_dir, cache):
+    cache_path = os.path.join(output_dir, CACHE_FILE)
+    with open(cache_path, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+def save_all_regions(output_dir='analysis_results', regions=range(1, 9), workers=None, force=False,
+                     verbose=True, num_points=100, num_steps=200, dt=0.05, method="exact", seed=42, dpi=150):
     """
     Save analysis for all equilibrium regions to a directory.
     
+    Images whose inputs did not change since the last run (same content hash in
+    output_dir/render_cache.json and the file still exists) are skipped.
+    
     Parameters:
     -----------
     output_dir : str
         Directory to save the results
+    regions : iterable of int, optional
+        Region types to render (default: 1-8)
+    workers : int, optional
+        Number of worker processes. If None or 1, regions are rendered in this process.
+    force : bool, optional
+        Re-render all images, ignoring the cache
+    verbose : bool, optional
+        Print the check_k analysis of every region
+    num_points, num_steps, dt, method, seed :
+        Simulation parameters (see simulate_system)
+    dpi : int, optional
+        Resolution of the saved images
+    
+    Returns:
+    --------
+    list of str
+        Paths of the images that were rendered (not taken from the cache)
     """
     # Create directory if it doesn't exist
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
-    # Save all region analyses
-    for region_type in range(1, 9):
-        # Get plt object for current region
-        plt_obj = analyze_region(region_type)
-        
-        # Save image
-        # plt_obj.savefig(os.path.join(output_dir, f'region_{region_type}_simulation.png'), 
-        #                dpi=150, bbox_inches='tight')
-        
-        # Close figure to free memory
-        plt_obj.close()
-        
-        print(f"Region {region_type} analysis saved to {output_dir}/region_{region_type}_simulation.png")
+    cache = {} if force else _load_cache(output_dir)
+    params = dict(num_points=num_points, num_steps=num_steps, dt=dt, method=method, seed=seed, dpi=dpi)
+    
+    # Collect regions whose image is missing or out of date
+    jobs = []
+    for region_type in regions:
+        if verbose:
+            check_k(region_type)
+        filename = f'region_{region_type}_simulation.png'
+        path = os.path.join(output_dir, filename)
+        key = render_key(region_type, **params)
+        if cache.get(filename) == key and os.path.exists(path):
+            print(f"Region {region_type} is up to date: {path}")
+            continue
+        jobs.append((region_type, path, filename, key))
+    
+    # Render the remaining regions, in a process pool if requested
+    if workers is not None and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(render_region, region_type, path, **params)
+                       for region_type, path, _, _ in jobs]
+            for future in futures:
+                future.result()
+    else:
+        for region_type, path, _, _ in jobs:
+            render_region(region_type, path, **params)
+    
+    for region_type, path, filename, key in jobs:
+        cache[filename] = key
+        print(f"Region {region_type} analysis saved to {path}")
+    _save_cache(output_dir, cache)
+    
+    return [path for _, path, _, _ in jobs]
 
 # Run this code if the script is executed directly
 if __name__ == "__main__":
@@ -57,4 +159,4 @@ if __name__ == "__main__":
     output_dir = "analysis_results"
     
     # Save all region analyses
-    save_all_regions(output_dir) 
\ No newline at end of file
+    save_all_regions(output_dir)
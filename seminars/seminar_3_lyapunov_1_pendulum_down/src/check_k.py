@@ -1,6 +1,7 @@
 import importlib.util
 import sys
 from .phase import *
+from .stability_analysis import system_matrix, analyze_matrices
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -16,15 +17,14 @@ def check_k(region_type):
     k1, k2 = get_k_values(region_type)
     
     # Calculate transition matrix according to theoretical formulation
-    A = np.array([
-        [0, 1],
-        [-1 + k1, k2]
-    ])
+    A = system_matrix(k1, k2)
 
-    eigenvalues = np.linalg.eigvals(A)
-    determinant = np.linalg.det(A)
-    trace = np.trace(A)
-    discriminant = trace**2 - 4*determinant
+    # Closed-form eigen-analysis of the 2x2 matrix
+    analysis = analyze_matrices(A)
+    eigenvalues = analysis["eigenvalues"]
+    determinant = analysis["determinant"]
+    trace = analysis["trace"]
+    discriminant = analysis["discriminant"]
 
     region_names = {
         1: "Stable focus", 
@@ -7,6 +7,7 @@ from matplotlib.colors import Normalize
 import os
 # from phase import get_k_values, simulate_system
 from .phase import get_k_values, simulate_system
+from .rendering import add_trajectory_collection, add_endpoint_markers
 
 def generate_phase_portrait_collage(save_path=None, show_plot=True):
     """
@@ -68,12 +69,7 @@ def generate_phase_portrait_collage(save_path=None, show_plot=True):
         all_data.append(result)
         
         # Находим границы для текущего региона
-        max_x, max_y = 0, 0
-        for traj in result["trajectories"]:
-            region_max_x = np.max(np.abs(traj[:, 0]))
-            region_max_y = np.max(np.abs(traj[:, 1]))
-            max_x = max(max_x, region_max_x)
-            max_y = max(max_y, region_max_y)
+        max_x, max_y = np.max(np.abs(result["trajectories"]), axis=(0, 1))
         
         # Добавляем небольшой отступ
         max_x = max_x * 1.2
@@ -105,19 +101,10 @@ def generate_phase_portrait_collage(save_path=None, show_plot=True):
         start_color = 'blue'
         end_color = 'orange'
         
-        # Отображаем траектории
-        for traj in trajectories:
-            # Устанавливаем цвет в зависимости от времени (от начала к концу)
-            cmap = plt.cm.cool  # Меняем на схему cool (голубой-розовый градиент)
-            for j in range(len(traj)-1):
-                t = j / len(traj)  # Нормализованное время (0-1)
-                color = cmap(t)
-                ax.plot(traj[j:j+2, 0], traj[j:j+2, 1], '-', color=color, linewidth=1, alpha=0.7)
-            
-            # Начальная точка
-            ax.plot(traj[0, 0], traj[0, 1], 'o', color=start_color, markersize=4)
-            # Конечная точка
-            ax.plot(traj[-1, 0], traj[-1, 1], 's', color=end_color, markersize=4)
+        # Отображаем траектории одной LineCollection с градиентом по времени (схема cool)
+        add_trajectory_collection(ax, trajectories, cmap=plt.cm.cool, linewidth=1, alpha=0.7)
+        # Начальные и конечные точки
+        add_endpoint_markers(ax, trajectories, start_color, end_color, markersize=4)
         
         # Добавляем точку равновесия
         ax.plot(0, 0, 'ro', markersize=10, markeredgecolor='black')
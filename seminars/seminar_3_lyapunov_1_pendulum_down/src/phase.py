@@ -1,34 +1,53 @@
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import os
+from .rendering import add_trajectory_collection, add_endpoint_markers
+from .stability_analysis import system_matrix
+
+# Half-width of the critical damping, center and k1 = 1 boundary lines
+BOUNDARY_TOL = 0.01
 
 def equilibrium_type(k1, k2):
-    # Stable focus region (damped oscillations)
-    if k1 < 1 and k2 < 0 and k2**2 < 4*(1-k1):
-        return 1
-    # Stable node region (aperiodic damping)
-    elif k1 < 1 and k2 < 0 and k2**2 > 4*(1-k1):
-        return 2
-    # Critical damping line
-    elif k1 < 1 and k2 < 0 and abs(k2**2 - 4*(1-k1)) < 0.01:
-        return 3
-    # Neutral stability line (center)
-    elif k1 < 1 and abs(k2) < 0.01:
-        return 4
-    # Unstable focus region
-    elif k1 < 1 and k2 > 0:
-        return 5
-    # Saddle point region
-    elif k1 > 1:
-        return 6
-    # Special boundary (saddle-node) - for k1=1, k2<0
-    elif abs(k1 - 1) < 0.01 and k2 < 0:
-        return 7
-    # Degenerate case (one eigenvalue zero) - for k1=1, k2>=0
-    elif abs(k1 - 1) < 0.01 and k2 >= 0:
-        return 8
-    else:
-        return 0
+    """
+    Returns the region code (0-8) of the equilibrium for gains k1, k2.
+    
+    Works element-wise on arrays (e.g. K1, K2 from np.meshgrid): the region
+    conditions are evaluated as boolean masks in the same order of priority
+    as the original if/elif chain. Scalar inputs return an int.
+    
+    Parameters:
+        k1 (float or ndarray): Coefficient of theta
+        k2 (float or ndarray): Coefficient of theta_dot, broadcastable with k1
+        
+    Returns:
+        int or ndarray: Region code, 0 if no region matches
+    """
+    scalar_input = np.ndim(k1) == 0 and np.ndim(k2) == 0
+    k1 = np.asarray(k1, dtype=float)
+    k2 = np.asarray(k2, dtype=float)
+
+    below = k1 < 1
+    damped = below & (k2 < 0)
+    critical = k2**2 - 4*(1-k1)
+    on_k1_line = np.abs(k1 - 1) < BOUNDARY_TOL
+
+    conditions = [
+        damped & (critical < 0),                      # 1: Stable focus (damped oscillations)
+        damped & (critical > 0),                      # 2: Stable node (aperiodic damping)
+        damped & (np.abs(critical) < BOUNDARY_TOL),   # 3: Critical damping line
+        below & (np.abs(k2) < BOUNDARY_TOL),          # 4: Neutral stability line (center)
+        below & (k2 > 0),                             # 5: Unstable focus
+        k1 > 1,                                       # 6: Saddle point
+        on_k1_line & (k2 < 0),                        # 7: Saddle-node, k1=1, k2<0
+        on_k1_line & (k2 >= 0),                       # 8: Degenerate case, k1=1, k2>=0
+    ]
+    codes = np.select(conditions, np.arange(1, 9), default=0)
+
+    if scalar_input:
+        return int(codes)
+    return codes
 
 def get_k_values(region_type):
     """
@@ -55,7 +74,83 @@ def get_k_values(region_type):
     else:
         raise ValueError("Unknown region type")
 
-def simulate_system(region_type, num_points=100, num_steps=200, dt=0.05):
+def transition_matrix(A, t):
+    """
+    Exact transition matrix expm(A*t) of a 2x2 linear system for one or many times.
+    
+    Uses the closed form expm(A t) = e^(s t) [cosh(q t) I + sinh(q t)/q (A - s I)]
+    with s = tr(A)/2 and q = sqrt(s^2 - det(A)). It is valid for all 2x2 matrices,
+    including defective ones (critical damping, degenerate cases) where an
+    eigen-decomposition does not exist.
+    
+    Parameters:
+        A (ndarray): System matrix, shape (2, 2)
+        t (float or ndarray): Time(s)
+        
+    Returns:
+        ndarray: Transition matrices, shape t.shape + (2, 2)
+    """
+    A = np.asarray(A, dtype=float)
+    t = np.asarray(t, dtype=float)[..., None, None]
+    s = np.trace(A) / 2
+    q = np.sqrt(complex(s**2 - (A[0, 0]*A[1, 1] - A[0, 1]*A[1, 0])))
+    cosh_qt = np.cosh(q * t)
+    # sinh(q t)/q -> t as q -> 0 (repeated eigenvalue)
+    sinhc_qt = np.sinh(q * t) / q if q != 0 else t
+    identity = np.eye(2)
+    Phi = np.exp(s * t) * (cosh_qt * identity + sinhc_qt * (A - s * identity))
+    return Phi.real
+
+def propagate_linear(A, initial_states, num_steps, dt, method="exact"):
+    """
+    Propagates all initial conditions of x' = Ax together.
+    
+    Parameters:
+        A (ndarray): System matrix, shape (2, 2)
+        initial_states (ndarray): Initial states, shape (N, 2)
+        num_steps (int): Number of steps
+        dt (float): Time step
+        method (str): "exact" (discrete transition matrix expm(A*dt)) or
+                      "euler" (explicit Euler, x + A x dt)
+        
+    Returns:
+        ndarray: Trajectories, shape (N, num_steps + 1, 2)
+    """
+    X = np.array(initial_states, dtype=float)
+    trajectories = np.empty((X.shape[0], num_steps + 1, X.shape[1]))
+    trajectories[:, 0] = X
+
+    if method == "exact":
+        # Discrete transition matrix, computed once
+        Phi_T = transition_matrix(A, dt).T
+        for k in range(num_steps):
+            X = X @ Phi_T
+            trajectories[:, k + 1] = X
+    elif method == "euler":
+        A_T = np.asarray(A, dtype=float).T
+        for k in range(num_steps):
+            X = X + (X @ A_T) * dt
+            trajectories[:, k + 1] = X
+    else:
+        raise ValueError(f"Unknown method '{method}', expected 'exact' or 'euler'")
+    return trajectories
+
+def linear_solution(A, initial_states, times):
+    """
+    Evaluates the exact solution of x' = Ax at arbitrary times, without stepping.
+    
+    Parameters:
+        A (ndarray): System matrix, shape (2, 2)
+        initial_states (ndarray): Initial states, shape (N, 2)
+        times (ndarray): Times, shape (T,)
+        
+    Returns:
+        ndarray: States, shape (N, T, 2)
+    """
+    Phi = transition_matrix(A, times)
+    return np.einsum('tij,nj->nti', Phi, np.asarray(initial_states, dtype=float))
+
+def simulate_system(region_type, num_points=100, num_steps=200, dt=0.05, method="exact", seed=42):
     """
     Simulates a dynamic system in matrix form for the selected region.
     
@@ -64,47 +159,32 @@ def simulate_system(region_type, num_points=100, num_steps=200, dt=0.05):
         num_points (int): Number of initial points
         num_steps (int): Number of simulation steps
         dt (float): Time step
+        method (str): "exact" (matrix exponential) or "euler" (explicit Euler)
+        seed (int): Random seed of the initial points
         
     Returns:
-        dict: Dictionary with trajectories and system parameters
+        dict: Dictionary with trajectories (array of shape (num_points, num_steps + 1, 2))
+              and system parameters
     """
     # Get k1 and k2 values for the specified region
     k1, k2 = get_k_values(region_type)
     
     # Create system matrix in the form x' = Ax
-    A = np.array([
-        [0, 1],
-        [-1 +  k1,  k2]
-    ])
+    A = system_matrix(k1, k2)
     
-    # Generate 10 initial points around the equilibrium position (0, 0)
+    # Generate initial points around the equilibrium position (0, 0)
     # Use a small radius for initial points
     radius = 0.2
-    np.random.seed(42)  # for reproducibility
+    np.random.seed(seed)  # for reproducibility
     
-    initial_conditions = []
-    for _ in range(num_points):
-        # Generate random points in a circle of radius 'radius'
-        r = radius * np.sqrt(np.random.random())
-        theta = 2 * np.pi * np.random.random()
-        x0 = r * np.cos(theta)
-        y0 = r * np.sin(theta)
-        initial_conditions.append(np.array([x0, y0]))
+    # Random points in a circle of radius 'radius' (same draws as one (r, theta) pair per point)
+    samples = np.random.random((num_points, 2))
+    r = radius * np.sqrt(samples[:, 0])
+    theta = 2 * np.pi * samples[:, 1]
+    initial_conditions = np.column_stack([r * np.cos(theta), r * np.sin(theta)])
     
-    # Simulate the system for each initial condition
-    trajectories = []
-    
-    for init_cond in initial_conditions:
-        trajectory = [init_cond.copy()]
-        x = init_cond.copy()
-        
-        for _ in range(num_steps):
-            # Simple Euler method for integration
-            dx = A @ x
-            x = x + dx * dt
-            trajectory.append(x.copy())
-        
-        trajectories.append(np.array(trajectory))
+    # Simulate the system for all initial conditions at once
+    trajectories = propagate_linear(A, initial_conditions, num_steps, dt, method)
     
     # Return simulation results and parameters
     return {
@@ -113,9 +193,23 @@ def simulate_system(region_type, num_points=100, num_steps=200, dt=0.05):
         "k2": k2,
         "trajectories": trajectories,
         "dt": dt,
-        "num_steps": num_steps
+        "num_steps": num_steps,
+        "method": method,
+        "seed": seed
     }
 
+# Настройка стиля для качественных надписей
+# Используем стандартные шрифты вместо Computer Modern Roman
+TRAJECTORY_STYLE = {
+    'font.family': 'DejaVu Sans',  # Стандартный шрифт, доступный почти везде
+    'font.size': 14,
+    'axes.titlesize': 14, 
+    'axes.labelsize': 14,
+    'font.weight': 'normal',
+    'text.usetex': False,     # Отключаем использование LaTeX
+    'mathtext.default': 'regular'  # Используем обычный шрифт для математики
+}
+
 def plot_trajectories(simulation_result, title=None):
     """
     Visualizes trajectories of the dynamic system.
@@ -124,21 +218,42 @@ def plot_trajectories(simulation_result, title=None):
         simulation_result (dict): Result from the simulate_system function
         title (str, optional): Plot title
     """
-    # Настройка стиля для качественных надписей
-    # Используем стандартные шрифты вместо Computer Modern Roman
-    plt.rcParams.update({
-        'font.family': 'DejaVu Sans',  # Стандартный шрифт, доступный почти везде
-        'font.size': 14,
-        'axes.titlesize': 14, 
-        'axes.labelsize': 14,
-        'font.weight': 'normal',
-        'text.usetex': False,     # Отключаем использование LaTeX
-        'mathtext.default': 'regular'  # Используем обычный шрифт для математики
-    })
+    plt.rcParams.update(TRAJECTORY_STYLE)
     
     # Создаем фигуру и оси - явно указываем оси для избежания ошибки с colorbar
     fig, ax = plt.subplots(figsize=(10, 8))
+    draw_trajectories(fig, ax, simulation_result, title)
+    
+    return plt
+
+def trajectory_figure(simulation_result, title=None):
+    """
+    Same plot as plot_trajectories, but on an explicit Figure that is not
+    registered with pyplot (no global state; safe in worker processes).
     
+    Parameters:
+        simulation_result (dict): Result from the simulate_system function
+        title (str, optional): Plot title
+        
+    Returns:
+        matplotlib.figure.Figure: The figure (save it with fig.savefig)
+    """
+    with matplotlib.rc_context(TRAJECTORY_STYLE):
+        fig = Figure(figsize=(10, 8))
+        ax = fig.add_subplot()
+        draw_trajectories(fig, ax, simulation_result, title)
+    return fig
+
+def draw_trajectories(fig, ax, simulation_result, title=None):
+    """
+    Draws the trajectories of simulate_system onto the given figure and axes.
+    
+    Parameters:
+        fig (matplotlib.figure.Figure): Figure (for the colorbar)
+        ax (matplotlib.axes.Axes): Target axes
+        simulation_result (dict): Result from the simulate_system function
+        title (str, optional): Plot title
+    """
     # Extract trajectories from simulation results
     trajectories = simulation_result["trajectories"]
     region_type = simulation_result["region_type"]
@@ -156,19 +271,10 @@ def plot_trajectories(simulation_result, title=None):
     start_color = 'blue'
     end_color = 'orange'  # Используем оранжевый как в collage_generator.py
     
-    # Отображаем траектории с градиентом по времени
-    for traj in trajectories:
-        # Устанавливаем цвет в зависимости от времени (от начала к концу)
-        cmap = plt.cm.cool  # Меняем на схему cool (голубой-розовый градиент)
-        for j in range(len(traj)-1):
-            t = j / len(traj)  # Нормализованное время (0-1)
-            color = cmap(t)
-            ax.plot(traj[j:j+2, 0], traj[j:j+2, 1], '-', color=color, linewidth=1.5, alpha=0.7)
-        
-        # Начальная точка
-        ax.plot(traj[0, 0], traj[0, 1], 'o', color=start_color, markersize=6, alpha=0.7)
-        # Конечная точка
-        ax.plot(traj[-1, 0], traj[-1, 1], 's', color=end_color, markersize=6, alpha=0.7)
+    # Отображаем траектории одной LineCollection с градиентом по времени (схема cool)
+    add_trajectory_collection(ax, trajectories, cmap=plt.cm.cool, linewidth=1.5, alpha=0.7)
+    # Начальные и конечные точки
+    add_endpoint_markers(ax, trajectories, start_color, end_color, markersize=6, alpha=0.7)
     
     # Add equilibrium point with larger size
     ax.plot(0, 0, 'ro', markersize=12, markeredgecolor='black')
@@ -233,12 +339,7 @@ def plot_trajectories(simulation_result, title=None):
     cbar = fig.colorbar(sm, ax=ax, orientation='vertical', label='Time evolution', shrink=0.8)
     
     # Автоматически определяем границы графика с учетом всех траекторий
-    max_x, max_y = 0, 0
-    for traj in trajectories:
-        region_max_x = np.max(np.abs(traj[:, 0]))
-        region_max_y = np.max(np.abs(traj[:, 1]))
-        max_x = max(max_x, region_max_x)
-        max_y = max(max_y, region_max_y)
+    max_x, max_y = np.max(np.abs(trajectories), axis=(0, 1))
     
     # Добавляем небольшой отступ
     max_x = max_x * 1.2
@@ -247,8 +348,6 @@ def plot_trajectories(simulation_result, title=None):
     # Устанавливаем границы
     ax.set_xlim(-max_x, max_x)
     ax.set_ylim(-max_y, max_y)
-    
-    return plt
 
 # Example usage:
 if __name__ == "__main__":
@@ -1,8 +1,70 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
+from .phase import equilibrium_type, BOUNDARY_TOL
 
-def plot_stability_regions(save_path=None, show_plot=True, figsize=(10, 8), dpi=300):
+def _boundary_functions(K1, K2):
+    """Values of the region boundary functions k1 - 1, k2 and k2^2 - 4(1-k1)."""
+    return K1 - 1, K2, K2**2 - 4*(1 - K1)
+
+def stability_region_map(k1_range=(-0.5, 2.0), k2_range=(-3.0, 1.5), resolution=500, refine_block=None):
+    """
+    Computes the region codes of equilibrium_type on a regular (k1, k2) grid.
+    
+    Parameters:
+    -----------
+    k1_range : tuple, default=(-0.5, 2.0)
+        (min, max) of k1.
+    k2_range : tuple, default=(-3.0, 1.5)
+        (min, max) of k2.
+    resolution : int or tuple, default=500
+        Number of grid points along k1 and k2 (one int for both axes).
+    refine_block : int, optional
+        Adaptive refinement. The grid is first sampled every refine_block points;
+        only blocks whose corners have different codes or that touch one of the
+        boundaries k1 = 1, k2 = 0, k2^2 = 4(1-k1) (within the line width) are
+        evaluated at full resolution, the rest are filled with their corner code.
+        If None, every grid point is evaluated.
+        
+    Returns:
+    --------
+    k1, k2, Z : ndarray
+        Grid axes and the region codes Z of shape (len(k2), len(k1)), as int8.
+    """
+    n1, n2 = (resolution, resolution) if np.ndim(resolution) == 0 else resolution
+    k1 = np.linspace(k1_range[0], k1_range[1], n1)
+    k2 = np.linspace(k2_range[0], k2_range[1], n2)
+
+    if refine_block is None or refine_block <= 1:
+        K1, K2 = np.meshgrid(k1, k2)
+        return k1, k2, equilibrium_type(K1, K2).astype(np.int8)
+
+    # Coarse nodes: every refine_block-th grid point plus the last one
+    b = refine_block
+    nodes1 = np.unique(np.append(np.arange(0, n1, b), n1 - 1))
+    nodes2 = np.unique(np.append(np.arange(0, n2, b), n2 - 1))
+    C1, C2 = np.meshgrid(k1[nodes1], k2[nodes2])
+    coarse = equilibrium_type(C1, C2)
+
+    # Block (i, j) spans coarse nodes i..i+1 along k2 and j..j+1 along k1
+    corners = np.stack([coarse[:-1, :-1], coarse[:-1, 1:], coarse[1:, :-1], coarse[1:, 1:]])
+    refine = np.any(corners != corners[0], axis=0)
+    # k1 - 1 and k2 are linear, and k2^2 - 4(1-k1) is monotonic in blocks that do not
+    # cross k2 = 0, so their range over a block is spanned by the corner values
+    for f in _boundary_functions(C1, C2):
+        f_corners = np.stack([f[:-1, :-1], f[:-1, 1:], f[1:, :-1], f[1:, 1:]])
+        refine |= (f_corners.min(axis=0) < BOUNDARY_TOL) & (f_corners.max(axis=0) > -BOUNDARY_TOL)
+
+    # Map every grid point to its block
+    block1 = np.minimum(np.searchsorted(nodes1, np.arange(n1), side='right') - 1, len(nodes1) - 2)
+    block2 = np.minimum(np.searchsorted(nodes2, np.arange(n2), side='right') - 1, len(nodes2) - 2)
+    Z = corners[0][np.ix_(block2, block1)].astype(np.int8)
+
+    rows, cols = np.nonzero(refine[np.ix_(block2, block1)])
+    Z[rows, cols] = equilibrium_type(k1[cols], k2[rows])
+    return k1, k2, Z
+
+def plot_stability_regions(save_path=None, show_plot=True, figsize=(10, 8), dpi=300, resolution=500, refine_block=None):
     """
     Plot the stability regions of a linear pendulum system with control parameters k1 and k2.
     
@@ -16,6 +78,11 @@ def plot_stability_regions(save_path=None, show_plot=True, figsize=(10, 8), dpi=
         Figure size in inches.
     dpi : int, default=300
         Resolution for the saved figure.
+    resolution : int, default=500
+        Number of grid points along each axis of the stability map.
+    refine_block : int, optional
+        Block size for adaptive refinement near region boundaries
+        (see stability_region_map). If None, every grid point is evaluated.
         
     Returns:
     --------
@@ -29,45 +96,8 @@ def plot_stability_regions(save_path=None, show_plot=True, figsize=(10, 8), dpi=
     k1_min, k1_max = -0.5, 2.0
     k2_min, k2_max = -3.0, 1.5
     
-    # Create a grid of k1 and k2 values
-    k1 = np.linspace(k1_min, k1_max, 500)
-    k2 = np.linspace(k2_min, k2_max, 500)
-    K1, K2 = np.meshgrid(k1, k2)
-    
-    # Function to determine equilibrium type
-    def equilibrium_type(k1, k2):
-        # Stable focus region (damped oscillations)
-        if k1 < 1 and k2 < 0 and k2**2 < 4*(1-k1):
-            return 1
-        # Stable node region (aperiodic damping)
-        elif k1 < 1 and k2 < 0 and k2**2 > 4*(1-k1):
-            return 2
-        # Critical damping line
-        elif k1 < 1 and k2 < 0 and abs(k2**2 - 4*(1-k1)) < 0.01:
-            return 3
-        # Neutral stability line (center)
-        elif k1 < 1 and abs(k2) < 0.01:
-            return 4
-        # Unstable focus region
-        elif k1 < 1 and k2 > 0:
-            return 5
-        # Saddle point region
-        elif k1 > 1:
-            return 6
-        # Special boundary (saddle-node) - for k1=1, k2<0
-        elif abs(k1 - 1) < 0.01 and k2 < 0:
-            return 7
-        # Degenerate case (one eigenvalue zero) - for k1=1, k2>=0
-        elif abs(k1 - 1) < 0.01 and k2 >= 0:
-            return 8
-        else:
-            return 0
-    
-    # Create an array of equilibrium types
-    Z = np.zeros_like(K1)
-    for i in range(Z.shape[0]):
-        for j in range(Z.shape[1]):
-            Z[i, j] = equilibrium_type(K1[i, j], K2[i, j])
+    # Region codes on a grid of k1 and k2 values
+    k1, k2, Z = stability_region_map((k1_min, k1_max), (k2_min, k2_max), resolution, refine_block)
     
     # Define colors for different regions
     colors = [
@@ -0,0 +1,53 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.colors import Normalize
+
+def trajectory_segments(trajectories):
+    """
+    Converts trajectories into line segments for a LineCollection.
+    
+    Parameters:
+        trajectories (ndarray or list): Trajectories of equal length, shape (N, T, 2)
+        
+    Returns:
+        tuple: (segments of shape (N*(T-1), 2, 2), normalized time j/T of every segment)
+    """
+    trajectories = np.asarray(trajectories, dtype=float)
+    num_trajectories, num_points = trajectories.shape[:2]
+    segments = np.stack([trajectories[:, :-1], trajectories[:, 1:]], axis=2).reshape(-1, 2, 2)
+    segment_times = np.tile(np.arange(num_points - 1) / num_points, num_trajectories)
+    return segments, segment_times
+
+def add_trajectory_collection(ax, trajectories, cmap=plt.cm.cool, linewidth=1.5, alpha=0.7):
+    """
+    Draws all trajectories as a single colour-mapped LineCollection,
+    coloured by normalized time (from start to end).
+    
+    Parameters:
+        ax (matplotlib.axes.Axes): Target axes
+        trajectories (ndarray or list): Trajectories of equal length, shape (N, T, 2)
+        cmap (Colormap): Colormap of the time gradient
+        linewidth (float): Line width
+        alpha (float): Line transparency
+        
+    Returns:
+        LineCollection: The added collection
+    """
+    segments, segment_times = trajectory_segments(trajectories)
+    lc = LineCollection(segments, cmap=cmap, norm=Normalize(vmin=0, vmax=1),
+                        linewidths=linewidth, alpha=alpha)
+    lc.set_array(segment_times)
+    ax.add_collection(lc)
+    return lc
+
+def add_endpoint_markers(ax, trajectories, start_color='blue', end_color='orange', markersize=6, alpha=1.0):
+    """
+    Marks the initial (circle) and final (square) points of all trajectories
+    with one artist each.
+    """
+    trajectories = np.asarray(trajectories, dtype=float)
+    ax.plot(trajectories[:, 0, 0], trajectories[:, 0, 1], 'o', color=start_color,
+            markersize=markersize, alpha=alpha, linestyle='None')
+    ax.plot(trajectories[:, -1, 0], trajectories[:, -1, 1], 's', color=end_color,
+            markersize=markersize, alpha=alpha, linestyle='None')
@@ -1,37 +1,90 @@
 import numpy as np
 
+# Tolerance for the zero tests on determinant, trace and discriminant
+EPS = 1e-9
+
+# Function to build the closed-loop system matrix for gains k1, k2
+def system_matrix(k1, k2):
+    """Returns A = [[0, 1], [-1 + k1, k2]] with shape (..., 2, 2) for scalar or array gains."""
+    k1, k2 = np.broadcast_arrays(np.asarray(k1, dtype=float), np.asarray(k2, dtype=float))
+    A = np.zeros(k1.shape + (2, 2))
+    A[..., 0, 1] = 1
+    A[..., 1, 0] = -1 + k1
+    A[..., 1, 1] = k2
+    return A
+
+# Function to classify equilibria from trace and determinant
+def classify_trace_determinant(trace, determinant, discriminant=None):
+    """
+    Classifies equilibria element-wise from trace, determinant and discriminant
+    (same rules as classify_equilibrium). Returns an int array of region codes.
+    """
+    trace = np.asarray(trace, dtype=float)
+    determinant = np.asarray(determinant, dtype=float)
+    if discriminant is None:
+        discriminant = trace**2 - 4 * determinant
+
+    degenerate = np.abs(determinant) < EPS  # Delta = 0
+    stable_trace = trace < -EPS             # tau < 0
+    unstable_trace = trace > EPS            # tau > 0
+    positive = ~degenerate & (determinant > 0)
+
+    conditions = [
+        degenerate & stable_trace,                       # 7: Saddle-Node
+        degenerate,                                      # 8: Degenerate Case
+        positive & stable_trace & (discriminant < -EPS), # 1: Stable Focus
+        positive & stable_trace & (discriminant > EPS),  # 2: Stable Node
+        positive & stable_trace,                         # 3: Critical Damping
+        positive & unstable_trace,                       # 5: Unstable Focus / Node
+        positive,                                        # 4: Center
+    ]
+    # Everything else has determinant < 0: Saddle Point
+    return np.select(conditions, [7, 8, 1, 2, 3, 5, 4], default=6)
+
+# Function to analyze a stack of 2x2 system matrices at once
+def analyze_matrices(A):
+    """
+    Closed-form analysis of 2x2 matrices, without a LAPACK call per matrix.
+
+    A can be a single (2, 2) matrix or a stack of shape (..., 2, 2). Returns a dict with
+    'eigenvalues' (..., 2) complex, 'trace', 'determinant', 'discriminant' and 'type'
+    (region codes of classify_equilibrium), each of shape (...).
+    """
+    A = np.asarray(A, dtype=float)
+    if A.shape[-2:] != (2, 2):
+        raise ValueError(f"Expected matrices of shape (..., 2, 2). Got: {A.shape}")
+    a, b = A[..., 0, 0], A[..., 0, 1]
+    c, d = A[..., 1, 0], A[..., 1, 1]
+
+    trace = a + d
+    determinant = a * d - b * c
+    discriminant = trace**2 - 4 * determinant
+
+    # Roots of lambda^2 - trace*lambda + determinant = 0
+    sqrt_discriminant = np.sqrt(discriminant.astype(complex))
+    eigenvalues = np.stack([(trace + sqrt_discriminant) / 2, (trace - sqrt_discriminant) / 2], axis=-1)
+
+    return {
+        "eigenvalues": eigenvalues,
+        "trace": trace,
+        "determinant": determinant,
+        "discriminant": discriminant,
+        "type": classify_trace_determinant(trace, determinant, discriminant),
+    }
+
+# Function to analyze the closed-loop system for scalar or array gains
+def analyze_gains(k1, k2):
+    """Same as analyze_matrices(system_matrix(k1, k2)), e.g. for a (K1, K2) meshgrid."""
+    return analyze_matrices(system_matrix(k1, k2))
+
 # Function to classify equilibrium based on system matrix A
 def classify_equilibrium(A):
     """Classifies the equilibrium type based on the eigenvalues of matrix A."""
-    eigenvalues = np.linalg.eigvals(A)
-    trace = np.trace(A)
-    determinant = np.linalg.det(A)
-    discriminant = trace**2 - 4 * determinant
-
-    # Based on determinant, trace, and discriminant analysis
-    if abs(determinant) < 1e-9:  # Degenerate cases (Delta = 0)
-        if trace < -1e-9:
-            return 7  # Saddle-Node
-        else:
-            return 8  # Degenerate Case
-    elif determinant > 0:  # Nodes or Foci (Delta > 0)
-        if trace < -1e-9:  # Stable region (tau < 0)
-            if discriminant < -1e-9:
-                return 1  # Stable Focus
-            elif discriminant > 1e-9:
-                return 2  # Stable Node
-            else:
-                return 3  # Critical Damping
-        elif trace > 1e-9:  # Unstable region (tau > 0)
-             # Assuming original intent lumps unstable focus/node based on tau > 0, Delta > 0
-             return 5 # Unstable Focus / Node
-        else:  # trace == 0 (tau = 0)
-            return 4  # Center
-    else:  # determinant < 0 (Delta < 0)
-        return 6  # Saddle Point
+    # Based on determinant, trace, and discriminant analysis (see classify_trace_determinant)
+    return int(analyze_matrices(A)["type"])
 
 # Function to get eigenvalues and eigenvectors
 def get_eigenvalues(A):
     """Computes eigenvalues and eigenvectors for matrix A."""
     eigenvalues, eigenvectors = np.linalg.eig(A)
-    return eigenvalues, eigenvectors 
\ No newline at end of file
+    return eigenvalues, eigenvectors 
@@ -2,10 +2,22 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import solve_ivp
 
-# Function to plot a phase portrait
-def plot_phase_portrait(ax, system_ode, k1, k2, X, Y, t_span, t_eval, title, eigenvalues):
-    """Plots the phase portrait for a given system on the provided axes."""
-    # Calculate vector field
+# Linearized closed-loop pendulum, vectorized: y may be [theta, theta_dot] arrays of any shape
+def linear_system_ode(t, y, k1, k2):
+    """Right-hand side of x' = Ax with A = [[0, 1], [-1 + k1, k2]]; works on arrays."""
+    theta, theta_dot = y[0], y[1]
+    return np.array([theta_dot, (-1 + k1) * theta + k2 * theta_dot])
+
+# Function to evaluate the vector field on a mesh
+def vector_field(system_ode, k1, k2, X, Y, vectorized=False):
+    """
+    Evaluates system_ode on the mesh X, Y. Returns (U, V) with the shape of X.
+    A vectorized ODE is called once with the whole mesh; otherwise point by point.
+    """
+    if vectorized:
+        U, V = system_ode(0, np.array([X, Y]), k1, k2) # t=0 is arbitrary for autonomous system
+        return np.broadcast_to(U, X.shape), np.broadcast_to(V, X.shape)
+
     U, V = np.zeros(X.shape), np.zeros(Y.shape)
     NI, NJ = X.shape
     for i in range(NI):
@@ -15,6 +27,37 @@ def plot_phase_portrait(ax, system_ode, k1, k2, X, Y, t_span, t_eval, title, eig
             yprime = system_ode(0, [x, y], k1, k2) # t=0 is arbitrary for autonomous system
             U[i, j] = yprime[0]
             V[i, j] = yprime[1]
+    return U, V
+
+# Function to integrate several initial points of a vectorized ODE as one system
+def solve_batch(system_ode, t_span, initial_points, k1, k2, t_eval=None):
+    """
+    Integrates all initial points with a single solve_ivp call by stacking them
+    into one state [theta_1..theta_n, theta_dot_1..theta_dot_n].
+    system_ode must accept y of shape (2, n).
+
+    Returns:
+        t (ndarray), states of shape (n, 2, len(t))
+    """
+    initial_points = np.asarray(initial_points, dtype=float)
+    n = len(initial_points)
+
+    def batched_ode(t, y):
+        return np.asarray(system_ode(t, y.reshape(2, n), k1, k2)).reshape(-1)
+
+    sol = solve_ivp(batched_ode, t_span, initial_points.T.reshape(-1), t_eval=t_eval)
+    return sol.t, sol.y.reshape(2, n, -1).transpose(1, 0, 2)
+
+# Function to plot a phase portrait
+def plot_phase_portrait(ax, system_ode, k1, k2, X, Y, t_span, t_eval, title, eigenvalues, vectorized=False):
+    """
+    Plots the phase portrait for a given system on the provided axes.
+    With vectorized=True, system_ode must accept y = [theta, theta_dot] as arrays
+    (like linear_system_ode): the vector field is evaluated on the whole mesh in one
+    call and all trajectories are integrated as one batched system.
+    """
+    # Calculate vector field
+    U, V = vector_field(system_ode, k1, k2, X, Y, vectorized)
 
     # Plot vector field using streamplot for better visualization
     ax.streamplot(X, Y, U, V, color='grey', linewidth=0.5, density=1.5, arrowstyle='->', arrowsize=1)
@@ -26,11 +69,15 @@ def plot_phase_portrait(ax, system_ode, k1, k2, X, Y, t_span, t_eval, title, eig
     ]
     colors = plt.cm.viridis(np.linspace(0, 1, len(initial_points)))
 
-    for idx, y0 in enumerate(initial_points):
-        sol = solve_ivp(system_ode, t_span, y0, args=(k1, k2), dense_output=True, t_eval=t_eval)
-        ax.plot(sol.y[0], sol.y[1], color=colors[idx], linewidth=1.5, label=f'Start ({y0[0]},{y0[1]})')
-        ax.plot(sol.y[0, 0], sol.y[1, 0], 'o', color=colors[idx]) # Start point
-        ax.plot(sol.y[0, -1], sol.y[1, -1], 's', color=colors[idx]) # End point
+    if vectorized:
+        _, solutions = solve_batch(system_ode, t_span, initial_points, k1, k2, t_eval=t_eval)
+    else:
+        solutions = [solve_ivp(system_ode, t_span, y0, args=(k1, k2), t_eval=t_eval).y for y0 in initial_points]
+
+    for idx, (y0, sol_y) in enumerate(zip(initial_points, solutions)):
+        ax.plot(sol_y[0], sol_y[1], color=colors[idx], linewidth=1.5, label=f'Start ({y0[0]},{y0[1]})')
+        ax.plot(sol_y[0, 0], sol_y[1, 0], 'o', color=colors[idx]) # Start point
+        ax.plot(sol_y[0, -1], sol_y[1, -1], 's', color=colors[idx]) # End point
 
     # Formatting the plot
     ax.set_xlim([X.min(), X.max()])
@@ -9,6 +9,23 @@ class Controller(ABC):
         """Computes the control input."""
         pass
 
+    def compute_control_batch(self, system: System, states: np.ndarray, t: float | None = None) -> np.ndarray | tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the control input for a batch of states.
+
+        Controllers that support ensemble simulation override this method.
+
+        Args:
+            system: The system instance (provides the model parameters).
+            states: Array of states, shape (N, state_dim).
+            t: Current time.
+
+        Returns:
+            Array of control values of shape (N,), or a tuple
+            (control_values, controller_indices) of two such arrays.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support batched control.")
+
 class EnergyControl(Controller):
     def __init__(self, max_torque: float):
         """
@@ -58,6 +75,34 @@ class EnergyControl(Controller):
 
         return control_input
 
+    def compute_control_batch(self, system: System, states: np.ndarray, t: float | None = None) -> np.ndarray:
+        """
+        Vectorized version of compute_control for an array of states.
+
+        Args:
+            system: The system instance (must be a Pendulum instance for this controller).
+            states: Array of states [theta, theta_dot], shape (N, 2).
+            t: Current time (not used).
+
+        Returns:
+            Array of control torques, shape (N,).
+        """
+        if not isinstance(system, Pendulum):
+            raise TypeError("EnergyControl requires a Pendulum system instance.")
+
+        theta_dot = states[:, 1]
+        delta_E = system.get_desired_energy() - system.get_energy_batch(states)
+
+        # Same modified law as compute_control: fall back to sign(delta_E) at rest
+        velocity_threshold = 1e-4
+        direction = np.where(np.abs(theta_dot) > velocity_threshold,
+                             np.sign(delta_E * theta_dot),
+                             np.sign(delta_E))
+        control_input = self.max_torque * direction
+        control_input[np.isclose(delta_E, 0)] = 0.0
+
+        return control_input
+
 class LinearFeedbackController(Controller):
     def __init__(self, K1: float, K2: float, target_state: np.ndarray, max_torque: float | None = None):
         """
@@ -106,6 +151,28 @@ class LinearFeedbackController(Controller):
 
         return control_torque
 
+    def compute_control_batch(self, system: System, states: np.ndarray, t: float | None = None) -> np.ndarray:
+        """
+        Vectorized version of compute_control for an array of states.
+
+        Args:
+            system: The system instance.
+            states: Array of states [theta, theta_dot], shape (N, 2).
+            t: Current time (not used).
+
+        Returns:
+            Array of control torques, shape (N,).
+        """
+        error_theta = states[:, 0] - self.target_state[0]
+        error_theta_dot = states[:, 1] - self.target_state[1]
+
+        control_torque = self.K1 * error_theta + self.K2 * error_theta_dot
+
+        if self.max_torque is not None:
+            control_torque = np.clip(control_torque, -self.max_torque, self.max_torque)
+
+        return control_torque
+
 # Ensure K1, K2, target_state are defined before this class if needed globally
 # Or pass them during instantiation
 
@@ -152,6 +219,7 @@ class EnergyPDController(Controller):
         self._E_des = None # Will be calculated on first call
         self._eps_E_abs = None # Will be calculated
         self.active_controller_index = 0 # 0: Energy, 1: Linear
+        self.switched_to_linear_batch = None # Per-trajectory switch flags for compute_control_batch
 
     def compute_control(self, system: System, t: float | None = None) -> tuple:
         """
@@ -176,6 +244,7 @@ class EnergyPDController(Controller):
             # Reset switch state and index when E_des is recalculated
             self.switched_to_linear = False
             self.active_controller_index = 0
+            self.switched_to_linear_batch = None
 
         # --- Control Logic ---
         control_torque = 0.0
@@ -209,10 +278,53 @@ class EnergyPDController(Controller):
 
         return control_torque, self.active_controller_index
 
+    def compute_control_batch(self, system: System, states: np.ndarray, t: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized version of compute_control for an array of states.
+        Each trajectory keeps its own switch flag in self.switched_to_linear_batch,
+        so a trajectory stays on the Linear controller once it has been captured.
+
+        Returns:
+            Tuple of (control_torques, active_controller_indices), both of shape (N,).
+        """
+        if not isinstance(system, Pendulum):
+            raise TypeError("EnergyPDController requires a Pendulum system instance for energy calculations.")
+
+        if self._E_des is None:
+            self._E_des = system.get_desired_energy()
+            if self._E_des is None or self._E_des <= 0:
+                 raise ValueError("Could not get a valid desired energy E_des from the system.")
+            self._eps_E_abs = self.eps_E_switch_factor * self._E_des
+            self.switched_to_linear = False
+            self.active_controller_index = 0
+            self.switched_to_linear_batch = None
+
+        num_states = states.shape[0]
+        if self.switched_to_linear_batch is None or self.switched_to_linear_batch.shape != (num_states,):
+            self.switched_to_linear_batch = np.zeros(num_states, dtype=bool)
+
+        # Check switching condition for trajectories that have not switched yet
+        E_tot = system.get_energy_batch(states)
+        angle_diff = (states[:, 0] - self.target_state[0] + np.pi) % (2 * np.pi) - np.pi
+        angle_condition = np.abs(angle_diff) < self.eps_theta_switch
+        energy_condition = E_tot > (self._E_des - self._eps_E_abs)
+        self.switched_to_linear_batch |= angle_condition & energy_condition
+
+        switched = self.switched_to_linear_batch
+        control_torque = np.where(switched,
+                                  self.linear_controller.compute_control_batch(system, states, t),
+                                  self.energy_controller.compute_control_batch(system, states, t))
+
+        # Apply torque limits (saturation) using max_torque from energy controller
+        control_torque = np.clip(control_torque, -self.max_torque, self.max_torque)
+
+        return control_torque, switched.astype(float)
+
     def reset(self):
         """Resets the switching state for reuse in multiple simulations."""
         self.switched_to_linear = False
         self._E_des = None # Force recalculation of E_des on next call
         self._eps_E_abs = None
         self.active_controller_index = 0 # Reset index
+        self.switched_to_linear_batch = None
         # Note: This doesn't reset the underlying controllers' internal states if they have any. 
\ No newline at end of file
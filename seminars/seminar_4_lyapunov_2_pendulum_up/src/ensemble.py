@@ -0,0 +1,88 @@
+import numpy as np
+from tqdm import tqdm # Optional: for progress bar
+
+from .system import System
+from .controller import Controller
+from .integrators import Integrator, get_integrator
+
+class EnsembleSimulator:
+    def __init__(self, system: System, controller: Controller, initial_states: np.ndarray, dt: float, num_steps: int,
+                 integrator: Integrator | str | None = None):
+        """
+        Initializes a vectorized simulation of many trajectories of the same system.
+        All trajectories are advanced together as one (N, state_dim) array.
+
+        Args:
+            system: The system instance. Used only as the model (parameters);
+                    its own state is not modified.
+            controller: The controller to use. Must implement compute_control_batch.
+            initial_states: Array of initial states, shape (N, state_dim).
+            dt: Simulation time step.
+            num_steps: Total number of simulation steps.
+            integrator: Integration scheme, as an Integrator instance or a name from
+                        integrators.INTEGRATORS. Default: None (explicit Euler).
+        """
+        self.system = system
+        self.controller = controller
+        self.dt = dt
+        self.num_steps = num_steps
+        self.integrator = get_integrator(integrator)
+        self.time_vector = np.linspace(0, dt * num_steps, num_steps + 1)
+
+        self.initial_states = np.array(initial_states, dtype=float)
+        if self.initial_states.ndim != 2:
+            raise ValueError(f"Initial states must be an array of shape (N, state_dim). Got: {self.initial_states.shape}")
+        num_trajectories, state_dim = self.initial_states.shape
+
+        # History storage, one row per trajectory
+        self.state_history = np.zeros((num_trajectories, num_steps + 1, state_dim))
+        # Control history stores [control_value, controller_index] or [control_value, nan]
+        self.control_history = np.full((num_trajectories, num_steps, 2), np.nan)
+        self.time_history = np.zeros(num_steps + 1)
+
+    def run(self, progress: bool = True):
+        """
+        Runs the simulation loop for all trajectories at once.
+
+        Args:
+            progress: Show a tqdm progress bar (if tqdm is available). Default: True.
+        """
+        num_trajectories = self.initial_states.shape[0]
+        states = self.initial_states.copy()
+        self.state_history[:, 0, :] = states
+        self.time_history[0] = 0
+
+        step_range = range(self.num_steps)
+        if progress and 'tqdm' in globals():
+            step_range = tqdm(step_range, desc="Ensemble Progress", leave=False)
+
+        for i in step_range:
+            current_time = self.time_vector[i]
+            # 1. Compute control inputs for all trajectories
+            # Controller can return an array of controls or a tuple (controls, indices)
+            control_output = self.controller.compute_control_batch(self.system, states, current_time)
+
+            if isinstance(control_output, tuple):
+                control_input, controller_index = control_output
+                self.control_history[:, i, 1] = controller_index
+            else:
+                control_input = control_output
+            control_input = np.broadcast_to(np.asarray(control_input, dtype=float), (num_trajectories,))
+            self.control_history[:, i, 0] = control_input
+
+            # 2. Step all trajectories with the control held constant (same scheme as System.step)
+            if self.integrator is None:
+                state_derivatives = self.system.get_state_derivative_batch(control_input, states, current_time)
+                states = states + state_derivatives * self.dt
+            else:
+                states = self.integrator.step(
+                    lambda t, s: self.system.get_state_derivative_batch(control_input, s, t),
+                    current_time, states, self.dt, self.system.num_positions)
+
+            # 3. Store results
+            self.state_history[:, i + 1, :] = states
+            self.time_history[i + 1] = current_time + self.dt
+
+    def get_results(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the simulation results (time, states of shape (N, num_steps+1, state_dim), controls)."""
+        return self.time_history, self.state_history, self.control_history
@@ -0,0 +1,226 @@
+from abc import ABC, abstractmethod
+import typing
+import numpy as np
+
+# Right-hand side of the ODE: f(t, state) -> state derivative.
+# state may be a single vector (d,) or a batch (N, d).
+Derivative = typing.Callable[[float, np.ndarray], np.ndarray]
+
+class Integrator(ABC):
+    @abstractmethod
+    def step(self, f: Derivative, t: float, state: np.ndarray, dt: float,
+             num_positions: int | None = None) -> np.ndarray:
+        """
+        Advances the state by one time step dt.
+
+        Args:
+            f: Right-hand side f(t, state) of the ODE. The control input is held
+               constant over the step (zero-order hold), so f is usually a closure
+               over the system and the current control value.
+            t: Time at the beginning of the step.
+            state: State at time t, shape (d,) or (N, d).
+            dt: Time step.
+            num_positions: State layout for the schemes that treat positions and
+                           velocities differently (see System.num_positions): the state is
+                           [positions, velocities, other states] with num_positions entries
+                           in each of the first two blocks. None: [positions, velocities]
+                           halves. Ignored by the other schemes.
+
+        Returns:
+            State at time t + dt, same shape as state.
+        """
+        pass
+
+    def reset(self):
+        """Resets the internal state of the integrator (if any)."""
+        pass
+
+class EulerIntegrator(Integrator):
+    """Explicit (forward) Euler method, first order."""
+
+    def step(self, f: Derivative, t: float, state: np.ndarray, dt: float,
+             num_positions: int | None = None) -> np.ndarray:
+        return state + f(t, state) * dt
+
+class RK4Integrator(Integrator):
+    """Classical fourth-order Runge-Kutta method."""
+
+    def step(self, f: Derivative, t: float, state: np.ndarray, dt: float,
+             num_positions: int | None = None) -> np.ndarray:
+        k1 = f(t, state)
+        k2 = f(t + 0.5 * dt, state + 0.5 * dt * k1)
+        k3 = f(t + 0.5 * dt, state + 0.5 * dt * k2)
+        k4 = f(t + dt, state + dt * k3)
+        return state + (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
+
+def _num_positions(state: np.ndarray, num_positions: int | None) -> int:
+    """Checks the [positions, velocities, other states] layout and returns the number of positions."""
+    state_dim = state.shape[-1]
+    if num_positions is None:
+        if state_dim % 2:
+            raise ValueError(f"A state of odd dimension {state_dim} has no [positions, velocities] layout; "
+                             "pass num_positions (see System.num_positions).")
+        return state_dim // 2
+    if not 0 < 2 * num_positions <= state_dim:
+        raise ValueError(f"num_positions={num_positions} does not fit a state of dimension {state_dim}.")
+    return num_positions
+
+class SemiImplicitEulerIntegrator(Integrator):
+    """
+    Semi-implicit (symplectic) Euler method for mechanical systems.
+
+    The state is assumed to be [positions, velocities] with d/dt positions = velocities
+    (e.g. [theta, theta_dot] for the pendulum). Velocities are updated first and
+    the new velocities are used to update positions. Further states after the
+    velocities (e.g. the estimates of an AdaptiveSystem) take an explicit Euler step.
+    """
+
+    def step(self, f: Derivative, t: float, state: np.ndarray, dt: float,
+             num_positions: int | None = None) -> np.ndarray:
+        n = _num_positions(state, num_positions)
+        derivative = f(t, state)
+        new_state = np.empty_like(state, dtype=float)
+        new_state[..., n:] = state[..., n:] + derivative[..., n:] * dt
+        new_state[..., :n] = state[..., :n] + new_state[..., n:2 * n] * dt
+        return new_state
+
+class VerletIntegrator(Integrator):
+    """
+    Velocity Verlet (kick-drift-kick leapfrog) method, second order and symplectic
+    for conservative systems. Uses the same [positions, velocities] layout as
+    SemiImplicitEulerIntegrator. For velocity-dependent forces (damping) the
+    half-step velocity is used in the second force evaluation. Further states after
+    the velocities take Heun's (explicit trapezoidal) step from the same two evaluations.
+    """
+
+    def step(self, f: Derivative, t: float, state: np.ndarray, dt: float,
+             num_positions: int | None = None) -> np.ndarray:
+        n = _num_positions(state, num_positions)
+        derivative = f(t, state)
+        new_state = np.array(state, dtype=float)
+        # Kick (other states: Euler predictor)
+        new_state[..., n:2 * n] += 0.5 * dt * derivative[..., n:2 * n]
+        new_state[..., 2 * n:] += dt * derivative[..., 2 * n:]
+        # Drift
+        new_state[..., :n] += dt * new_state[..., n:2 * n]
+        # Kick (other states: trapezoidal corrector)
+        end_derivative = f(t + dt, new_state)
+        new_state[..., n:2 * n] += 0.5 * dt * end_derivative[..., n:2 * n]
+        new_state[..., 2 * n:] = state[..., 2 * n:] + 0.5 * dt * (derivative[..., 2 * n:] + end_derivative[..., 2 * n:])
+        return new_state
+
+class DormandPrinceIntegrator(Integrator):
+    # Butcher tableau of the Dormand-Prince 5(4) pair
+    _C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+    _A = [
+        [],
+        [1/5],
+        [3/40, 9/40],
+        [44/45, -56/15, 32/9],
+        [19372/6561, -25360/2187, 64448/6561, -212/729],
+        [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+        [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84],
+    ]
+    _B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+    _B_LOW = np.array([5179/57600, 0, 7571/16695, 393/640, -92097/339200, 187/2100, 1/40])
+
+    def __init__(self, rtol: float = 1e-6, atol: float = 1e-9, safety: float = 0.9,
+                 min_factor: float = 0.2, max_factor: float = 5.0, max_substeps: int = 10000):
+        """
+        Adaptive Dormand-Prince RK45 method with embedded error control.
+        Each call to step() integrates over the full dt, taking as many internal
+        substeps as required by the tolerances. The last accepted substep size is
+        reused as the first guess on the next call.
+
+        Args:
+            rtol: Relative tolerance.
+            atol: Absolute tolerance.
+            safety: Safety factor for the step size update.
+            min_factor: Minimum step size shrink factor.
+            max_factor: Maximum step size growth factor.
+            max_substeps: Maximum number of substeps (accepted and rejected) per call.
+        """
+        self.rtol = rtol
+        self.atol = atol
+        self.safety = safety
+        self.min_factor = min_factor
+        self.max_factor = max_factor
+        self.max_substeps = max_substeps
+        self._h = None # Last suggested substep size
+        self.num_rejected = 0 # Total number of rejected substeps (diagnostics)
+
+    def reset(self):
+        """Forgets the last suggested substep size."""
+        self._h = None
+        self.num_rejected = 0
+
+    def _error_norm(self, error: np.ndarray, state: np.ndarray, new_state: np.ndarray) -> float:
+        scale = self.atol + self.rtol * np.maximum(np.abs(state), np.abs(new_state))
+        # RMS over state components, worst case over the batch
+        return float(np.max(np.sqrt(np.mean((error / scale)**2, axis=-1))))
+
+    def step(self, f: Derivative, t: float, state: np.ndarray, dt: float,
+             num_positions: int | None = None) -> np.ndarray:
+        t_end = t + dt
+        h = dt if self._h is None else min(self._h, dt)
+        y = np.asarray(state, dtype=float)
+        k_first = f(t, y)
+
+        for _ in range(self.max_substeps):
+            remaining = t_end - t
+            if remaining <= 1e-12 * max(1.0, abs(t_end)):
+                return y
+            h_step = min(h, remaining)
+
+            k = [k_first]
+            for i in range(1, 7):
+                y_stage = y + h_step * sum(a * k_j for a, k_j in zip(self._A[i], k) if a != 0)
+                k.append(f(t + self._C[i] * h_step, y_stage))
+            y_new = y_stage # The 7th stage is evaluated at the 5th order solution (FSAL)
+            error = h_step * sum((b - b_low) * k_j for b, b_low, k_j in zip(self._B, self._B_LOW, k))
+
+            err = self._error_norm(error, y, y_new)
+            if err <= 1.0:
+                t += h_step
+                y = y_new
+                k_first = k[6]
+                factor = self.max_factor if err == 0 else min(self.max_factor, self.safety * err**-0.2)
+                h_next = h_step * factor
+                if h_step < h:
+                    # The substep was clipped to reach t_end; keep the unclipped suggestion
+                    h_next = max(h, h_next)
+                h = self._h = h_next
+            else:
+                self.num_rejected += 1
+                h = h_step * max(self.min_factor, self.safety * err**-0.2)
+
+        raise RuntimeError(f"DormandPrinceIntegrator exceeded {self.max_substeps} substeps in one step of size {dt}.")
+
+INTEGRATORS = {
+    'euler': EulerIntegrator,
+    'rk4': RK4Integrator,
+    'semi_implicit_euler': SemiImplicitEulerIntegrator,
+    'symplectic_euler': SemiImplicitEulerIntegrator,
+    'verlet': VerletIntegrator,
+    'rk45': DormandPrinceIntegrator,
+    'dopri5': DormandPrinceIntegrator,
+}
+
+def get_integrator(integrator: Integrator | str | None) -> Integrator | None:
+    """
+    Resolves an integrator given by name (see INTEGRATORS) or instance.
+
+    Args:
+        integrator: Integrator instance, name, or None.
+
+    Returns:
+        Integrator instance, or None if integrator is None.
+    """
+    if integrator is None or isinstance(integrator, Integrator):
+        return integrator
+    if isinstance(integrator, str):
+        try:
+            return INTEGRATORS[integrator.lower()]()
+        except KeyError:
+            raise ValueError(f"Unknown integrator '{integrator}'. Available: {', '.join(INTEGRATORS)}") from None
+    raise TypeError(f"integrator must be an Integrator instance, a name or None. Got: {type(integrator).__name__}")
@@ -0,0 +1,55 @@
+import numpy as np
+
+def _bucket_extreme_indices(values: np.ndarray, bucket_ids: np.ndarray, starts: np.ndarray, largest: bool) -> np.ndarray:
+    """Index of the first minimum (or maximum) of values in every bucket. NaN never wins unless a bucket is all NaN."""
+    fill = -np.inf if largest else np.inf
+    clean = np.where(np.isnan(values), fill, values)
+    reduce = np.maximum if largest else np.minimum
+    extremes = reduce.reduceat(clean, starts)
+    hits = np.flatnonzero(clean == extremes[bucket_ids])
+    # First hit of every bucket
+    _, first = np.unique(bucket_ids[hits], return_index=True)
+    return hits[first]
+
+def minmax_indices(columns: np.ndarray, num_buckets: int,
+                   keep: np.ndarray | None = None) -> np.ndarray:
+    """
+    Selects the samples to draw for a min/max-preserving decimation.
+
+    The samples are split into num_buckets consecutive buckets; in every bucket the
+    indices of the minimum and maximum of each column are kept, plus the first and
+    last sample. Peaks (e.g. bang-bang control spikes) therefore survive however
+    strongly the series is reduced.
+
+    Args:
+        columns: One series of shape (n,) or several series sharing the same samples,
+                 shape (n, k); the extremes of every column are kept.
+        num_buckets: Number of buckets, typically the pixel width of the axes.
+        keep: Optional extra indices that are always kept (e.g. controller switches).
+
+    Returns:
+        Sorted array of sample indices (all indices if n <= 4 * num_buckets).
+    """
+    columns = np.asarray(columns, dtype=float)
+    if columns.ndim == 1:
+        columns = columns[:, None]
+    n = columns.shape[0]
+    num_buckets = max(int(num_buckets), 1)
+    if n <= 4 * num_buckets:
+        return np.arange(n)
+
+    # Sample i belongs to bucket floor(i * num_buckets / n); bucket b starts at ceil(b * n / num_buckets)
+    bucket_ids = (np.arange(n) * num_buckets) // n
+    starts = -((-np.arange(num_buckets) * n) // num_buckets)
+    selected = [np.array([0, n - 1])]
+    for column in columns.T:
+        selected.append(_bucket_extreme_indices(column, bucket_ids, starts, largest=False))
+        selected.append(_bucket_extreme_indices(column, bucket_ids, starts, largest=True))
+    if keep is not None:
+        keep = np.asarray(keep, dtype=int)
+        selected.append(keep[(keep >= 0) & (keep < n)])
+    return np.unique(np.concatenate(selected))
+
+def axes_pixel_width(ax) -> int:
+    """Width of the axes in display pixels (at the figure dpi)."""
+    return max(int(np.ceil(ax.get_window_extent().width)), 1)
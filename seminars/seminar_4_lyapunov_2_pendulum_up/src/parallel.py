@@ -0,0 +1,82 @@
+import math
+import typing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from tqdm import tqdm # Optional: for progress bar
+
+# simulate_states(initial_states, *args, progress=...) -> (time_history, state_history (n, num_steps+1, state_dim))
+SimulateStates = typing.Callable[..., tuple[np.ndarray, np.ndarray]]
+
+def _run_chunk(simulate_states: SimulateStates, shm_name: str, shape: tuple[int, int, int],
+               start: int, initial_states: np.ndarray, args: tuple) -> tuple[int, np.ndarray | None]:
+    """
+    Worker: simulates one chunk of initial states and writes the state histories
+    into rows [start, start + len(initial_states)) of the shared output array.
+
+    Returns:
+        Tuple (number of simulated states, time_history for the first chunk or None).
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        time_hist, state_hist = simulate_states(initial_states, *args, progress=False)
+        output = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        output[start:start + len(initial_states)] = state_hist
+        del output # Release the buffer before closing the shared memory
+    finally:
+        shm.close()
+    return len(initial_states), (time_hist if start == 0 else None)
+
+def run_chunks_parallel(simulate_states: SimulateStates, initial_states: np.ndarray, num_steps: int,
+                        workers: int, chunk_size: int | None = None,
+                        args: tuple = ()) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Splits the initial states into chunks and simulates them in a process pool.
+    Each worker writes its histories directly into one shared-memory array, so only
+    the initial states (and one time vector) are pickled. Rows keep the order of
+    initial_states regardless of which chunk finishes first.
+
+    Args:
+        simulate_states: Picklable function simulating an (n, state_dim) array of initial
+                         states in one process, e.g. Simulator._simulate_states.
+        initial_states: Array of initial states, shape (N, state_dim).
+        num_steps: Number of simulation steps per trajectory.
+        workers: Number of worker processes.
+        chunk_size: Number of initial states per chunk. Default: None (about four chunks per worker).
+        args: Extra positional arguments passed to simulate_states after the initial states.
+
+    Returns:
+        Tuple (time_history, state_history) with state_history of shape (N, num_steps + 1, state_dim).
+    """
+    num_states, state_dim = initial_states.shape
+    shape = (num_states, num_steps + 1, state_dim)
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(num_states / (4 * workers)))
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, math.prod(shape) * np.dtype(float).itemsize))
+    try:
+        time_hist = None
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_run_chunk, simulate_states, shm.name, shape, start,
+                                initial_states[start:start + chunk_size], args)
+                for start in range(0, num_states, chunk_size)
+            ]
+            progress_bar = tqdm(total=num_states, desc="Overall Progress") if 'tqdm' in globals() else None
+            for future in as_completed(futures):
+                num_done, chunk_time_hist = future.result()
+                if chunk_time_hist is not None:
+                    time_hist = chunk_time_hist
+                if progress_bar is not None:
+                    progress_bar.update(num_done)
+            if progress_bar is not None:
+                progress_bar.close()
+
+        shared_states = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        state_hist = shared_states.copy()
+        del shared_states
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return time_hist, state_hist
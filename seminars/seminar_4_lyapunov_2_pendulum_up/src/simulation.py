@@ -5,9 +5,15 @@ import typing # Import typing for Type hint
 from .system import System
 from .controller import Controller
 from .plotter import Plotter
+from .ensemble import EnsembleSimulator
+from .parallel import run_chunks_parallel
+from .cache import SimulationCache, UncacheableError, make_key, get_cache
+from .integrators import Integrator, get_integrator
 
 class Simulation:
-    def __init__(self, system: System, controller: Controller, dt: float, num_steps: int):
+    def __init__(self, system: System, controller: Controller, dt: float, num_steps: int,
+                 cache: SimulationCache | str | None = None,
+                 integrator: Integrator | str | None = None):
         """
         Initializes the Simulation.
 
@@ -16,11 +22,20 @@ class Simulation:
             controller: The controller to use.
             dt: Simulation time step.
             num_steps: Total number of simulation steps.
+            cache: Optional SimulationCache (or its directory). run() then looks up the
+                   histories by a hash of the system, controller, dt and num_steps, and
+                   only simulates on a miss. A hit restores the histories and the final
+                   system state, not the internal state of the controller.
+            integrator: Integration scheme, as an Integrator instance or a name from
+                        integrators.INTEGRATORS ('euler', 'rk4', 'semi_implicit_euler',
+                        'verlet', 'rk45'). Default: None (the system's own Euler step).
         """
         self.system = system
         self.controller = controller
         self.dt = dt
         self.num_steps = num_steps
+        self.cache = get_cache(cache)
+        self.integrator = get_integrator(integrator)
         self.time_vector = np.linspace(0, dt * num_steps, num_steps + 1)
 
         # History storage
@@ -32,15 +47,55 @@ class Simulation:
         self.control_history = np.zeros((num_steps, 2)) 
         self.time_history = np.zeros(num_steps + 1)
 
-    def run(self):
-        """Runs the simulation loop."""
+    def run(self, progress: bool = True):
+        """
+        Runs the simulation loop.
+
+        Args:
+            progress: Show a tqdm progress bar (if tqdm is available). Default: True.
+        """
+        # The key must be computed before the run changes the system state
+        cache_key = self._cache_key()
+        if cache_key is not None and self._load_from_cache(cache_key):
+            return
+
+        self._run_loop(progress)
+
+        if cache_key is not None:
+            self.cache.put(cache_key,
+                           time_history=self.time_history,
+                           state_history=self.state_history,
+                           control_history=self.control_history)
+
+    def _cache_key(self) -> str | None:
+        """Content hash of the run configuration, or None if the run cannot be cached."""
+        if self.cache is None:
+            return None
+        try:
+            return make_key("Simulation.run", self.system, self.controller, self.dt, self.num_steps, self.integrator)
+        except UncacheableError:
+            return None
+
+    def _load_from_cache(self, cache_key: str) -> bool:
+        """Fills the histories from the cache. Returns False on a miss."""
+        entry = self.cache.get(cache_key)
+        if entry is None or entry['state_history'].shape != self.state_history.shape:
+            return False
+        self.time_history[:] = entry['time_history']
+        self.state_history[:] = entry['state_history']
+        self.control_history[:] = entry['control_history']
+        self.system.set_state(self.state_history[-1].copy())
+        return True
+
+    def _run_loop(self, progress: bool = True):
+        """Runs the simulation loop into the preallocated histories."""
         # Store initial state
         self.state_history[0, :] = self.system.get_state()
         self.time_history[0] = 0
 
         # Use tqdm range description if tqdm is available
         step_range = range(self.num_steps)
-        if 'tqdm' in globals():
+        if progress and 'tqdm' in globals():
             step_range = tqdm(step_range, desc="Simulation Progress", leave=False) # leave=False for nested loops
 
         for i in step_range:
@@ -65,7 +120,7 @@ class Simulation:
             self.control_history[i, :] = control_vector_to_store
 
             # 2. Apply control and step the system using the extracted control_input
-            self.system.step(self.dt, control_input)
+            self.system.step(self.dt, control_input, self.integrator, current_time)
 
             # 3. Store results
             self.state_history[i + 1, :] = self.system.get_state()
@@ -96,7 +151,12 @@ class Simulation:
         controller_class: typing.Type[Controller],
         controller_args: dict,
         dt: float,
-        num_steps: int
+        num_steps: int,
+        batched: bool = True,
+        workers: int | None = None,
+        chunk_size: int | None = None,
+        cache: SimulationCache | str | None = None,
+        integrator: str | None = None
     ) -> list[tuple[np.ndarray, np.ndarray]]:
         """
         Runs multiple simulations for a list of initial states.
@@ -110,21 +170,107 @@ class Simulation:
             controller_args: Dictionary of arguments to pass to the controller constructor.
             dt: Simulation time step.
             num_steps: Total number of simulation steps for each trajectory.
+            batched: If True and the controller implements compute_control_batch,
+                     all initial states are stepped together by EnsembleSimulator.
+                     Otherwise each initial state is simulated separately. Default: True.
+            workers: Number of worker processes. If greater than 1, chunks of initial states
+                     are simulated in a process pool (see parallel.py). Default: None (this process).
+            chunk_size: Number of initial states per chunk when workers > 1.
+                        Default: None (about four chunks per worker).
+            cache: Optional SimulationCache (or its directory). The histories are looked up
+                   by a hash of the classes, their arguments, dt, num_steps, batched and
+                   the initial states; workers and chunk_size are not part of the key.
+            integrator: Name of the integration scheme (see integrators.INTEGRATORS).
+                        Default: None (explicit Euler).
 
         Returns:
             A list of tuples, where each tuple contains (time_history, state_history)
             for one simulation run.
         """
-        results_list = []
         print(f"Running {len(initial_states_list)} simulations...")
+        if len(initial_states_list) == 0:
+            print("0 simulations finished.")
+            return []
+
+        initial_states = np.asarray(initial_states_list, dtype=float)
+        if initial_states.ndim != 2:
+            raise ValueError(f"initial_states_list must contain 1D NumPy arrays of equal length. Got shape {initial_states.shape}")
+
+        simulate_args = (system_class, system_args, controller_class, controller_args, dt, num_steps, batched,
+                         integrator)
+
+        cache = get_cache(cache)
+        cache_key = None
+        if cache is not None:
+            try:
+                cache_key = make_key("Simulation.run_multiple", initial_states, *simulate_args)
+            except UncacheableError:
+                cache_key = None
+        entry = cache.get(cache_key) if cache_key is not None else None
+
+        if entry is not None:
+            time_hist, state_hist = entry['time_history'], entry['state_history']
+        else:
+            if workers is not None and workers > 1 and len(initial_states) > 1:
+                time_hist, state_hist = run_chunks_parallel(
+                    Simulation._simulate_states, initial_states, num_steps, workers, chunk_size, simulate_args)
+            else:
+                time_hist, state_hist = Simulation._simulate_states(initial_states, *simulate_args)
+            if cache_key is not None:
+                cache.put(cache_key, time_history=time_hist, state_history=state_hist)
+
+        results_list = [(time_hist, state_hist[i]) for i in range(len(initial_states))]
+        print(f"{len(initial_states_list)} simulations finished.")
+        return results_list
+
+    @staticmethod
+    def _simulate_states(
+        initial_states: np.ndarray,
+        system_class: typing.Type[System],
+        system_args: dict,
+        controller_class: typing.Type[Controller],
+        controller_args: dict,
+        dt: float,
+        num_steps: int,
+        batched: bool = True,
+        integrator: str | None = None,
+        progress: bool = True
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Simulates every row of initial_states (shape (N, state_dim)) in this process.
+        Arguments are as in run_multiple; progress toggles the tqdm bars.
+
+        Returns:
+            Tuple (time_history, state_history) with state_history of shape (N, num_steps + 1, state_dim).
+        """
+        # --- Vectorized path: one system/controller, all states as an (N, state_dim) array ---
+        if batched and controller_class.compute_control_batch is not Controller.compute_control_batch:
+            current_system_args = system_args.copy()
+            current_system_args['initial_state'] = initial_states[0]
+            system = system_class(**current_system_args)
+            controller = controller_class(**controller_args)
+
+            ensemble = EnsembleSimulator(
+                system=system,
+                controller=controller,
+                initial_states=initial_states,
+                dt=dt,
+                num_steps=num_steps,
+                integrator=integrator
+            )
+            ensemble.run(progress=progress)
+            time_hist, state_hist, _ = ensemble.get_results()
+            return time_hist, state_hist
+
+        state_history = np.zeros((initial_states.shape[0], num_steps + 1, initial_states.shape[1]))
 
         # Use tqdm for the outer loop if available
-        outer_loop_range = range(len(initial_states_list))
-        if 'tqdm' in globals():
+        outer_loop_range = range(len(initial_states))
+        if progress and 'tqdm' in globals():
              outer_loop_range = tqdm(outer_loop_range, desc="Overall Progress")
 
         for i in outer_loop_range:
-            initial_state = initial_states_list[i]
+            initial_state = initial_states[i]
 
             # Create system instance with the specific initial state
             current_system_args = system_args.copy()
@@ -139,15 +285,13 @@ class Simulation:
                 system=system,
                 controller=controller,
                 dt=dt,
-                num_steps=num_steps
+                num_steps=num_steps,
+                integrator=integrator
             )
 
-            # Run the individual simulation (no progress bar here)
-            simulation.run() # Consider adding a quiet mode to sim.run()
-            # Get results, control_history now contains vectors
+            # Run the individual simulation
+            simulation.run(progress=progress)
             time_hist, state_hist, _ = simulation.get_results()
+            state_history[i] = state_hist
 
-            results_list.append((time_hist, state_hist))
-
-        print(f"{len(initial_states_list)} simulations finished.")
-        return results_list 
\ No newline at end of file
+        return time_hist, state_history
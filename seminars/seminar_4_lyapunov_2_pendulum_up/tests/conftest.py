@@ -0,0 +1,14 @@
+import os
+import sys
+
+SEMINAR_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def pytest_pycollect_makemodule(module_path, parent):
+    # Every seminar has its own package named src. Make this seminar's one importable
+    # before its test modules are imported, also when several seminars are collected
+    # in one pytest run.
+    for name in [name for name in sys.modules if name == "src" or name.startswith("src.")]:
+        del sys.modules[name]
+    if SEMINAR_DIR in sys.path:
+        sys.path.remove(SEMINAR_DIR)
+    sys.path.insert(0, SEMINAR_DIR)
@@ -0,0 +1,14 @@
+import numpy as np
+from src.cache import SimulationCache, make_key
+
+def test_numpy_scalars_give_the_same_key():
+    assert make_key("x", 0.3) == make_key("x", np.float64(0.3))
+    assert make_key("x", 3) == make_key("x", np.int64(3))
+    assert make_key("x", {"alpha": 0.1}) == make_key("x", {"alpha": np.linspace(0, 0.2, 3)[1]})
+
+def test_float_and_numpy_float_parameters_hit_the_same_entry(tmp_path):
+    cache = SimulationCache(str(tmp_path))
+    cache.put(make_key("run", {"K1": 0.5}), state_history=np.arange(3.0))
+    entry = cache.get(make_key("run", {"K1": np.float64(0.5)}))
+    assert entry is not None
+    np.testing.assert_array_equal(entry["state_history"], np.arange(3.0))
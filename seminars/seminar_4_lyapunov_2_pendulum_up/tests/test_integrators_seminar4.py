@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from src.pendulum import Pendulum
+from src.controller import LinearFeedbackController
+from src.integrators import INTEGRATORS
+from src.simulation import Simulation
+from src.cache import SimulationCache
+
+CONTROLLER_ARGS = dict(K1=-5.0, K2=-2.0, target_state=np.array([np.pi, 0.0]))
+
+def run(integrator, dt, num_steps, cache=None):
+    system = Pendulum(damping=0.1, initial_state=np.array([np.pi - 0.3, 0.0]))
+    simulation = Simulation(system, LinearFeedbackController(**CONTROLLER_ARGS), dt, num_steps,
+                            cache=cache, integrator=integrator)
+    simulation.run(progress=False)
+    return simulation.get_results()[1]
+
+@pytest.mark.parametrize("name", sorted(INTEGRATORS))
+def test_simulation_runs_with_every_integrator(name):
+    dt, num_steps = 0.01, 300
+    reference = run('rk4', dt / 10, num_steps * 10)[::10]
+    # The control is held over a step of dt, so the schemes only differ by the plant integration error
+    np.testing.assert_allclose(run(name, dt, num_steps), reference, atol=5e-2)
+
+@pytest.mark.parametrize("name", sorted(INTEGRATORS))
+def test_run_multiple_batched_matches_single_runs(name):
+    initial_states = [np.array([np.pi - 0.3, 0.0]), np.array([np.pi + 0.2, 0.5])]
+    kwargs = dict(system_class=Pendulum, system_args={'damping': 0.1},
+                  controller_class=LinearFeedbackController, controller_args=CONTROLLER_ARGS,
+                  dt=0.01, num_steps=100, integrator=name)
+    batched = Simulation.run_multiple(initial_states, batched=True, **kwargs)
+    single = Simulation.run_multiple(initial_states, batched=False, **kwargs)
+    for (_, batched_states), (_, single_states) in zip(batched, single):
+        np.testing.assert_allclose(batched_states, single_states, rtol=1e-9, atol=1e-12)
+
+def test_integrator_is_part_of_the_cache_key(tmp_path):
+    cache = SimulationCache(str(tmp_path))
+    euler = run('euler', 0.01, 100, cache)
+    rk4 = run('rk4', 0.01, 100, cache)
+    assert cache.hits == 0 and not np.array_equal(euler, rk4)
+    np.testing.assert_array_equal(run('rk4', 0.01, 100, cache), rk4)
+    assert cache.hits == 1
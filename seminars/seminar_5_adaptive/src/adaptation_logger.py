@@ -0,0 +1,273 @@
+import os
+import re
+import json
+import queue
+import datetime
+import threading
+import numpy as np
+
+FORMAT_NAME = "adaptation_log"
+FORMAT_VERSION = 1
+
+# Minimum size of the .npy header. The size is fixed when the log is opened, so that
+# the header can be rewritten in place with the final length
+_NPY_HEADER_SIZE = 256
+_DTYPE = np.dtype('<f8')
+
+def _npy_header(names: list[str], num_samples: int, size: int | None = None) -> bytes:
+    """
+    .npy header of a 1D structured float64 array, padded to size bytes. The default
+    size (a multiple of 64, at least _NPY_HEADER_SIZE) leaves room for any num_samples.
+    Long field lists (e.g. one field per trajectory of an ensemble) get a version 2.0 header.
+    """
+    descr = [(name, _DTYPE.str) for name in names]
+    header = repr({'descr': descr, 'fortran_order': False, 'shape': (num_samples,)})
+    if size is None:
+        longest = len(header) - len(str(num_samples)) + len(str(2**63))
+        size = max(_NPY_HEADER_SIZE, -(-(12 + longest + 1) // 64) * 64)
+    major = 1 if size <= 0xFFFF else 2
+    length_size = 2 if major == 1 else 4
+    prefix = b'\x93NUMPY' + bytes([major, 0])
+    padding = size - len(prefix) - length_size - len(header) - 1
+    if padding < 0:
+        raise ValueError("Too many or too long field names for the log header")
+    header = (header + ' ' * padding + '\n').encode('latin1')
+    return prefix + len(header).to_bytes(length_size, 'little') + header
+
+class AdaptationLogger:
+    def __init__(self, path_prefix: str, fields: tuple[str, ...] = ("C_hat",),
+                 controller_name: str | None = None, controller_id: int | None = None,
+                 parameters: dict | None = None, capacity: int = 65536):
+        """
+        Binary log of parameter estimates of an adaptive controller.
+
+        Samples [t, *fields] are written into preallocated buffers of capacity rows.
+        A full buffer is handed to a background thread that appends it to
+        <path_prefix>.npy while logging continues in the next buffer (two buffers are
+        used in turn; log blocks only if the disk falls a whole buffer behind).
+        The .npy file holds a 1D structured float64 array with the fields 't' and fields;
+        its header is rewritten with the final length by close(). The metadata
+        (controller name and ID, parameters, timestamp) goes to <path_prefix>.json.
+        Read the log back with load_adaptation_log.
+
+        Args:
+            path_prefix: Path of the output files without extension.
+            fields: Names of the logged estimates (e.g. ("C_hat",) or ("d_hat",)).
+            controller_name: Name of the controller class (stored in the header).
+            controller_id: Optional ID of the controller instance.
+            parameters: Controller parameters (stored in the header, must be JSON-serializable).
+            capacity: Number of samples per buffer.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.path_prefix = path_prefix
+        self.names = ['t'] + list(fields)
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Field names must be unique and different from 't'")
+        self.header = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "controller": controller_name,
+            "controller_id": controller_id,
+            "timestamp": datetime.datetime.now().isoformat(),
+            "parameters": parameters if parameters is not None else {},
+            "fields": self.names,
+            "num_samples": 0,
+        }
+
+        directory = os.path.dirname(path_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(f"{path_prefix}.npy", 'wb')
+        self._header_size = self._file.write(_npy_header(self.names, 0))
+        self._write_header()
+
+        # Buffers cycle between the logger (filling) and the writer thread (flushing)
+        self._free = queue.Queue()
+        self._full = queue.Queue()
+        for _ in range(2):
+            self._free.put(np.zeros((capacity, len(self.names)), dtype=_DTYPE))
+        self._width = len(self.names)
+        self._size = capacity * self._width
+        self._num_handed_over = 0
+        self._use(self._free.get())
+        self._error = None
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _write_header(self):
+        tmp_path = f"{self.path_prefix}.json.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.header, f, indent=2)
+        os.replace(tmp_path, f"{self.path_prefix}.json")
+
+    def _write_loop(self):
+        while True:
+            item = self._full.get()
+            if item is None:
+                return
+            buffer, n = item
+            try:
+                # Rows of a C-contiguous float64 buffer have the layout of the structured dtype
+                self._file.write(buffer[:n].tobytes())
+            except OSError as error:
+                self._error = error
+            self._free.put(buffer)
+
+    def _use(self, buffer: np.ndarray):
+        """Makes buffer the one being filled."""
+        self._buffer = buffer
+        # Flat float view: item assignment on a memoryview is the cheapest per-sample write
+        self._flat = memoryview(buffer.reshape(-1))
+        self._position = 0 # Index of the next value in the flat buffer
+
+    def _hand_over(self):
+        """Queues the current buffer for writing and continues in a free one."""
+        if self._error is not None:
+            raise self._error
+        count = self._position // self._width
+        self._full.put((self._buffer, count))
+        self._num_handed_over += count
+        self._use(self._free.get())
+
+    def log(self, t: float, *values: float):
+        """Appends one sample: the time and one value per field."""
+        if len(values) != self._width - 1:
+            raise ValueError(f"Expected {self._width - 1} values (one per field), got {len(values)}")
+        k = self._position
+        flat = self._flat
+        flat[k] = t
+        for value in values:
+            k += 1
+            flat[k] = value
+        self._position = k + 1
+        if self._position == self._size:
+            self._hand_over()
+
+    def log_many(self, times: np.ndarray, values: np.ndarray):
+        """
+        Appends consecutive samples.
+
+        Args:
+            times: Sample times, shape (n,).
+            values: Estimates, shape (n,) for a single field or (n, num_fields).
+        """
+        times = np.asarray(times, dtype=float)
+        values = np.asarray(values, dtype=float).reshape(len(times), -1)
+        if values.shape[1] != self._width - 1:
+            raise ValueError(f"Expected {self._width - 1} values per sample (one per field), got {values.shape[1]}")
+        start = 0
+        while start < len(times):
+            count = self._position // self._width
+            n = min(len(self._buffer) - count, len(times) - start)
+            block = self._buffer[count:count + n]
+            block[:, 0] = times[start:start + n]
+            block[:, 1:] = values[start:start + n]
+            self._position += n * self._width
+            start += n
+            if self._position == self._size:
+                self._hand_over()
+
+    @property
+    def num_samples(self) -> int:
+        """Number of samples logged so far."""
+        return self._num_handed_over + self._position // self._width
+
+    def close(self):
+        """Writes the remaining samples and finalizes both files."""
+        if self._file is None:
+            return
+        if self._position > 0:
+            self._hand_over()
+        self._full.put(None)
+        self._writer.join()
+        if self._error is not None:
+            raise self._error
+        self._file.seek(0)
+        num_samples = self.num_samples
+        self._file.write(_npy_header(self.names, num_samples, self._header_size))
+        self._file.close()
+        self._file = None
+        self.header["num_samples"] = num_samples
+        self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def load_adaptation_log(path_prefix: str, mmap_mode: str | None = 'r') -> tuple[dict, np.ndarray]:
+    """
+    Opens a log written by AdaptationLogger.
+
+    Args:
+        path_prefix: Path of the log files without extension.
+        mmap_mode: Memory-map mode passed to np.load (None reads the samples into memory).
+
+    Returns:
+        Tuple (header, samples): the JSON header as a dict and a structured array with
+        one field per column, e.g. samples['t'] and samples['C_hat'].
+    """
+    with open(f"{path_prefix}.json") as f:
+        header = json.load(f)
+    if header.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path_prefix}.json is not an adaptation log header")
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported adaptation log version {header.get('version')}")
+    # Logs with one field per trajectory have headers above np.load's default limit
+    max_header_size = max(10000, sum(len(name) + 16 for name in header["fields"]) + _NPY_HEADER_SIZE)
+    samples = np.load(f"{path_prefix}.npy", mmap_mode=mmap_mode, max_header_size=max_header_size)
+    if len(samples) != header["num_samples"]:
+        raise ValueError(f"{path_prefix}.npy holds {len(samples)} samples, the header {header['num_samples']} (log not closed?)")
+    return header, samples
+
+def _parse_value(text: str):
+    """Converts a header value to int or float where possible."""
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+def convert_text_log(text_path: str, path_prefix: str) -> tuple[dict, np.ndarray]:
+    """
+    Converts an old adapt_log_*.txt dump ('# Key: value' header lines, a column name
+    after '# --- Data ---' and one value per line) into the binary format. The time
+    column is rebuilt from the dt parameter (sample index if there is none).
+
+    Returns:
+        The converted log as returned by load_adaptation_log.
+    """
+    metadata = {}
+    parameters = {}
+    column = None
+    with open(text_path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('#'):
+                key, _, value = line.lstrip('#').partition(':')
+                if key.strip().startswith('Log saved for'):
+                    metadata['controller'] = key.strip()[len('Log saved for'):].strip()
+                elif key.strip() == 'Parameters':
+                    for item in re.split(r',\s*', value.strip()):
+                        name, _, number = item.partition('=')
+                        parameters[name.strip()] = _parse_value(number.strip())
+                elif value:
+                    metadata[key.strip()] = value.strip()
+            elif line:
+                column = line
+                break
+        values = np.loadtxt(f, dtype=float, ndmin=1)
+
+    controller_name = metadata.get('controller')
+    controller_id = metadata.get('Controller ID')
+    dt = parameters.get('dt', 1)
+    with AdaptationLogger(path_prefix, fields=(column,), controller_name=controller_name,
+                          controller_id=_parse_value(controller_id) if controller_id is not None else None,
+                          parameters=parameters, capacity=max(len(values), 1)) as logger:
+        if 'Timestamp' in metadata:
+            logger.header["timestamp"] = metadata['Timestamp']
+        logger.log_many(np.arange(len(values)) * dt, values)
+    return load_adaptation_log(path_prefix)
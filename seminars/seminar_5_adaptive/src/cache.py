@@ -0,0 +1,130 @@
+import os
+import json
+import types
+import hashlib
+import functools
+import numpy as np
+
+# Version of the key layout; bump it to invalidate existing cache entries
+CACHE_VERSION = 1
+
+class UncacheableError(TypeError):
+    """Raised when a configuration contains values that cannot be hashed reliably (e.g. lambdas)."""
+    pass
+
+def _canonical(obj, _seen: set | None = None):
+    """
+    Converts obj into a JSON-serializable description that depends only on its content:
+    numbers, strings, arrays (by dtype, shape and data hash), containers, classes (by
+    qualified name) and plain objects (by class and attributes, recursively).
+    """
+    if _seen is None:
+        _seen = set()
+    # Before the Python types: np.float64 subclasses float but has a different repr
+    if isinstance(obj, np.generic):
+        return _canonical(obj.item(), _seen)
+    if obj is None or isinstance(obj, (bool, int, str)):
+        return obj
+    if isinstance(obj, float):
+        return repr(obj) # repr round-trips exactly, unlike JSON floats for nan/inf
+    if isinstance(obj, np.ndarray):
+        array = np.ascontiguousarray(obj)
+        return {"__ndarray__": [array.dtype.str, list(array.shape), hashlib.sha256(array.tobytes()).hexdigest()]}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(item, _seen) for item in obj]
+    if isinstance(obj, dict):
+        return {str(key): _canonical(value, _seen) for key, value in sorted(obj.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(obj, type):
+        return {"__class__": f"{obj.__module__}.{obj.__qualname__}"}
+    if isinstance(obj, (types.FunctionType, types.MethodType, types.BuiltinFunctionType, functools.partial)):
+        # Code is not part of the hash, so two different functions would collide
+        raise UncacheableError(f"Cannot hash callable {obj!r}")
+    if hasattr(obj, '__dict__'):
+        if id(obj) in _seen:
+            raise UncacheableError(f"Cannot hash self-referencing object {obj!r}")
+        _seen = _seen | {id(obj)}
+        description = _canonical(type(obj), _seen)
+        description["attributes"] = _canonical(vars(obj), _seen)
+        return description
+    raise UncacheableError(f"Cannot hash object of type {type(obj).__name__}")
+
+def make_key(*parts) -> str:
+    """
+    Returns a content hash (hex sha256) of the given configuration parts.
+    Raises UncacheableError if a part cannot be described by content.
+    """
+    description = json.dumps([CACHE_VERSION, _canonical(list(parts))], sort_keys=True)
+    return hashlib.sha256(description.encode()).hexdigest()
+
+class SimulationCache:
+    def __init__(self, directory: str = ".sim_cache", max_bytes: int = 1 << 30):
+        """
+        Disk-backed memoization of simulation histories.
+
+        Every entry is one uncompressed .npz file named after the content hash of its
+        configuration. When the total size exceeds max_bytes, the least recently used
+        entries are deleted (hits refresh the file modification time).
+
+        Args:
+            directory: Cache directory (created if needed).
+            max_bytes: Size limit of the cache directory in bytes. Default: 1 GiB.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key: str) -> dict[str, np.ndarray] | None:
+        """Returns the arrays stored under key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with np.load(path) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+        except (FileNotFoundError, OSError, ValueError):
+            # Missing or unreadable (e.g. partially written) entry
+            self.misses += 1
+            return None
+        os.utime(path) # Mark as recently used
+        self.hits += 1
+        return arrays
+
+    def put(self, key: str, **arrays: np.ndarray):
+        """Stores the arrays under key and evicts old entries if the cache is too large."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        # Atomic rename so readers never see a partial entry
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits into max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz") and not name.endswith(".tmp.npz"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+    def clear(self):
+        """Deletes all entries."""
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                os.remove(os.path.join(self.directory, name))
+
+def get_cache(cache: "SimulationCache | str | None") -> "SimulationCache | None":
+    """Accepts a SimulationCache, a cache directory path or None."""
+    if cache is None or isinstance(cache, SimulationCache):
+        return cache
+    if isinstance(cache, str):
+        return SimulationCache(cache)
+    raise TypeError(f"Expected a SimulationCache, a directory path or None. Got: {type(cache).__name__}")
@@ -1,15 +1,72 @@
 from abc import ABC, abstractmethod
+import copy
+import typing
 import numpy as np
 from .system import System
 from .pendulum import Pendulum
 
 class Controller(ABC):
+    # Attributes that may hold one value per trajectory (arrays of shape (N,)) in ensemble simulations
+    per_trajectory_attributes: tuple[str, ...] = ()
+
     @abstractmethod
     def compute_control(self, system: System | None = None, t: float | None = None) -> float:
         """Computes the control input."""
         pass
 
+    def compute_control_batch(self, system: System, states: np.ndarray, t: float | None = None) -> np.ndarray | tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the control input for a batch of states.
+
+        Controllers that support ensemble simulation override this method.
+
+        Args:
+            system: The system instance (provides the model parameters).
+            states: Array of states, shape (N, state_dim).
+            t: Current time.
+
+        Returns:
+            Array of control values of shape (N,), or a tuple
+            (control_values, controller_indices) of two such arrays.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support batched control.")
+
+    def select(self, index: np.ndarray) -> 'Controller':
+        """
+        Returns a controller for a subset of the trajectories of an ensemble. Used by
+        EnsembleSimulator to drop finished trajectories (see termination.py).
+
+        The result is a shallow copy: per_trajectory_attributes given as arrays are
+        indexed, nested controllers are selected as well, everything else is shared.
+
+        Args:
+            index: Indices of the kept trajectories among the current ones.
+        """
+        selected = copy.copy(self)
+        for name, value in vars(self).items():
+            if isinstance(value, Controller):
+                setattr(selected, name, value.select(index))
+            elif name in self.per_trajectory_attributes and np.ndim(value) > 0:
+                setattr(selected, name, np.asarray(value)[index])
+        return selected
+
+    def get_event_functions(self, system: System) -> list[typing.Callable[[float, np.ndarray], float]]:
+        """
+        Returns the switching surfaces of the control law as event functions g(t, state).
+        The control law changes discontinuously when one of them changes sign.
+        Used by Simulator for event-driven integration.
+
+        Args:
+            system: The system instance.
+
+        Returns:
+            List of event functions. Default: empty (continuous control law).
+        """
+        return []
+
 class EnergyControl(Controller):
+    per_trajectory_attributes = ("max_torque",)
+
     def __init__(self, max_torque: float):
         """
         Initializes the Energy-based controller.
@@ -18,6 +75,8 @@ class EnergyControl(Controller):
             max_torque: Maximum allowed torque (tau_bar).
         """
         self.max_torque = max_torque
+        # Below this |theta_dot| the law pushes in the direction of sign(delta_E)
+        self.velocity_threshold = 1e-4
 
     def compute_control(self, system: System, t: float | None = None) -> float:
         """
@@ -48,8 +107,7 @@ class EnergyControl(Controller):
         # --- Modified control law --- 
         # If velocity is significant, use the standard law
         # If velocity is near zero, apply torque based on energy error direction
-        velocity_threshold = 1e-4
-        if abs(theta_dot) > velocity_threshold:
+        if abs(theta_dot) > self.velocity_threshold:
             control_input = self.max_torque * np.sign(delta_E * theta_dot)
         else:
             # Apply torque to increase energy (push away from stable equilibrium)
@@ -58,7 +116,56 @@ class EnergyControl(Controller):
 
         return control_input
 
+    def compute_control_batch(self, system: System, states: np.ndarray, t: float | None = None) -> np.ndarray:
+        """
+        Vectorized version of compute_control for an array of states.
+
+        Args:
+            system: The system instance (must be a Pendulum instance for this controller).
+            states: Array of states [theta, theta_dot], shape (N, 2).
+            t: Current time (not used).
+
+        Returns:
+            Array of control torques, shape (N,).
+        """
+        if not isinstance(system, Pendulum):
+            raise TypeError("EnergyControl requires a Pendulum system instance.")
+
+        theta_dot = states[:, 1]
+        delta_E = system.get_desired_energy() - system.get_energy_batch(states)
+
+        # Same modified law as compute_control: fall back to sign(delta_E) at rest
+        direction = np.where(np.abs(theta_dot) > self.velocity_threshold,
+                             np.sign(delta_E * theta_dot),
+                             np.sign(delta_E))
+        control_input = self.max_torque * direction
+        control_input[np.isclose(delta_E, 0)] = 0.0
+
+        return control_input
+
+    def get_event_functions(self, system: System) -> list[typing.Callable[[float, np.ndarray], float]]:
+        """
+        Returns the switching surfaces of the bang-bang law: delta_E * theta_dot = 0
+        and the edges |theta_dot| = velocity_threshold of the low-velocity band.
+
+        Args:
+            system: The system instance (must be a Pendulum instance for this controller).
+
+        Returns:
+            List of event functions g(t, state).
+        """
+        if not isinstance(system, Pendulum):
+            raise TypeError("EnergyControl requires a Pendulum system instance.")
+        E_des = system.get_desired_energy()
+        return [
+            lambda t, state: (E_des - system.get_energy(state)) * state[1],
+            lambda t, state: state[1] - self.velocity_threshold,
+            lambda t, state: state[1] + self.velocity_threshold,
+        ]
+
 class LinearFeedbackController(Controller):
+    per_trajectory_attributes = ("K1", "K2", "max_control")
+
     def __init__(self, K1: float, K2: float, target_state: np.ndarray, max_control: float | None = None):
         """
         Initializes the Linear Feedback Controller.
@@ -106,10 +213,35 @@ class LinearFeedbackController(Controller):
 
         return control_torque
 
+    def compute_control_batch(self, system: System, states: np.ndarray, t: float | None = None) -> np.ndarray:
+        """
+        Vectorized version of compute_control for an array of states.
+
+        Args:
+            system: The system instance.
+            states: Array of states [theta, theta_dot], shape (N, 2).
+            t: Current time (not used).
+
+        Returns:
+            Array of control torques, shape (N,).
+        """
+        error_theta = states[:, 0] - self.target_state[0]
+        error_theta_dot = states[:, 1] - self.target_state[1]
+
+        control_torque = self.K1 * error_theta + self.K2 * error_theta_dot
+
+        if self.max_control is not None:
+            control_torque = np.clip(control_torque, -self.max_control, self.max_control)
+
+        return control_torque
+
 # Ensure K1, K2, target_state are defined before this class if needed globally
 # Or pass them during instantiation
 
 class EnergyPDController(Controller):
+    per_trajectory_attributes = ("eps_theta_switch", "eps_E_switch_factor", "_eps_E_abs",
+                                 "max_torque", "switched_to_linear_batch")
+
     def __init__(self,
                  energy_controller: EnergyControl,
                  linear_controller: LinearFeedbackController,
@@ -127,14 +259,17 @@ class EnergyPDController(Controller):
                               for switching to the linear controller. Default: 0.2.
             eps_E_switch_factor: Factor for energy threshold (switch when E_tot > (1 - factor) * E_des).
                                Default: 0.01. E_des is determined from the system.
+
+        For compute_control_batch, eps_theta_switch and eps_E_switch_factor may also be
+        arrays of shape (N,) with one value per trajectory (e.g. for parameter sweeps).
         """
         if not isinstance(energy_controller, EnergyControl):
             raise TypeError("energy_controller must be an instance of EnergyControl")
         if not isinstance(linear_controller, LinearFeedbackController):
             raise TypeError("linear_controller must be an instance of LinearFeedbackController")
-        if not (0 < eps_E_switch_factor < 1):
+        if not np.all((0 < np.asarray(eps_E_switch_factor)) & (np.asarray(eps_E_switch_factor) < 1)):
             raise ValueError("eps_E_switch_factor must be between 0 and 1")
-        if eps_theta_switch <= 0:
+        if np.any(np.asarray(eps_theta_switch) <= 0):
             raise ValueError("eps_theta_switch must be positive")
 
         # Store the provided controllers and parameters
@@ -152,6 +287,7 @@ class EnergyPDController(Controller):
         self._E_des = None # Will be calculated on first call
         self._eps_E_abs = None # Will be calculated
         self.active_controller_index = 0 # 0: Energy, 1: Linear
+        self.switched_to_linear_batch = None # Per-trajectory switch flags for compute_control_batch
 
     def compute_control(self, system: System, t: float | None = None) -> tuple:
         """
@@ -176,6 +312,7 @@ class EnergyPDController(Controller):
             # Reset switch state and index when E_des is recalculated
             self.switched_to_linear = False
             self.active_controller_index = 0
+            self.switched_to_linear_batch = None
 
         # --- Control Logic ---
         control_torque = 0.0
@@ -209,10 +346,81 @@ class EnergyPDController(Controller):
 
         return control_torque, self.active_controller_index
 
+    def compute_control_batch(self, system: System, states: np.ndarray, t: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized version of compute_control for an array of states.
+        Each trajectory keeps its own switch flag in self.switched_to_linear_batch,
+        so a trajectory stays on the Linear controller once it has been captured.
+
+        Returns:
+            Tuple of (control_torques, active_controller_indices), both of shape (N,).
+        """
+        if not isinstance(system, Pendulum):
+            raise TypeError("EnergyPDController requires a Pendulum system instance for energy calculations.")
+
+        if self._E_des is None:
+            self._E_des = system.get_desired_energy()
+            if self._E_des is None or self._E_des <= 0:
+                 raise ValueError("Could not get a valid desired energy E_des from the system.")
+            self._eps_E_abs = self.eps_E_switch_factor * self._E_des
+            self.switched_to_linear = False
+            self.active_controller_index = 0
+            self.switched_to_linear_batch = None
+
+        num_states = states.shape[0]
+        if self.switched_to_linear_batch is None or self.switched_to_linear_batch.shape != (num_states,):
+            self.switched_to_linear_batch = np.zeros(num_states, dtype=bool)
+
+        # Check switching condition for trajectories that have not switched yet
+        E_tot = system.get_energy_batch(states)
+        angle_diff = (states[:, 0] - self.target_state[0] + np.pi) % (2 * np.pi) - np.pi
+        angle_condition = np.abs(angle_diff) < self.eps_theta_switch
+        energy_condition = E_tot > (self._E_des - self._eps_E_abs)
+        self.switched_to_linear_batch |= angle_condition & energy_condition
+
+        switched = self.switched_to_linear_batch
+        control_torque = np.where(switched,
+                                  self.linear_controller.compute_control_batch(system, states, t),
+                                  self.energy_controller.compute_control_batch(system, states, t))
+
+        # Apply torque limits (saturation) using max_torque from energy controller
+        control_torque = np.clip(control_torque, -self.max_torque, self.max_torque)
+
+        return control_torque, switched.astype(float)
+
+    def get_event_functions(self, system: System) -> list[typing.Callable[[float, np.ndarray], float]]:
+        """
+        Returns the switching surfaces of the combined law: those of the Energy controller
+        and the capture condition for the switch to the Linear controller.
+        After the switch the Linear controller is continuous, so no events are returned.
+
+        Args:
+            system: The system instance (must be a Pendulum instance for this controller).
+
+        Returns:
+            List of event functions g(t, state).
+        """
+        if not isinstance(system, Pendulum):
+            raise TypeError("EnergyPDController requires a Pendulum system instance for energy calculations.")
+        if self.switched_to_linear:
+            return []
+
+        E_des = system.get_desired_energy()
+        eps_E_abs = self.eps_E_switch_factor * E_des
+
+        def capture_event(t: float, state: np.ndarray) -> float:
+            # Positive exactly when both the angle and the energy switching conditions hold
+            angle_diff = (state[0] - self.target_state[0] + np.pi) % (2 * np.pi) - np.pi
+            return min(self.eps_theta_switch - abs(angle_diff),
+                       system.get_energy(state) - (E_des - eps_E_abs))
+
+        return self.energy_controller.get_event_functions(system) + [capture_event]
+
     def reset(self):
         """Resets the switching state for reuse in multiple simulations."""
         self.switched_to_linear = False
         self._E_des = None # Force recalculation of E_des on next call
         self._eps_E_abs = None
         self.active_controller_index = 0 # Reset index
+        self.switched_to_linear_batch = None
         # Note: This doesn't reset the underlying controllers' internal states if they have any. 
\ No newline at end of file
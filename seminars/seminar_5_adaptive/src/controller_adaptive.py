@@ -1,83 +1,293 @@
+from abc import abstractmethod
+import copy
 import numpy as np
+from .system import System
+from .controller import Controller
+from .integrators import Integrator
+from .adaptation_logger import AdaptationLogger
 
-class AdaptiveController:
+class AdaptiveControllerBase(Controller):
     """
-    Адаптивный контроллер для системы маятника.
+    Базовый класс адаптивных контроллеров.
+
+    Оценки параметров не хранятся в контроллере: они являются частью расширенного
+    состояния AdaptiveSystem [состояние объекта, оценки] и интегрируются вместе с
+    объектом тем же интегратором. Поэтому контроллер работает с Simulator и
+    EnsembleSimulator, а история оценок записывается в state_history без
+    дополнительных затрат на каждом шаге.
+
+    Все законы записаны для пакета состояний (N, ...); параметры контроллера могут
+    быть массивами формы (N,), тогда каждая траектория ансамбля использует свое
+    значение (например, перебор alpha за одну векторизованную симуляцию).
+    """
+
+    # Имена оцениваемых параметров (столбцы оценок в расширенном состоянии)
+    estimate_names: tuple[str, ...] = ()
+
+    @abstractmethod
+    def initial_estimate(self) -> np.ndarray:
+        """Начальные оценки, форма (num_estimates,) или (N, num_estimates)."""
+        pass
+
+    @abstractmethod
+    def control_law_batch(self, plant: System, states: np.ndarray, estimates: np.ndarray,
+                          t: float | None = None) -> np.ndarray:
+        """
+        Управление для пакета состояний объекта при заданных оценках.
+
+        Args:
+            plant (System): Объект управления (параметры модели).
+            states (np.ndarray): Состояния объекта, форма (N, state_dim).
+            estimates (np.ndarray): Оценки, форма (N, num_estimates).
+            t (float | None): Текущее время.
+
+        Returns:
+            np.ndarray: Управляющие воздействия, форма (N,).
+        """
+        pass
+
+    @abstractmethod
+    def estimate_derivative_batch(self, plant: System, states: np.ndarray, estimates: np.ndarray,
+                                  t: float | None = None) -> np.ndarray:
+        """
+        Закон адаптации: производные оценок для пакета состояний.
+
+        Returns:
+            np.ndarray: Производные оценок, форма (N, num_estimates).
+        """
+        pass
+
+    def compute_control(self, system: System, t: float | None = None) -> float:
+        """
+        Вычисляет управление для AdaptiveSystem по ее текущему расширенному состоянию.
+
+        Args:
+            system (AdaptiveSystem): Объект, расширенный оценками этого контроллера.
+            t (float | None): Текущее время.
+
+        Returns:
+            float: Управляющее воздействие.
+        """
+        return self.compute_control_batch(system, system.get_state()[None, :], t)[0]
+
+    def compute_control_batch(self, system: System, states: np.ndarray, t: float | None = None) -> np.ndarray:
+        """
+        Векторизованный compute_control для расширенных состояний формы (N, state_dim + num_estimates).
+        """
+        if not isinstance(system, AdaptiveSystem):
+            raise TypeError(f"{type(self).__name__} requires an AdaptiveSystem (plant augmented with the estimates).")
+        plant_states, estimates = system.split_state(states)
+        return self.control_law_batch(system.plant, plant_states, estimates, t)
+
+class AdaptiveController(AdaptiveControllerBase):
+    """
+    Адаптивный контроллер раскачки маятника.
 
     Оценивает неизвестный коэффициент трения C и использует его
     для вычисления управляющего момента.
     """
-    def __init__(self, m, l, g, max_torque, alpha, initial_state, dt):
+
+    estimate_names = ("C_hat",)
+    per_trajectory_attributes = ("max_torque", "alpha", "initial_C_hat")
+
+    def __init__(self, max_torque, alpha, initial_C_hat=0.0):
         """
-        Инициализация контроллера.
+        Инициализация контроллера. Параметры маятника (m, l, g) берутся из объекта.
 
         Args:
-            m (float): Масса маятника.
-            l (float): Длина маятника.
-            g (float): Ускорение свободного падения.
-            max_torque (float): Максимальный допустимый момент (tau_bar).
-            alpha (float): Скорость обучения для оценки трения.
-            initial_state (np.ndarray): Начальное состояние [theta, theta_dot].
-            dt (float): Шаг времени симуляции.
-        """
-        self.m = m
-        self.l = l
-        self.g = g
+            max_torque (float | np.ndarray): Максимальный допустимый момент (tau_bar).
+            alpha (float | np.ndarray): Скорость обучения для оценки трения.
+            initial_C_hat (float | np.ndarray): Начальная оценка коэффициента трения.
+        """
         self.max_torque = max_torque  # tau_bar
         self.alpha = alpha
-        self.dt = dt
+        self.initial_C_hat = initial_C_hat
+
+    def initial_estimate(self) -> np.ndarray:
+        """Начальная оценка C_hat, форма (1,) или (N, 1)."""
+        return np.asarray(self.initial_C_hat, dtype=float)[..., None]
 
-        # Начальная оценка коэффициента трения
-        self.C_hat = 0.0
+    def control_law_batch(self, plant, states, estimates, t=None):
+        """
+        a = tau_bar * sgn(delta_E * S2) + C_hat * m * l^2 * |S2| * S2
+        """
+        S2 = states[:, 1]
+        C_hat = estimates[:, 0]
+        delta_E = plant.get_desired_energy() - plant.get_energy_batch(states)
 
-        # Желаемая энергия (верхнее положение)
-        self.E_des = 2 * self.m * self.g * self.l
+        term1 = self.max_torque * np.sign(delta_E * S2)
+        term2 = C_hat * plant.m * plant.l**2 * np.abs(S2) * S2
+        return term1 + term2
 
-        print(f"Adaptive controller created with m={m}, l={l}, g={g}, max_torque={max_torque}, alpha={alpha}")
-        print(f"Initial C_hat = {self.C_hat}")
-        print(f"Desired Energy E_des = {self.E_des}")
+    def estimate_derivative_batch(self, plant, states, estimates, t=None):
+        """
+        C_hat_dot = alpha * delta_E * m * l^2 * |S2|^3
+        """
+        S2 = states[:, 1]
+        delta_E = plant.get_desired_energy() - plant.get_energy_batch(states)
+        C_hat_dot = self.alpha * delta_E * plant.m * plant.l**2 * np.abs(S2)**3
+        # Ограничение C_hat снизу нулем (трение не может быть отрицательным) здесь не применяется
+        return C_hat_dot[:, None]
 
-    def _calculate_energy(self, state):
-        """Вычисляет текущую полную энергию системы."""
-        theta, theta_dot = state
-        E_kin = 0.5 * self.m * self.l**2 * theta_dot**2
-        E_pot = self.m * self.g * self.l * (1 - np.cos(theta))
-        return E_kin + E_pot
+    def get_estimate(self, system):
+        """Возвращает текущую оценку коэффициента трения из состояния AdaptiveSystem."""
+        return system.split_state(system.get_state())[1][0]
 
-    def compute_control(self, state):
+    def make_logger(self, path_prefix, system, controller_id=None, capacity=65536, num_trajectories=None):
         """
-        Вычисляет управляющий момент и обновляет оценку трения.
+        Создает AdaptationLogger (см. adaptation_logger.py) для оценок этого контроллера
+        с его параметрами в заголовке. Передайте его в Simulator(..., adaptation_logger=...)
+        или EnsembleSimulator: цикл симуляции записывает оценки блоками во время работы
+        и закрывает журнал в конце run().
 
         Args:
-            state (np.ndarray): Текущее состояние [theta, theta_dot].
+            path_prefix (str): Путь к файлам журнала без расширения.
+            system (AdaptiveSystem): Расширенный объект симуляции.
+            controller_id (int | None): Необязательный идентификатор контроллера.
+            capacity (int): Размер буфера в отсчетах.
+            num_trajectories (int | None): Для ансамбля: число траекторий. Тогда у каждой
+                траектории j свои поля (например, C_hat_j).
 
         Returns:
-            float: Вычисленный управляющий момент (tau).
+            AdaptationLogger: Журнал.
         """
-        theta, theta_dot = state
-        S1 = theta
-        S2 = theta_dot
+        plant = system.plant
+        parameters = dict(m=plant.m, l=plant.l, g=plant.g,
+                          max_torque=np.asarray(self.max_torque).tolist(),
+                          alpha=np.asarray(self.alpha).tolist(),
+                          initial_C_hat=np.asarray(self.initial_C_hat).tolist())
+        fields = self.estimate_names
+        if num_trajectories is not None:
+            fields = tuple(f"{name}_{j}" for j in range(num_trajectories) for name in self.estimate_names)
+        return AdaptationLogger(path_prefix, fields=fields, controller_name=type(self).__name__,
+                                controller_id=controller_id, parameters=parameters, capacity=capacity)
 
-        # Вычисляем ошибку энергии
-        E_tot = self._calculate_energy(state)
-        delta_E = self.E_des - E_tot
+    def save_estimate_log(self, path_prefix, time_history, state_history, system, controller_id=None):
+        """
+        Сохраняет историю C_hat после симуляции в двоичный журнал (см. adaptation_logger.py)
+        одной записью log_many. Во время симуляции журнал ведет make_logger.
 
-        # Вычисляем управляющий момент 'a' (tau)
-        # a = tau_bar * sgn(delta_E * S2) + C_hat * m * l^2 * |S2| * S2
-        term1 = self.max_torque * np.sign(delta_E * S2)
-        term2 = self.C_hat * self.m * self.l**2 * np.abs(S2) * S2
-        torque = term1 + term2
+        Args:
+            path_prefix (str): Путь к файлам журнала без расширения.
+            time_history (np.ndarray): Моменты времени, форма (T,).
+            state_history (np.ndarray): Расширенные состояния, форма (T, state_dim + 1).
+            system (AdaptiveSystem): Расширенный объект симуляции.
+            controller_id (int | None): Необязательный идентификатор контроллера.
+
+        Returns:
+            str: path_prefix.
+        """
+        _, estimates = system.split_state(state_history)
+        with self.make_logger(path_prefix, system, controller_id, capacity=max(len(time_history), 1)) as logger:
+            logger.log_many(time_history, estimates)
+        return path_prefix
+
+class AdaptiveSystem(System):
+    def __init__(self, plant: System, controller: AdaptiveControllerBase, initial_estimate: np.ndarray | None = None):
+        """
+        Объект управления, расширенный оценками адаптивного контроллера.
+        Состояние: [состояние объекта, оценки]; производная оценок задается законом
+        адаптации контроллера, поэтому оценки интегрируются вместе с объектом.
+        Энергии и желаемая энергия считаются по состоянию объекта.
+
+        Args:
+            plant (System): Объект управления (например, Pendulum). Его собственное
+                состояние используется только как начальное.
+            controller (AdaptiveControllerBase): Контроллер, задающий закон адаптации.
+            initial_estimate (np.ndarray | None): Начальные оценки. По умолчанию:
+                controller.initial_estimate().
+        """
+        self.plant = plant
+        self.controller = controller
+        self.plant_dim = plant.get_state().shape[0]
+        # Оценки идут после [положений, скоростей] объекта; симплектические схемы интегрируют их явно
+        self.num_positions = plant.num_positions if plant.num_positions is not None else self.plant_dim // 2
+        if initial_estimate is None:
+            initial_estimate = controller.initial_estimate()
+        initial_estimate = np.asarray(initial_estimate, dtype=float)
+        if initial_estimate.ndim != 1:
+            raise ValueError("A single AdaptiveSystem needs one estimate vector; use augment() for ensembles.")
+        self.state = np.concatenate([plant.get_state(), initial_estimate])
+
+    def split_state(self, states: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Делит расширенные состояния (..., d) на состояния объекта и оценки (представления, без копий)."""
+        return states[..., :self.plant_dim], states[..., self.plant_dim:]
+
+    def augment(self, plant_states: np.ndarray, estimates: np.ndarray | None = None) -> np.ndarray:
+        """
+        Начальные расширенные состояния ансамбля.
+
+        Args:
+            plant_states (np.ndarray): Начальные состояния объекта, форма (N, state_dim).
+            estimates (np.ndarray | None): Начальные оценки, форма (num_estimates,) или
+                (N, num_estimates). По умолчанию: controller.initial_estimate().
+
+        Returns:
+            np.ndarray: Форма (N, state_dim + num_estimates).
+        """
+        plant_states = np.asarray(plant_states, dtype=float)
+        if estimates is None:
+            estimates = self.controller.initial_estimate()
+        estimates = np.broadcast_to(np.asarray(estimates, dtype=float),
+                                    (plant_states.shape[0], self.state.shape[0] - self.plant_dim))
+        return np.concatenate([plant_states, estimates], axis=1)
+
+    def get_state(self) -> np.ndarray:
+        return self.state
+
+    def set_state(self, state: np.ndarray):
+        state = np.asarray(state, dtype=float)
+        if state.shape != self.state.shape:
+            raise ValueError(f"State must be a Numpy array of shape {self.state.shape}")
+        self.state = state
+
+    def get_state_derivative(self, control_input: float, state: np.ndarray | None = None, t: float | None = None) -> np.ndarray:
+        if state is None:
+            state = self.get_state()
+        return self.get_state_derivative_batch(control_input, state[None, :], t)[0]
+
+    def get_state_derivative_batch(self, control_input: np.ndarray, states: np.ndarray, t: float | None = None) -> np.ndarray:
+        plant_states, estimates = self.split_state(states)
+        d_states_dt = np.empty_like(states, dtype=float)
+        d_states_dt[:, :self.plant_dim] = self.plant.get_state_derivative_batch(control_input, plant_states, t)
+        d_states_dt[:, self.plant_dim:] = self.controller.estimate_derivative_batch(self.plant, plant_states, estimates, t)
+        return d_states_dt
+
+    def step(self, dt: float, control_input: float, integrator: Integrator | None = None, t: float = 0.0):
+        current_state = self.get_state()
+        if integrator is None:
+            new_state = current_state + self.get_state_derivative(control_input, current_state, t) * dt
+        else:
+            new_state = integrator.step(
+                lambda t_, s: self.get_state_derivative(control_input, s, t_), t, current_state, dt,
+                self.num_positions)
+        self.set_state(new_state)
+        return new_state
+
+    def get_kinetic_energy(self, state: np.ndarray | None = None) -> float:
+        return self.plant.get_kinetic_energy(self.split_state(self.state if state is None else state)[0])
+
+    def get_potential_energy(self, state: np.ndarray | None = None) -> float:
+        return self.plant.get_potential_energy(self.split_state(self.state if state is None else state)[0])
+
+    def get_energy(self, state: np.ndarray | None = None) -> float:
+        return self.plant.get_energy(self.split_state(self.state if state is None else state)[0])
+
+    def get_kinetic_energy_batch(self, states: np.ndarray) -> np.ndarray:
+        return self.plant.get_kinetic_energy_batch(self.split_state(states)[0])
 
-        # Обновляем оценку трения C_hat
-        # C_hat_dot = alpha * delta_E * m * l^2 * |S2|^3
-        C_hat_dot = self.alpha * delta_E * self.m * self.l**2 * np.abs(S2)**3
-        self.C_hat += C_hat_dot * self.dt # Простое Эйлерово интегрирование
+    def get_potential_energy_batch(self, states: np.ndarray) -> np.ndarray:
+        return self.plant.get_potential_energy_batch(self.split_state(states)[0])
 
-        # Ограничиваем C_hat снизу нулем, если это физически оправдано (трение не может быть отрицательным)
-        # self.C_hat = max(0, self.C_hat) # Опционально
+    def get_energy_batch(self, states: np.ndarray) -> np.ndarray:
+        return self.plant.get_energy_batch(self.split_state(states)[0])
 
-        return torque
+    def get_desired_energy(self) -> float:
+        return self.plant.get_desired_energy()
 
-    def get_estimate(self):
-        """Возвращает текущую оценку коэффициента трения."""
-        return self.C_hat 
\ No newline at end of file
+    def select(self, index: np.ndarray) -> 'AdaptiveSystem':
+        """Копия для части траекторий ансамбля: объект и закон адаптации выбираются для index."""
+        selected = copy.copy(self)
+        selected.plant = self.plant.select(index)
+        selected.controller = self.controller.select(index)
+        return selected
@@ -0,0 +1,199 @@
+import numpy as np
+from tqdm import tqdm # Optional: for progress bar
+
+from .system import System
+from .controller import Controller
+from .integrators import Integrator, get_integrator
+from .metrics import Metric
+from .termination import TerminationCondition, check_termination
+from .adaptation_logger import AdaptationLogger
+
+class EnsembleSimulator:
+    def __init__(self, system: System, controller: Controller, initial_states: np.ndarray, dt: float, num_steps: int,
+                 integrator: Integrator | str | None = None,
+                 metrics: list[Metric] | None = None,
+                 store_history: bool = True,
+                 termination: list[TerminationCondition] | None = None,
+                 adaptation_logger: AdaptationLogger | None = None):
+        """
+        Initializes a vectorized simulation of many trajectories of the same system.
+        All trajectories are advanced together as one (N, state_dim) array.
+
+        Args:
+            system: The system instance. Used only as the model (parameters);
+                    its own state is not modified.
+            controller: The controller to use. Must implement compute_control_batch.
+            initial_states: Array of initial states, shape (N, state_dim).
+            dt: Simulation time step.
+            num_steps: Total number of simulation steps.
+            integrator: Integration scheme, as an Integrator instance or a name from
+                        integrators.INTEGRATORS. Default: None (explicit Euler).
+            metrics: Optional metrics (see metrics.py), updated with every sample of all
+                     trajectories. Their values are returned by get_metrics().
+            store_history: If False, no histories are allocated (only the final states
+                           and the metrics are kept), so memory does not grow with num_steps.
+            termination: Optional termination conditions (see termination.py), checked at
+                         every sample. A trajectory for which one of them holds ends there:
+                         it is dropped from the state array, and the controller and system
+                         are replaced by their select() for the remaining trajectories, so
+                         finished trajectories cost nothing afterwards. Its later history
+                         samples are NaN. See termination_times and termination_reasons.
+            adaptation_logger: Optional AdaptationLogger for the estimates of an AdaptiveSystem,
+                               with one field per trajectory and estimate (see
+                               AdaptiveController.make_logger with num_trajectories). run() logs
+                               every sample (NaN for finished trajectories) and closes it at the end.
+        """
+        self.system = system
+        self.controller = controller
+        self.dt = dt
+        self.num_steps = num_steps
+        self.integrator = get_integrator(integrator)
+        self.time_vector = np.linspace(0, dt * num_steps, num_steps + 1)
+
+        self.initial_states = np.array(initial_states, dtype=float)
+        if self.initial_states.ndim != 2:
+            raise ValueError(f"Initial states must be an array of shape (N, state_dim). Got: {self.initial_states.shape}")
+        num_trajectories, state_dim = self.initial_states.shape
+        self.metrics = list(metrics) if metrics is not None else []
+        self.store_history = store_history
+        self.termination = list(termination) if termination is not None else []
+        if adaptation_logger is not None and not hasattr(system, 'split_state'):
+            raise TypeError("adaptation_logger requires an AdaptiveSystem (plant augmented with the estimates).")
+        self.adaptation_logger = adaptation_logger
+        self.final_states = None
+        # Time and condition name per trajectory (NaN / '' if it ran to the end)
+        self.termination_times = None
+        self.termination_reasons = None
+
+        if not store_history:
+            self.state_history = None
+            self.control_history = None
+            self.time_history = None
+            return
+
+        # History storage, one row per trajectory (NaN after the end of a terminated trajectory)
+        self.state_history = np.full((num_trajectories, num_steps + 1, state_dim), np.nan)
+        # Control history stores [control_value, controller_index] or [control_value, nan]
+        self.control_history = np.full((num_trajectories, num_steps, 2), np.nan)
+        self.time_history = np.zeros(num_steps + 1)
+
+    def run(self, progress: bool = True):
+        """
+        Runs the simulation loop for all trajectories at once.
+
+        Args:
+            progress: Show a tqdm progress bar (if tqdm is available). Default: True.
+        """
+        try:
+            self._run_loop(progress)
+        finally:
+            if self.adaptation_logger is not None:
+                self.adaptation_logger.close()
+
+    def _run_loop(self, progress: bool):
+        num_trajectories = self.initial_states.shape[0]
+        states = self.initial_states.copy()
+        system, controller = self.system, self.controller
+        store = self.store_history
+        if store:
+            self.state_history[:, 0, :] = states
+            self.time_history[0] = 0
+        for metric in self.metrics:
+            metric.reset(num_trajectories)
+        for condition in self.termination:
+            condition.reset(num_trajectories)
+        self.final_states = np.empty_like(states)
+        self.termination_times = np.full(num_trajectories, np.nan)
+        reason = np.full(num_trajectories, -1)
+        # Trajectory numbers of the rows of states; index stays None while all of them run
+        running = np.arange(num_trajectories)
+        index = None
+        logger = self.adaptation_logger
+        if logger is not None:
+            # One log row per sample: the estimates of all trajectories, trajectory major
+            estimate_row = np.full((1, states.size - num_trajectories * system.plant_dim), np.nan)
+            estimates = estimate_row.reshape(num_trajectories, -1)
+
+        step_range = range(self.num_steps)
+        if progress and 'tqdm' in globals():
+            step_range = tqdm(step_range, desc="Ensemble Progress", leave=False)
+
+        for i in step_range:
+            current_time = self.time_vector[i]
+            if logger is not None:
+                estimates[running] = system.split_state(states)[1]
+                logger.log_many(np.array([current_time]), estimate_row)
+            # 0. End the trajectories for which a termination condition holds at this sample
+            if self.termination:
+                terminated, condition_index = check_termination(self.termination, current_time, states, system, index)
+                if terminated.any():
+                    finished = running[terminated]
+                    for metric in self.metrics:
+                        metric.update(current_time, states[terminated], None, None, system, finished)
+                    self.final_states[finished] = states[terminated]
+                    self.termination_times[finished] = current_time
+                    reason[finished] = condition_index[terminated]
+                    if logger is not None:
+                        estimates[finished] = np.nan
+                    keep = np.flatnonzero(~terminated)
+                    states, running = states[keep], running[keep]
+                    system, controller = system.select(keep), controller.select(keep)
+                    index = running
+                    if len(running) == 0:
+                        if store:
+                            # Keep the time grid complete
+                            self.time_history[i + 1:] = self.time_vector[i:-1] + self.dt
+                        break
+            rows = slice(None) if index is None else index
+
+            # 1. Compute control inputs for all trajectories
+            # Controller can return an array of controls or a tuple (controls, indices)
+            control_output = controller.compute_control_batch(system, states, current_time)
+
+            if isinstance(control_output, tuple):
+                control_input, controller_index = control_output
+                if store:
+                    self.control_history[rows, i, 1] = controller_index
+            else:
+                control_input = control_output
+                controller_index = None
+            control_input = np.broadcast_to(np.asarray(control_input, dtype=float), (states.shape[0],))
+            if store:
+                self.control_history[rows, i, 0] = control_input
+            for metric in self.metrics:
+                metric.update(current_time, states, control_input, controller_index, system, index)
+
+            # 2. Step all trajectories with the control held constant (same scheme as System.step)
+            if self.integrator is None:
+                state_derivatives = system.get_state_derivative_batch(control_input, states, current_time)
+                states = states + state_derivatives * self.dt
+            else:
+                states = self.integrator.step(
+                    lambda t, s: system.get_state_derivative_batch(control_input, s, t),
+                    current_time, states, self.dt, system.num_positions)
+
+            # 3. Store results
+            if store:
+                self.state_history[rows, i + 1, :] = states
+                self.time_history[i + 1] = current_time + self.dt
+
+        if len(running) > 0:
+            if logger is not None:
+                estimates[running] = system.split_state(states)[1]
+                logger.log_many(self.time_vector[-1:], estimate_row)
+            for metric in self.metrics:
+                metric.update(self.time_vector[-1], states, None, None, system, index)
+            self.final_states[running] = states
+        # reason -1 (ran to the end) picks the trailing ""
+        names = np.array([condition.name for condition in self.termination] + [""])
+        self.termination_reasons = names[reason]
+
+    def get_results(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the simulation results (time, states of shape (N, num_steps+1, state_dim), controls)."""
+        if not self.store_history:
+            raise ValueError("Histories were not stored (store_history=False); use final_states and get_metrics().")
+        return self.time_history, self.state_history, self.control_history
+
+    def get_metrics(self) -> dict[str, np.ndarray]:
+        """Returns the value of every metric for every trajectory, by metric name."""
+        return {metric.name: metric.result() for metric in self.metrics}
@@ -0,0 +1,221 @@
+from abc import ABC, abstractmethod
+import os
+import glob
+import typing
+import numpy as np
+
+class HistorySink(ABC):
+    """
+    Destination for simulation histories streamed in chunks by Simulator.
+    Every chunk holds consecutive samples: times (n,), states (n, state_dim) and
+    controls (n, 2) as [control_value, controller_index]. The control of a sample is
+    the one applied from that sample onwards (nan for the final sample).
+    """
+
+    def open(self, num_samples: int, state_dim: int):
+        """
+        Called once before the first chunk.
+
+        Args:
+            num_samples: Total number of samples that will be written (fewer if the run
+                         ends early, see termination.py).
+            state_dim: Dimension of the state vector.
+        """
+        pass
+
+    @abstractmethod
+    def write(self, time_chunk: np.ndarray, state_chunk: np.ndarray, control_chunk: np.ndarray):
+        """Writes one chunk. The arrays are reused by the caller after this call returns."""
+        pass
+
+    def close(self):
+        """Called once after the last chunk."""
+        pass
+
+class CallbackSink(HistorySink):
+    def __init__(self, callback: typing.Callable[[np.ndarray, np.ndarray, np.ndarray], None]):
+        """
+        Passes every chunk to a user function.
+
+        Args:
+            callback: Function callback(time_chunk, state_chunk, control_chunk).
+                      The arrays are only valid during the call (copy them to keep them).
+        """
+        self.callback = callback
+
+    def write(self, time_chunk: np.ndarray, state_chunk: np.ndarray, control_chunk: np.ndarray):
+        self.callback(time_chunk, state_chunk, control_chunk)
+
+class MemmapSink(HistorySink):
+    def __init__(self, path_prefix: str):
+        """
+        Writes the histories into three memory-mapped .npy files:
+        <path_prefix>_time.npy, <path_prefix>_state.npy and <path_prefix>_control.npy.
+        Read them back with load_memmap_history.
+
+        Args:
+            path_prefix: Path prefix of the output files.
+        """
+        self.path_prefix = path_prefix
+        self._time = None
+        self._state = None
+        self._control = None
+        self._position = 0
+
+    def open(self, num_samples: int, state_dim: int):
+        directory = os.path.dirname(self.path_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        open_memmap = np.lib.format.open_memmap
+        self._time = open_memmap(f"{self.path_prefix}_time.npy", mode='w+', dtype=float, shape=(num_samples,))
+        self._state = open_memmap(f"{self.path_prefix}_state.npy", mode='w+', dtype=float, shape=(num_samples, state_dim))
+        self._control = open_memmap(f"{self.path_prefix}_control.npy", mode='w+', dtype=float, shape=(num_samples, 2))
+        self._position = 0
+
+    def write(self, time_chunk: np.ndarray, state_chunk: np.ndarray, control_chunk: np.ndarray):
+        end = self._position + len(time_chunk)
+        self._time[self._position:end] = time_chunk
+        self._state[self._position:end] = state_chunk
+        self._control[self._position:end] = control_chunk
+        self._position = end
+
+    def close(self):
+        num_allocated = len(self._time) if self._time is not None else 0
+        for array in (self._time, self._state, self._control):
+            if array is not None:
+                array.flush()
+        # Drop the maps before the files are shortened
+        self._time = self._state = self._control = None
+        if self._position < num_allocated:
+            # The run ended early: keep only the samples written
+            for suffix in ("time", "state", "control"):
+                _truncate_npy(f"{self.path_prefix}_{suffix}.npy", self._position)
+
+def _truncate_npy(path: str, num_rows: int):
+    """Shortens a C-ordered .npy file to its first num_rows rows in place."""
+    with open(path, 'r+b') as f:
+        major, _ = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if major == 1 else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        data_offset = f.tell()
+        # The new shape is not longer than the old one, so the header keeps its size
+        header = repr({'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': fortran_order,
+                       'shape': (num_rows,) + shape[1:]})
+        header_start = 8 + (2 if major == 1 else 4)
+        f.seek(header_start)
+        f.write((header.ljust(data_offset - header_start - 1) + '\n').encode('latin1'))
+        f.truncate(data_offset + num_rows * int(np.prod(shape[1:], dtype=int)) * dtype.itemsize)
+
+class ChunkedNpzSink(HistorySink):
+    def __init__(self, directory: str):
+        """
+        Writes every chunk to its own file <directory>/chunk_XXXXXX.npz (uncompressed).
+        Unlike MemmapSink, the total length does not have to be preallocated.
+        Read them back with load_chunked_history.
+
+        Args:
+            directory: Output directory (created if needed).
+        """
+        self.directory = directory
+        self._chunk_index = 0
+
+    def open(self, num_samples: int, state_dim: int):
+        os.makedirs(self.directory, exist_ok=True)
+        self._chunk_index = 0
+
+    def write(self, time_chunk: np.ndarray, state_chunk: np.ndarray, control_chunk: np.ndarray):
+        path = os.path.join(self.directory, f"chunk_{self._chunk_index:06d}.npz")
+        np.savez(path, time=time_chunk, state=state_chunk, control=control_chunk)
+        self._chunk_index += 1
+
+class ChunkedHistoryWriter:
+    def __init__(self, sink: HistorySink, num_steps: int, state_dim: int, chunk_size: int = 65536, decimation: int = 1):
+        """
+        Buffers samples in fixed-size arrays and flushes them to a sink, keeping
+        every decimation-th sample (the final sample is always kept).
+
+        Args:
+            sink: Destination of the chunks.
+            num_steps: Number of simulation steps (num_steps + 1 samples before decimation).
+            state_dim: Dimension of the state vector.
+            chunk_size: Number of samples per chunk.
+            decimation: Keep every decimation-th sample.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        if decimation < 1:
+            raise ValueError("decimation must be positive")
+        self.sink = sink
+        self.num_steps = num_steps
+        self.decimation = decimation
+        self._time = np.zeros(chunk_size)
+        self._state = np.zeros((chunk_size, state_dim))
+        self._control = np.full((chunk_size, 2), np.nan)
+        self._count = 0
+        self.sink.open(history_num_samples(num_steps, decimation), state_dim)
+
+    def append(self, sample_index: int, t: float, state: np.ndarray, control_vector: np.ndarray | None,
+               final: bool = False):
+        """
+        Appends sample sample_index (0..num_steps) if it survives decimation.
+
+        Args:
+            sample_index: Index of the sample on the full time grid.
+            t: Time of the sample.
+            state: State at time t.
+            control_vector: [control_value, controller_index] applied from t on, or None (final sample).
+            final: The sample is the final one of a run that ended early (always kept).
+        """
+        if sample_index % self.decimation != 0 and sample_index != self.num_steps and not final:
+            return
+        k = self._count
+        self._time[k] = t
+        self._state[k] = state
+        if control_vector is None:
+            self._control[k] = np.nan
+        else:
+            self._control[k] = control_vector
+        self._count += 1
+        if self._count == len(self._time):
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered samples to the sink."""
+        if self._count > 0:
+            n = self._count
+            self.sink.write(self._time[:n], self._state[:n], self._control[:n])
+            self._count = 0
+
+    def close(self):
+        """Flushes the remaining samples and closes the sink."""
+        self.flush()
+        self.sink.close()
+
+def history_num_samples(num_steps: int, decimation: int = 1) -> int:
+    """Number of samples kept from num_steps + 1 samples with the given decimation."""
+    return num_steps // decimation + 1 + (1 if num_steps % decimation else 0)
+
+def load_memmap_history(path_prefix: str, mmap_mode: str | None = 'r') -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Opens histories written by MemmapSink without reading them into memory.
+
+    Returns:
+        Tuple (time, states, controls) of memory-mapped arrays.
+    """
+    return (np.load(f"{path_prefix}_time.npy", mmap_mode=mmap_mode),
+            np.load(f"{path_prefix}_state.npy", mmap_mode=mmap_mode),
+            np.load(f"{path_prefix}_control.npy", mmap_mode=mmap_mode))
+
+def iter_chunked_history(directory: str) -> typing.Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Yields (time, states, controls) for every chunk written by ChunkedNpzSink, in order."""
+    for path in sorted(glob.glob(os.path.join(directory, "chunk_*.npz"))):
+        with np.load(path) as chunk:
+            yield chunk['time'], chunk['state'], chunk['control']
+
+def load_chunked_history(directory: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Loads and concatenates all chunks written by ChunkedNpzSink."""
+    chunks = list(iter_chunked_history(directory))
+    if not chunks:
+        raise FileNotFoundError(f"No history chunks found in {directory}")
+    times, states, controls = zip(*chunks)
+    return np.concatenate(times), np.concatenate(states), np.concatenate(controls)
@@ -0,0 +1,195 @@
+"""
+Compiled closed-loop kernels for the built-in Pendulum and its controllers.
+
+The kernels reproduce Simulator.run (explicit Euler, no events) step by step with
+the same floating-point operations, so the histories match the object-oriented
+path. Numba is optional: without it the same kernels run as plain Python.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback decorator: leaves the function uncompiled."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+from .pendulum import Pendulum
+from .controller import Controller, EnergyControl, LinearFeedbackController, EnergyPDController
+
+# Controller type codes used by the kernel
+ENERGY_CONTROL = 0
+LINEAR_FEEDBACK = 1
+ENERGY_PD = 2
+
+# Layout of the controller parameter vector
+_P_MAX_TORQUE = 0      # EnergyControl.max_torque
+_P_VELOCITY_THRESHOLD = 1
+_P_K1 = 2              # LinearFeedbackController
+_P_K2 = 3
+_P_THETA_TARGET = 4
+_P_THETA_DOT_TARGET = 5
+_P_MAX_CONTROL = 6     # nan if no limit
+_P_EPS_THETA = 7       # EnergyPDController
+_P_EPS_E_FACTOR = 8
+_NUM_PARAMS = 9
+
+@njit(cache=True)
+def _energy_control(m, l, g, theta, theta_dot, params):
+    E_kin = 0.5 * m * (l * theta_dot)**2
+    E_pot = m * g * l * (1 - np.cos(theta))
+    delta_E = 2 * m * g * l - (E_kin + E_pot)
+    if abs(delta_E) <= 1e-8: # np.isclose(delta_E, 0)
+        return 0.0
+    if abs(theta_dot) > params[_P_VELOCITY_THRESHOLD]:
+        return params[_P_MAX_TORQUE] * np.sign(delta_E * theta_dot)
+    return params[_P_MAX_TORQUE] * np.sign(delta_E)
+
+@njit(cache=True)
+def _linear_control(theta, theta_dot, params):
+    control_torque = params[_P_K1] * (theta - params[_P_THETA_TARGET]) + params[_P_K2] * (theta_dot - params[_P_THETA_DOT_TARGET])
+    max_control = params[_P_MAX_CONTROL]
+    if not np.isnan(max_control):
+        control_torque = min(max(control_torque, -max_control), max_control)
+    return control_torque
+
+@njit(cache=True)
+def _closed_loop_kernel(m, l, b, g, controller_type, params, switched, state0, time_vector, dt,
+                        state_history, control_history, time_history):
+    """
+    Runs the Euler closed loop and fills the preallocated histories in place.
+
+    Returns:
+        Final value of the EnergyPDController switch flag.
+    """
+    theta = state0[0]
+    theta_dot = state0[1]
+    state_history[0, 0] = theta
+    state_history[0, 1] = theta_dot
+    time_history[0] = 0.0
+
+    E_des = 2 * m * g * l
+    eps_E_abs = params[_P_EPS_E_FACTOR] * E_des
+
+    for i in range(time_vector.shape[0] - 1):
+        current_time = time_vector[i]
+
+        # 1. Control
+        if controller_type == ENERGY_CONTROL:
+            tau = _energy_control(m, l, g, theta, theta_dot, params)
+        elif controller_type == LINEAR_FEEDBACK:
+            tau = _linear_control(theta, theta_dot, params)
+        else:
+            if not switched:
+                E_tot = 0.5 * m * (l * theta_dot)**2 + m * g * l * (1 - np.cos(theta))
+                angle_diff = (theta - params[_P_THETA_TARGET] + np.pi) % (2 * np.pi) - np.pi
+                if abs(angle_diff) < params[_P_EPS_THETA] and E_tot > (E_des - eps_E_abs):
+                    switched = True
+            if switched:
+                tau = _linear_control(theta, theta_dot, params)
+            else:
+                tau = _energy_control(m, l, g, theta, theta_dot, params)
+            max_torque = params[_P_MAX_TORQUE]
+            tau = min(max(tau, -max_torque), max_torque)
+            control_history[i, 1] = 1.0 if switched else 0.0
+        control_history[i, 0] = tau
+
+        # 2. Euler step
+        theta_ddot = -(g / l) * np.sin(theta) - (b / (m * l**2)) * theta_dot + tau / (m * l**2)
+        theta, theta_dot = theta + theta_dot * dt, theta_dot + theta_ddot * dt
+
+        # 3. Store results
+        state_history[i + 1, 0] = theta
+        state_history[i + 1, 1] = theta_dot
+        time_history[i + 1] = current_time + dt
+
+    return switched
+
+def _controller_params(controller: Controller) -> tuple[int, np.ndarray]:
+    """Packs a supported controller into (controller_type, params) for the kernel."""
+    params = np.full(_NUM_PARAMS, np.nan)
+
+    def pack_energy(energy_controller: EnergyControl):
+        params[_P_MAX_TORQUE] = energy_controller.max_torque
+        params[_P_VELOCITY_THRESHOLD] = energy_controller.velocity_threshold
+
+    def pack_linear(linear_controller: LinearFeedbackController):
+        params[_P_K1] = linear_controller.K1
+        params[_P_K2] = linear_controller.K2
+        params[_P_THETA_TARGET] = linear_controller.target_state[0]
+        params[_P_THETA_DOT_TARGET] = linear_controller.target_state[1]
+        if linear_controller.max_control is not None:
+            params[_P_MAX_CONTROL] = linear_controller.max_control
+
+    # Exact type checks: subclasses may change the control law
+    if type(controller) is EnergyControl:
+        pack_energy(controller)
+        return ENERGY_CONTROL, params
+    if type(controller) is LinearFeedbackController:
+        pack_linear(controller)
+        return LINEAR_FEEDBACK, params
+    if type(controller) is EnergyPDController \
+            and type(controller.energy_controller) is EnergyControl \
+            and type(controller.linear_controller) is LinearFeedbackController:
+        pack_energy(controller.energy_controller)
+        pack_linear(controller.linear_controller)
+        params[_P_MAX_TORQUE] = controller.max_torque
+        # The switch check uses the target of the combined controller
+        params[_P_THETA_TARGET] = controller.target_state[0]
+        params[_P_EPS_THETA] = controller.eps_theta_switch
+        params[_P_EPS_E_FACTOR] = controller.eps_E_switch_factor
+        return ENERGY_PD, params
+    raise TypeError(f"No compiled kernel for controller {type(controller).__name__}.")
+
+def supports_jit(system, controller: Controller) -> bool:
+    """Returns True if the system/controller pair has a compiled kernel."""
+    if type(system) is not Pendulum:
+        return False
+    try:
+        _controller_params(controller)
+    except TypeError:
+        return False
+    return True
+
+def run_closed_loop(system: Pendulum, controller: Controller, time_vector: np.ndarray, dt: float,
+                    state_history: np.ndarray, control_history: np.ndarray, time_history: np.ndarray):
+    """
+    Runs the compiled closed loop from the current system state and fills the
+    histories in place. Leaves the system and controller in the same state as
+    Simulator.run would.
+
+    Args:
+        system: Pendulum instance (initial state and parameters).
+        controller: EnergyControl, LinearFeedbackController or EnergyPDController.
+        time_vector: Time grid, shape (num_steps + 1,).
+        dt: Simulation time step.
+        state_history: Output array, shape (num_steps + 1, 2).
+        control_history: Output array, shape (num_steps, 2), pre-filled with nan.
+        time_history: Output array, shape (num_steps + 1,).
+    """
+    controller_type, params = _controller_params(controller)
+
+    switched = False
+    if controller_type == ENERGY_PD:
+        if controller._E_des is None:
+            # Same initialization as on the first EnergyPDController.compute_control call
+            controller._E_des = system.get_desired_energy()
+            controller._eps_E_abs = controller.eps_E_switch_factor * controller._E_des
+            controller.switched_to_linear = False
+        switched = controller.switched_to_linear
+
+    switched = _closed_loop_kernel(
+        float(system.m), float(system.l), float(system.b), float(system.g),
+        controller_type, params, switched,
+        np.asarray(system.get_state(), dtype=float), time_vector, float(dt),
+        state_history, control_history, time_history)
+
+    if controller_type == ENERGY_PD and time_vector.shape[0] > 1:
+        controller.switched_to_linear = bool(switched)
+        controller.active_controller_index = 1 if switched else 0
+    system.set_state(state_history[-1].copy())
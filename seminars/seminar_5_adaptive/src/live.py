@@ -0,0 +1,283 @@
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from .system import System
+from .lod import minmax_indices, axes_pixel_width
+
+class RingBuffer:
+    def __init__(self, capacity: int, width: int):
+        """
+        Preallocated buffer of the last capacity rows of width floats.
+        The producer appends rows with push; the consumer takes the rows written since
+        its previous call with drain. If more than capacity rows were pushed in between,
+        the oldest ones are overwritten and drain reports how many were lost.
+
+        Args:
+            capacity: Number of rows kept.
+            width: Number of floats per row.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.full((capacity, width), np.nan)
+        self._written = 0 # Total number of rows pushed
+        self._read = 0 # Total number of rows drained (or dropped)
+
+    def __len__(self) -> int:
+        """Number of rows pushed but not drained yet (at most capacity)."""
+        return min(self._written - self._read, self.capacity)
+
+    def push(self, row: np.ndarray):
+        """Appends one row, overwriting the oldest row when the buffer is full."""
+        self._data[self._written % self.capacity] = row
+        self._written += 1
+
+    def push_many(self, rows: np.ndarray):
+        """Appends several rows (shape (n, width)), oldest first."""
+        count = len(rows)
+        self._written += count - min(count, self.capacity)
+        rows = rows[count - min(count, self.capacity):] # Older rows would be overwritten anyway
+        first = self._written % self.capacity
+        split = min(len(rows), self.capacity - first)
+        self._data[first:first + split] = rows[:split]
+        self._data[:len(rows) - split] = rows[split:]
+        self._written += len(rows)
+
+    def next_row(self) -> np.ndarray:
+        """Appends one row and returns it as a writable view, so a producer can fill it in place."""
+        row = self._data[self._written % self.capacity]
+        self._written += 1
+        return row
+
+    def drain(self) -> tuple[np.ndarray, int]:
+        """
+        Takes the rows pushed since the previous drain, oldest first.
+
+        Returns:
+            Tuple (rows, num_dropped): a copy of the rows, shape (n, width), and the number
+            of older rows that were overwritten before they could be drained.
+        """
+        num_dropped = max(self._written - self._read - self.capacity, 0)
+        start, stop = self._read + num_dropped, self._written
+        self._read = stop
+        first, last = start % self.capacity, stop % self.capacity
+        if stop - start == 0:
+            return self._data[:0].copy(), num_dropped
+        if first < last:
+            return self._data[first:last].copy(), num_dropped
+        # The rows wrap around the end of the buffer
+        return np.concatenate([self._data[first:], self._data[:last]]), num_dropped
+
+class LivePlotter:
+    def __init__(self, system: System, fps: float = 20.0, max_overhead: float = 0.03,
+                 capacity: int = 65536, show: bool = True):
+        """
+        Live view of a running Simulator: theta and theta_dot, control, and total energy
+        (with the desired energy, if the system defines one) against time.
+
+        Simulator(..., live=LivePlotter(system)) writes [t, state, control_value,
+        controller_index] into a RingBuffer every step. At most fps times per second the
+        new rows are drained, their energy is computed in one batch, they are reduced with
+        the min/max decimation of lod.py to the pixels they cover and appended to the lines.
+        The time axis spans the whole run, so only the lines are redrawn (blitting on
+        interactive backends); the full figure is redrawn only when a value leaves the
+        current y limits. The frame rate is further lowered so that drawing takes at most
+        max_overhead of the wall time.
+
+        Args:
+            system: The simulated system (provides get_energy_batch and get_desired_energy).
+            fps: Maximum number of frames per second.
+            max_overhead: Maximum fraction of the wall time spent drawing. Default: 0.03.
+            capacity: Ring buffer size in samples; must exceed the samples simulated per
+                      frame, otherwise the oldest samples of a frame are not drawn.
+            show: Show the figure in an interactive window (plt.show(block=False)).
+        """
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        if not 0 < max_overhead <= 1:
+            raise ValueError("max_overhead must be in (0, 1]")
+        self.system = system
+        self.frame_interval = 1.0 / fps
+        self.max_overhead = max_overhead
+        self.capacity = capacity
+        self.show = show
+        self.num_frames = 0
+        self.num_dropped = 0
+        # Samples between two frame-rate checks (and per publish_many call of Simulator)
+        self.block_size = 256
+        self.buffer = None
+        self.fig = None
+
+    def open(self, t_end: float, state_dim: int):
+        """
+        Creates the figure and the ring buffer. Called by Simulator before the first step.
+
+        Args:
+            t_end: Final simulation time (the time axis spans [0, t_end]).
+            state_dim: Dimension of the state vector.
+        """
+        self.state_dim = state_dim
+        self.buffer = RingBuffer(self.capacity, 1 + state_dim + 2)
+        self.t_end = t_end if t_end > 0 else 1.0
+        self._next_frame = -np.inf
+        self._steps_to_check = 0
+        # Decimated rows [t, state, control_value, controller_index, energy] on the lines / not drawn yet
+        self._drawn = None
+        self._pending = []
+
+        self.fig, (self.ax_state, self.ax_control, self.ax_energy) = plt.subplots(3, 1, figsize=(10, 8), sharex=True)
+        self.ax_state.set_ylabel('State')
+        self.ax_control.set_ylabel('Control u')
+        self.ax_energy.set_ylabel('Energy')
+        self.ax_energy.set_xlabel('Time (s)')
+        self.ax_state.set_title('Live simulation')
+        self.ax_energy.set_xlim(0, self.t_end)
+
+        self.state_lines = [self.ax_state.plot([], [], label=label, animated=True)[0]
+                            for label in (r'$\theta$', r'$\dot{\theta}$')[:state_dim]]
+        self.control_line, = self.ax_control.plot([], [], color='tab:green', label='u', animated=True)
+        self.energy_line, = self.ax_energy.plot([], [], color='tab:purple', label=r'$E_{tot}$', animated=True)
+        if hasattr(self.system, 'get_desired_energy'):
+            self.ax_energy.axhline(self.system.get_desired_energy(), color='k', linestyle='--', label=r'$E_{des}$')
+        for ax in (self.ax_state, self.ax_control, self.ax_energy):
+            ax.grid(True)
+            ax.legend(loc='upper right')
+            ax.set_ylim(-1.0, 1.0)
+        self._artists = {self.ax_state: self.state_lines,
+                         self.ax_control: [self.control_line],
+                         self.ax_energy: [self.energy_line]}
+
+        if self.show:
+            plt.show(block=False)
+        self._full_redraw()
+
+    def publish(self, t: float, state: np.ndarray, control_vector: np.ndarray | None):
+        """
+        Records one sample and refreshes the figure if the frame interval has elapsed.
+        Used by the streaming loop of Simulator, every step.
+
+        Args:
+            t: Time of the sample.
+            state: State at time t.
+            control_vector: [control_value, controller_index] applied from t on, or None (final sample).
+        """
+        row = self.buffer.next_row()
+        row[0] = t
+        row[1:1 + self.state_dim] = state
+        if control_vector is None:
+            row[1 + self.state_dim:] = np.nan
+        else:
+            row[1 + self.state_dim:] = control_vector
+        # Reading the clock every step would cost as much as the row copy
+        self._steps_to_check -= 1
+        if self._steps_to_check <= 0:
+            self._steps_to_check = self.block_size
+            self._check_frame()
+
+    def publish_many(self, times: np.ndarray, states: np.ndarray, controls: np.ndarray):
+        """
+        Records consecutive samples and refreshes the figure if the frame interval has elapsed.
+        Used by the in-memory loop of Simulator, every block_size steps (one copy per block
+        instead of one per step).
+
+        Args:
+            times: Sample times, shape (n,).
+            states: States, shape (n, state_dim).
+            controls: [control_value, controller_index] per sample, shape (n, 2).
+        """
+        self.buffer.push_many(np.column_stack([times, states, controls]))
+        self._check_frame()
+
+    def _check_frame(self):
+        now = time.perf_counter()
+        if now >= self._next_frame:
+            self.refresh()
+            frame_cost = time.perf_counter() - now
+            self._next_frame = now + max(self.frame_interval, frame_cost / self.max_overhead)
+        elif 2 * len(self.buffer) >= self.capacity:
+            # Decimate pending samples without drawing before the buffer overflows
+            self._ingest()
+
+    def _ingest(self):
+        """Drains the ring buffer, computes the energy of the new samples and keeps their decimation for the next frame."""
+        rows, num_dropped = self.buffer.drain()
+        self.num_dropped += num_dropped
+        if len(rows) == 0:
+            return
+        energy = self.system.get_energy_batch(rows[:, 1:1 + self.state_dim])
+        rows = np.column_stack([rows, energy])
+        # About one bucket per pixel column covered by the new samples
+        span = (rows[-1, 0] - rows[0, 0]) / self.t_end
+        num_buckets = int(np.ceil(span * axes_pixel_width(self.ax_energy))) + 1
+        self._pending.append(rows[minmax_indices(rows[:, 1:], num_buckets)])
+
+    def refresh(self):
+        """Draws the samples published since the previous frame."""
+        self._ingest()
+        if not self._pending:
+            return
+        new = np.concatenate(self._pending)
+        self._pending = []
+        self._drawn = new if self._drawn is None else np.concatenate([self._drawn, new])
+
+        t = self._drawn[:, 0]
+        for k, line in enumerate(self.state_lines):
+            line.set_data(t, self._drawn[:, 1 + k])
+        self.control_line.set_data(t, self._drawn[:, 1 + self.state_dim])
+        self.energy_line.set_data(t, self._drawn[:, -1])
+
+        # Limits only grow, so the background rarely has to be redrawn
+        limits_changed = False
+        for ax, values in ((self.ax_state, new[:, 1:1 + self.state_dim]),
+                           (self.ax_control, new[:, 1 + self.state_dim]),
+                           (self.ax_energy, new[:, -1])):
+            limits_changed |= self._grow_ylim(ax, values)
+        if limits_changed:
+            self._full_redraw()
+        else:
+            self._blit()
+        self.num_frames += 1
+
+    def _grow_ylim(self, ax, values: np.ndarray) -> bool:
+        """Widens the y limits of ax (with headroom) if values leave them. Returns True if they changed."""
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return False
+        low, high = ax.get_ylim()
+        v_min, v_max = values.min(), values.max()
+        if v_min >= low and v_max <= high:
+            return False
+        # Generous headroom: slowly growing series (e.g. energy pumping) then need few full redraws
+        margin = 0.5 * max(v_max - v_min, high - low)
+        ax.set_ylim(min(low, v_min - margin), max(high, v_max + margin))
+        return True
+
+    def _full_redraw(self):
+        """Redraws the static figure, stores it as the blitting background and draws the lines on top."""
+        canvas = self.fig.canvas
+        canvas.draw()
+        self._background = canvas.copy_from_bbox(self.fig.bbox)
+        self._blit()
+
+    def _blit(self):
+        """Draws only the lines over the stored background."""
+        canvas = self.fig.canvas
+        canvas.restore_region(self._background)
+        for ax, artists in self._artists.items():
+            for artist in artists:
+                ax.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
+    def close(self):
+        """
+        Draws the remaining samples. Called by Simulator after the last step.
+        The lines become regular artists again, so the figure can be saved afterwards.
+        """
+        if self.buffer is None:
+            return
+        self.refresh()
+        for artists in self._artists.values():
+            for artist in artists:
+                artist.set_animated(False)
+        self.fig.canvas.draw_idle()
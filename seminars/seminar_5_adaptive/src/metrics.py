@@ -0,0 +1,381 @@
+from abc import ABC, abstractmethod
+import numpy as np
+from .system import System
+from .history import HistorySink
+
+class Metric(ABC):
+    """
+    Performance measure of a closed-loop run, accumulated sample by sample in O(1)
+    memory per trajectory, so that no histories have to be stored.
+
+    Samples arrive in time order, either one at a time for N trajectories (update,
+    used by EnsembleSimulator) or as blocks of consecutive samples (update_many, used
+    by Simulator with chunks of its history). A NaN control marks a sample without
+    control (the final sample).
+
+    When an ensemble drops finished trajectories (see termination.py), the samples
+    cover only the running ones and index gives their trajectory numbers; the
+    accumulators of the others are left as they are.
+    """
+
+    # Column name of the metric in result tables
+    name: str = "metric"
+
+    def reset(self, num_trajectories: int):
+        """Starts accumulating for num_trajectories trajectories. Called before the first sample."""
+        self.num_trajectories = num_trajectories
+
+    def update(self, t: float, states: np.ndarray, control: np.ndarray | None,
+               controller_index: np.ndarray | None, system: System, index: np.ndarray | None = None):
+        """
+        Takes one sample of all (running) trajectories.
+
+        Args:
+            t: Time of the sample.
+            states: States at time t, shape (n, state_dim).
+            control: Control applied from t on, shape (n,), or None for the final sample.
+            controller_index: Active controller index, shape (n,), or None (not reported / final sample).
+            system: The simulated system (model parameters, energies).
+            index: Trajectory numbers of the rows, shape (n,). None: all N trajectories.
+        """
+        if control is None:
+            control = np.full(states.shape[0], np.nan)
+        self.update_many(np.array([t]), states[None], np.asarray(control, dtype=float)[None],
+                         None if controller_index is None else np.asarray(controller_index, dtype=float)[None],
+                         system, index)
+
+    @abstractmethod
+    def update_many(self, times: np.ndarray, states: np.ndarray, control: np.ndarray,
+                    controller_index: np.ndarray | None, system: System, index: np.ndarray | None = None):
+        """
+        Takes a block of consecutive samples of all (running) trajectories.
+
+        Args:
+            times: Sample times, shape (B,).
+            states: States, shape (B, n, state_dim).
+            control: Control applied from each sample on, shape (B, n); NaN if none.
+            controller_index: Active controller index, shape (B, n) (NaN if unknown), or None.
+            system: The simulated system.
+            index: Trajectory numbers of the columns, shape (n,). None: all N trajectories.
+        """
+        pass
+
+    @abstractmethod
+    def result(self) -> np.ndarray:
+        """Metric value of every trajectory, shape (N,). NaN where it is undefined."""
+        pass
+
+def _rows(index: np.ndarray | None) -> np.ndarray | slice:
+    """Rows of the per-trajectory accumulators that a block of samples belongs to."""
+    return slice(None) if index is None else index
+
+def wrap_angle(angle: np.ndarray) -> np.ndarray:
+    """Wraps angles to [-pi, pi)."""
+    return (angle + np.pi) % (2 * np.pi) - np.pi
+
+def _first_true_time(mask: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Time of the first True of every column of mask (B, N), NaN if none."""
+    first = np.argmax(mask, axis=0)
+    return np.where(mask.any(axis=0), times[first], np.nan)
+
+def _last_true_time(mask: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Time of the last True of every column of mask (B, N), NaN if none."""
+    last = mask.shape[0] - 1 - np.argmax(mask[::-1], axis=0)
+    return np.where(mask.any(axis=0), times[last], np.nan)
+
+class SwingUpTime(Metric):
+    name = "swing_up_time"
+
+    def __init__(self, tolerance: float = 0.1, target_angle: float = np.pi):
+        """
+        First time the angle comes within tolerance of target_angle (modulo 2*pi).
+        NaN if it never does.
+
+        Args:
+            tolerance: Angle tolerance (rad).
+            target_angle: Upright angle (rad). Default: pi.
+        """
+        self.tolerance = tolerance
+        self.target_angle = target_angle
+
+    def reset(self, num_trajectories: int):
+        super().reset(num_trajectories)
+        self._time = np.full(num_trajectories, np.nan)
+
+    def update_many(self, times, states, control, controller_index, system, index=None):
+        rows = _rows(index)
+        reached = np.abs(wrap_angle(states[..., 0] - self.target_angle)) < self.tolerance
+        time = self._time[rows]
+        pending = np.isnan(time)
+        time[pending] = _first_true_time(reached[:, pending], times)
+        self._time[rows] = time
+
+    def result(self):
+        return self._time.copy()
+
+class SettlingTime(Metric):
+    name = "settling_time"
+
+    def __init__(self, target_state: np.ndarray, tolerance: float | np.ndarray = 0.05, wrap: bool = True):
+        """
+        Time after which the state stays within tolerance of target_state until the end
+        of the run (every component, angle differences modulo 2*pi if wrap): the last
+        time it was outside, 0 if it never was, NaN if it is outside at the end.
+
+        Args:
+            target_state: Target state, e.g. [pi, 0].
+            tolerance: Tolerance per component (scalar or array like target_state).
+            wrap: Treat the first component as an angle.
+        """
+        self.target_state = np.asarray(target_state, dtype=float)
+        self.tolerance = tolerance
+        self.wrap = wrap
+
+    def reset(self, num_trajectories: int):
+        super().reset(num_trajectories)
+        self._last_outside = np.full(num_trajectories, -np.inf)
+        self._final_t = np.full(num_trajectories, np.nan)
+
+    def update_many(self, times, states, control, controller_index, system, index=None):
+        rows = _rows(index)
+        error = states[..., :len(self.target_state)] - self.target_state
+        if self.wrap:
+            error[..., 0] = wrap_angle(error[..., 0])
+        outside = np.any(np.abs(error) > self.tolerance, axis=-1)
+        last = _last_true_time(outside, times)
+        self._last_outside[rows] = np.where(np.isnan(last), self._last_outside[rows], last)
+        self._final_t[rows] = times[-1]
+
+    def result(self):
+        result = np.maximum(self._last_outside, 0.0)
+        result[self._last_outside == self._final_t] = np.nan
+        return result
+
+class FinalEnergyError(Metric):
+    name = "final_energy_error"
+
+    def __init__(self):
+        """|E_tot - E_des| at the final sample (requires system.get_desired_energy)."""
+        pass
+
+    def reset(self, num_trajectories: int):
+        super().reset(num_trajectories)
+        self._error = np.full(num_trajectories, np.nan)
+
+    def update_many(self, times, states, control, controller_index, system, index=None):
+        # Only the last sample of the run counts. Blocks end with their latest sample; single
+        # samples from EnsembleSimulator are skipped until the final one (NaN control)
+        if len(times) > 1 or np.all(np.isnan(control[-1])):
+            self._error[_rows(index)] = np.abs(system.get_energy_batch(states[-1]) - system.get_desired_energy())
+
+    def result(self):
+        return self._error.copy()
+
+class EnergyErrorRMS(Metric):
+    name = "energy_error_rms"
+
+    def __init__(self):
+        """Root mean square of E_tot - E_des over all samples (requires system.get_desired_energy)."""
+        pass
+
+    def reset(self, num_trajectories: int):
+        super().reset(num_trajectories)
+        self._sum_squares = np.zeros(num_trajectories)
+        self._count = np.zeros(num_trajectories)
+
+    def update_many(self, times, states, control, controller_index, system, index=None):
+        rows = _rows(index)
+        num_samples, num_trajectories = states.shape[:2]
+        energy = system.get_energy_batch(states.reshape(num_samples * num_trajectories, -1))
+        error = energy.reshape(num_samples, num_trajectories) - system.get_desired_energy()
+        self._sum_squares[rows] += np.sum(error**2, axis=0)
+        self._count[rows] += num_samples
+
+    def result(self):
+        with np.errstate(invalid='ignore'):
+            return np.sqrt(self._sum_squares / self._count)
+
+class PeakControl(Metric):
+    name = "peak_control"
+
+    def __init__(self):
+        """Maximum |u| over the run."""
+        pass
+
+    def reset(self, num_trajectories: int):
+        super().reset(num_trajectories)
+        self._peak = np.full(num_trajectories, np.nan)
+
+    def update_many(self, times, states, control, controller_index, system, index=None):
+        rows = _rows(index)
+        # fmax ignores NaN (samples without control)
+        self._peak[rows] = np.fmax(self._peak[rows], np.fmax.reduce(np.abs(control), axis=0))
+
+    def result(self):
+        return self._peak.copy()
+
+class ControlEffort(Metric):
+    name = "control_effort"
+
+    def __init__(self, squared: bool = False):
+        """
+        Integral of |u| (or u^2 if squared) over the run. The control is held constant
+        over every step, so the sum is exact.
+
+        Args:
+            squared: Integrate u^2 instead of |u|.
+        """
+        self.squared = squared
+        if squared:
+            self.name = "control_energy"
+
+    def reset(self, num_trajectories: int):
+        super().reset(num_trajectories)
+        self._integral = np.zeros(num_trajectories)
+        self._last_t = np.full(num_trajectories, np.nan)
+        self._last_value = np.full(num_trajectories, np.nan)
+
+    def update_many(self, times, states, control, controller_index, system, index=None):
+        rows = _rows(index)
+        values = control**2 if self.squared else np.abs(control)
+        # The control of the previous block's last sample holds until this block's first sample
+        integral = np.nan_to_num(self._last_value[rows] * (times[0] - self._last_t[rows]))
+        integral += np.nansum(values[:-1] * np.diff(times)[:, None], axis=0)
+        self._integral[rows] += integral
+        self._last_t[rows] = times[-1]
+        self._last_value[rows] = values[-1]
+
+    def result(self):
+        return self._integral.copy()
+
+class SwitchCount(Metric):
+    name = "num_switches"
+
+    def __init__(self):
+        """Number of changes of the active controller index (e.g. of EnergyPDController); NaN indices are skipped."""
+        pass
+
+    def reset(self, num_trajectories: int):
+        super().reset(num_trajectories)
+        self._count = np.zeros(num_trajectories)
+        self._last_index = np.full(num_trajectories, np.nan)
+
+    def update_many(self, times, states, control, controller_index, system, index=None):
+        if controller_index is None:
+            return
+        rows = _rows(index)
+        # Carry the last valid index of every trajectory forward over NaN samples
+        indices = np.concatenate([self._last_index[rows][None], controller_index])
+        valid = ~np.isnan(indices)
+        position = np.where(valid, np.arange(len(indices))[:, None], 0)
+        np.maximum.accumulate(position, axis=0, out=position)
+        filled = np.take_along_axis(indices, position, axis=0)
+        changed = (filled[1:] != filled[:-1]) & ~np.isnan(filled[:-1]) & valid[1:]
+        self._count[rows] += changed.sum(axis=0)
+        self._last_index[rows] = filled[-1]
+
+    def result(self):
+        return self._count.copy()
+
+class EstimateConvergenceTime(Metric):
+    name = "estimate_convergence_time"
+
+    def __init__(self, rate_tolerance: float = 1e-3, index: int = 0):
+        """
+        Time after which an adaptive estimate changes slower than rate_tolerance
+        (per second) until the end of the run: the last time its rate was above the
+        tolerance, 0 if it never was, NaN if it was still moving at the end.
+        Requires an AdaptiveSystem (see controller_adaptive.py).
+
+        Args:
+            rate_tolerance: Convergence threshold for |d estimate / dt|.
+            index: Column of the estimate among the estimates.
+        """
+        self.rate_tolerance = rate_tolerance
+        self.index = index
+
+    def reset(self, num_trajectories: int):
+        super().reset(num_trajectories)
+        self._last_moving = np.zeros(num_trajectories)
+        self._previous = np.full(num_trajectories, np.nan)
+        self._previous_t = np.full(num_trajectories, np.nan)
+        self._final_t = np.full(num_trajectories, np.nan)
+
+    def update_many(self, times, states, control, controller_index, system, index=None):
+        if not hasattr(system, 'split_state'):
+            raise TypeError("EstimateConvergenceTime requires an AdaptiveSystem.")
+        rows = _rows(index)
+        estimate = system.split_state(states)[1][..., self.index]
+        # Rate over the step ending at every sample; NaN for the first sample of the run
+        first_rate = np.abs(estimate[0] - self._previous[rows]) / (times[0] - self._previous_t[rows])
+        rate = np.concatenate([first_rate[None], np.abs(np.diff(estimate, axis=0)) / np.diff(times)[:, None]])
+        # An estimate that moved during the step ending at t counts as moving at t
+        last = _last_true_time(rate > self.rate_tolerance, times)
+        self._last_moving[rows] = np.where(np.isnan(last), self._last_moving[rows], last)
+        self._previous[rows] = estimate[-1]
+        self._previous_t[rows] = times[-1]
+        self._final_t[rows] = times[-1]
+
+    def result(self):
+        result = self._last_moving.copy()
+        result[result == self._final_t] = np.nan
+        return result
+
+class MetricsSink(HistorySink):
+    def __init__(self, metrics: list[Metric], system: System):
+        """
+        History sink (see history.py) that feeds the chunks of a single run to metrics
+        instead of storing them.
+
+        Args:
+            metrics: Metrics to update.
+            system: The simulated system.
+        """
+        self.metrics = metrics
+        self.system = system
+
+    def open(self, num_samples: int, state_dim: int):
+        for metric in self.metrics:
+            metric.reset(1)
+
+    def write(self, time_chunk: np.ndarray, state_chunk: np.ndarray, control_chunk: np.ndarray):
+        # One trajectory: (B, d) -> (B, 1, d)
+        update_metrics(self.metrics, time_chunk, state_chunk[:, None, :], control_chunk[:, None, 0],
+                       control_chunk[:, None, 1], self.system)
+
+def update_metrics(metrics: list[Metric], times: np.ndarray, states: np.ndarray, control: np.ndarray,
+                   controller_index: np.ndarray | None, system: System):
+    """Passes a block of samples (see Metric.update_many) to every metric."""
+    for metric in metrics:
+        metric.update_many(times, states, control, controller_index, system)
+
+def evaluate_metrics(metrics: list[Metric], time_history: np.ndarray, state_history: np.ndarray,
+                     control_history: np.ndarray, system: System, chunk_size: int = 65536) -> dict[str, float]:
+    """
+    Evaluates metrics on the stored histories of a single run, chunk by chunk.
+
+    Args:
+        metrics: Metrics to evaluate (they are reset first).
+        time_history: Times, shape (T,).
+        state_history: States, shape (T, state_dim).
+        control_history: [control_value, controller_index] per step, shape (T - 1, 2) or (T, 2).
+        system: The simulated system.
+        chunk_size: Number of samples per block.
+
+    Returns:
+        Metric values by name.
+    """
+    sink = MetricsSink(metrics, system)
+    sink.open(len(time_history), state_history.shape[1])
+    for start in range(0, len(time_history), chunk_size):
+        stop = min(start + chunk_size, len(time_history))
+        controls = np.full((stop - start, 2), np.nan)
+        available = min(stop, len(control_history)) - start
+        if available > 0:
+            controls[:available] = control_history[start:start + available]
+        sink.write(time_history[start:stop], state_history[start:stop], controls)
+    return {metric.name: float(metric.result()[0]) for metric in metrics}
+
+def default_metrics() -> list[Metric]:
+    """Swing-up time, final energy error and control effort."""
+    return [SwingUpTime(), FinalEnergyError(), ControlEffort()]
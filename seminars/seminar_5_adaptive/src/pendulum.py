@@ -1,5 +1,6 @@
 import numpy as np
 from .system import System
+from .integrators import Integrator
 
 class Pendulum(System):
     def __init__(self, 
@@ -55,23 +56,50 @@ class Pendulum(System):
 
         # Dynamics with friction:
         # theta_ddot = -g/l * sin(theta) - (b/(m*l^2)) * theta_dot + tau / (m*l^2)
-        d_state_dt = np.zeros_like(state)
-        d_state_dt[0] = theta_dot
-        d_state_dt[1] = -(self.g / self.l) * np.sin(theta) - (self.b / (self.m * self.l**2)) * theta_dot + tau / (self.m * self.l**2)
-        return d_state_dt
+        theta_ddot = -(self.g / self.l) * np.sin(theta) - (self.b / (self.m * self.l**2)) * theta_dot + tau / (self.m * self.l**2)
+        return np.array([theta_dot, theta_ddot], dtype=float)
 
-    def step(self, dt: float, control_input: float):
+    def get_state_derivative_batch(self, control_input: np.ndarray, states: np.ndarray, t: float | None = None) -> np.ndarray:
         """
-        Performs one simulation step using the Euler method.
+        Computes the state derivatives for a batch of pendulum states at once.
+
+        Args:
+            control_input: Control inputs (torques tau), shape (N,) or a scalar applied to all states.
+            states: Array of states [theta, theta_dot], shape (N, 2).
+            t: Current time. Not used in this implementation but kept for compatibility.
+
+        Returns:
+            Array of state derivatives [theta_dot, theta_ddot], shape (N, 2).
+        """
+        theta = states[:, 0]
+        theta_dot = states[:, 1]
+        tau = control_input
+
+        # Same dynamics as get_state_derivative, evaluated column-wise
+        d_states_dt = np.empty_like(states, dtype=float)
+        d_states_dt[:, 0] = theta_dot
+        d_states_dt[:, 1] = -(self.g / self.l) * np.sin(theta) - (self.b / (self.m * self.l**2)) * theta_dot + tau / (self.m * self.l**2)
+        return d_states_dt
+
+    def step(self, dt: float, control_input: float, integrator: Integrator | None = None, t: float = 0.0):
+        """
+        Performs one simulation step. The control input is held constant over the step.
 
         Args:
             dt: Time step.
             control_input: Control input (torque tau).
+            integrator: Integration scheme (see integrators.py). If None, the explicit Euler method is used.
+            t: Time at the beginning of the step. Not used by the pendulum dynamics.
         """
         current_state = self.get_state()
-        # Time t is not used, state uses default
-        state_derivative = self.get_state_derivative(control_input=control_input) 
-        new_state = current_state + state_derivative * dt
+        if integrator is None:
+            # Time t is not used, state uses default
+            state_derivative = self.get_state_derivative(control_input=control_input) 
+            new_state = current_state + state_derivative * dt
+        else:
+            new_state = integrator.step(
+                lambda t_, s: self.get_state_derivative(control_input, s, t_), t, current_state, dt,
+                self.num_positions)
         # Normalize angle theta to the range [-pi, pi] for convenience (not strictly necessary for dynamics)
         # new_state[0] = (new_state[0] + np.pi) % (2 * np.pi) - np.pi
         self.set_state(new_state)
@@ -108,6 +136,28 @@ class Pendulum(System):
         E_pot = self.m * self.g * self.l * (1 - np.cos(theta))
         return E_pot
 
+    def get_energy_batch(self, states: np.ndarray) -> np.ndarray:
+        """
+        Computes the total energy for a batch of states.
+
+        Args:
+            states: Array of states [theta, theta_dot], shape (N, 2).
+
+        Returns:
+            Array of total energies, shape (N,).
+        """
+        return self.get_kinetic_energy_batch(states) + self.get_potential_energy_batch(states)
+
+    def get_kinetic_energy_batch(self, states: np.ndarray) -> np.ndarray:
+        """Computes the kinetic energy for states of shape (N, 2)."""
+        theta_dot = states[:, 1]
+        return 0.5 * self.m * (self.l * theta_dot)**2
+
+    def get_potential_energy_batch(self, states: np.ndarray) -> np.ndarray:
+        """Computes the potential energy relative to the bottom position for states of shape (N, 2)."""
+        theta = states[:, 0]
+        return self.m * self.g * self.l * (1 - np.cos(theta))
+
     def get_desired_energy(self) -> float:
         """
         Returns the desired energy (corresponding to the top equilibrium position).
@@ -5,6 +5,7 @@ from matplotlib.collections import LineCollection
 import matplotlib.cm as cm
 import matplotlib.colors as mcolors
 from .pendulum import Pendulum # Changed to relative import
+from .lod import minmax_indices, axes_pixel_width
 
 class Plotter:
     def __init__(self, time_vector: np.ndarray | None, state_history: np.ndarray | None, control_history: np.ndarray | None, system: Pendulum | None):
@@ -21,10 +22,9 @@ class Plotter:
         self.states = state_history
         self.system = system # Store the system object
         self.controls = control_history # Store the 2D control history [value, index]
-        self.E_kin_history = None
-        self.E_pot_history = None
-        self.E_tot_history = None
-        self.E_des = None
+        # Derived series (energies, switches, ...) are computed on first access and cached here
+        self._derived = {}
+        self._has_run_data = False
 
         # Perform checks and calculations only if data for a single run is provided
         if self.t is not None and self.states is not None and self.controls is not None and self.system is not None:
@@ -45,16 +45,96 @@ class Plotter:
             if self.states.shape[1] != 2:
                 raise ValueError("State history must have 2 columns (theta, theta_dot).")
 
-            # Calculate energy history
-            self.E_kin_history = np.array([self.system.get_kinetic_energy(s) for s in self.states])
-            self.E_pot_history = np.array([self.system.get_potential_energy(s) for s in self.states])
-            self.E_tot_history = self.E_kin_history + self.E_pot_history
-            # Check if the system has a desired energy (some controllers might not)
-            if hasattr(self.system, 'get_desired_energy'):
-                self.E_des = self.system.get_desired_energy()
+            # Energy histories and other derived series are computed lazily (see properties below)
+            self._has_run_data = True
+
+    def _cached(self, name: str, compute):
+        """Returns the derived series name, computing it with compute() on first access."""
+        if name not in self._derived:
+            self._derived[name] = compute()
+        return self._derived[name]
+
+    @property
+    def E_kin_history(self) -> np.ndarray | None:
+        """Kinetic energy at every sample (None without run data)."""
+        if not self._has_run_data:
+            return None
+        return self._cached('E_kin', lambda: self.system.get_kinetic_energy_batch(self.states))
+
+    @property
+    def E_pot_history(self) -> np.ndarray | None:
+        """Potential energy at every sample (None without run data)."""
+        if not self._has_run_data:
+            return None
+        return self._cached('E_pot', lambda: self.system.get_potential_energy_batch(self.states))
+
+    @property
+    def E_tot_history(self) -> np.ndarray | None:
+        """Total energy at every sample (None without run data)."""
+        if not self._has_run_data:
+            return None
+        return self._cached('E_tot', lambda: self.E_kin_history + self.E_pot_history)
+
+    @property
+    def E_des(self) -> float | None:
+        """Desired energy of the system, or None if the system does not define one."""
+        # Check if the system has a desired energy (some controllers might not)
+        if not self._has_run_data or not hasattr(self.system, 'get_desired_energy'):
+            return None
+        return self._cached('E_des', self.system.get_desired_energy)
+
+    @property
+    def energy_error(self) -> np.ndarray | None:
+        """E_tot - E_des at every sample (None without run data or desired energy)."""
+        if self.E_des is None:
+            return None
+        return self._cached('energy_error', lambda: self.E_tot_history - self.E_des)
+
+    @property
+    def switch_indices(self) -> np.ndarray:
+        """Sample indices where the controller index changes (NaN indices are ignored)."""
+        def compute():
+            if self.controls is None:
+                return np.zeros(0, dtype=int)
+            controller_indices = self.controls[:, 1]
+            valid = np.flatnonzero(~np.isnan(controller_indices))
+            return valid[1:][np.diff(controller_indices[valid]) != 0]
+        return self._cached('switch_indices', compute)
+
+    @property
+    def controller_segments(self) -> list[tuple[int, int, float]]:
+        """
+        Runs of samples with the same active controller, as (start, stop, controller_index)
+        with stop exclusive. Samples with a NaN index are not covered.
+        """
+        def compute():
+            if self.controls is None:
+                return []
+            controller_indices = self.controls[:, 1]
+            valid = ~np.isnan(controller_indices)
+            # Boundaries: changes of the index or of validity
+            change = np.flatnonzero((controller_indices[1:] != controller_indices[:-1]) | (valid[1:] != valid[:-1])) + 1
+            starts = np.concatenate([[0], change])
+            stops = np.concatenate([change, [len(controller_indices)]])
+            return [(int(start), int(stop), float(controller_indices[start]))
+                    for start, stop in zip(starts, stops) if valid[start]]
+        return self._cached('controller_segments', compute)
+
+    def _lod_indices(self, ax, columns: np.ndarray, lod: bool, keep: np.ndarray | None = None):
+        """Sample indices to draw on ax: min/max decimation to the axes pixel width, or all samples."""
+        if not lod:
+            return slice(None)
+        return minmax_indices(columns, axes_pixel_width(ax), keep)
+
+    def plot_results(self, lod: bool = True):
+        """
+        Plots the state variables, control input, energies, and phase portrait using GridSpec.
 
-    def plot_results(self):
-        """Plots the state variables, control input, energies, and phase portrait using GridSpec."""
+        Args:
+            lod: If True, long series are reduced to about two samples per pixel column of
+                 their axes, keeping the minimum and maximum of every column (see lod.py),
+                 so peaks and switches stay visible. Short runs are drawn unchanged.
+        """
         if self.t is None or self.states is None or self.controls is None:
             raise ValueError("Cannot plot results: missing time, state or control data.")
 
@@ -74,8 +154,9 @@ class Plotter:
 
         # --- Plotting Data --- #
         # 1. State Variables (Top Left)
-        ax_state.plot(self.t, theta, label='Theta (rad)', color='blue')
-        ax_state.plot(self.t, theta_dot, label='Theta_dot (rad/s)', color='orange', linestyle='--')
+        idx = self._lod_indices(ax_state, self.states, lod)
+        ax_state.plot(self.t[idx], theta[idx], label='Theta (rad)', color='blue')
+        ax_state.plot(self.t[idx], theta_dot[idx], label='Theta_dot (rad/s)', color='orange', linestyle='--')
         ax_state.set_title('State Variables')
         ax_state.set_ylabel('Value')
         ax_state.grid(True)
@@ -86,7 +167,8 @@ class Plotter:
         control_values = self.controls[:, 0]
         time_for_control = self.t[:-1] if np.isnan(control_values[-1]) else self.t
         controls_to_plot = control_values[:len(time_for_control)]
-        ax_control.plot(time_for_control, controls_to_plot, label='Control Torque (Nm)', color='green')
+        idx = self._lod_indices(ax_control, controls_to_plot, lod, keep=np.concatenate([self.switch_indices - 1, self.switch_indices]))
+        ax_control.plot(time_for_control[idx], controls_to_plot[idx], label='Control Torque (Nm)', color='green')
 
         ax_control.set_title('Control Input')
         ax_control.set_ylabel('Torque (Nm)')
@@ -94,7 +176,8 @@ class Plotter:
         ax_control.legend(loc='upper left') # Only one legend needed now
 
         # 3. Phase Portrait (Middle Full Width)
-        scatter = ax_phase.scatter(theta, theta_dot, c=self.t, cmap='cool', s=10, label='Phase Trajectory', alpha=0.6)
+        idx = self._lod_indices(ax_phase, self.states, lod)
+        scatter = ax_phase.scatter(theta[idx], theta_dot[idx], c=self.t[idx], cmap='cool', s=10, label='Phase Trajectory', alpha=0.6)
         try:
              ax_phase.scatter(theta[0], theta_dot[0], color='red', s=150, label='Start', zorder=5, alpha=0.7)
              ax_phase.scatter(theta[-1], theta_dot[-1], color='black', s=150, label='End', zorder=5, alpha=0.7)
@@ -106,15 +189,15 @@ class Plotter:
         ax_phase.grid(True)
         
         # Автоматически определяем диапазон осей на основе фактических данных
-        theta_range = max(theta) - min(theta)
-        theta_dot_range = max(theta_dot) - min(theta_dot)
+        theta_range = np.max(theta) - np.min(theta)
+        theta_dot_range = np.max(theta_dot) - np.min(theta_dot)
         
         # Добавляем небольшой отступ (10%)
         theta_padding = theta_range * 0.1
         theta_dot_padding = theta_dot_range * 0.1
         
-        ax_phase.set_xlim(min(theta) - theta_padding, max(theta) + theta_padding)
-        ax_phase.set_ylim(min(theta_dot) - theta_dot_padding, max(theta_dot) + theta_dot_padding)
+        ax_phase.set_xlim(np.min(theta) - theta_padding, np.max(theta) + theta_padding)
+        ax_phase.set_ylim(np.min(theta_dot) - theta_dot_padding, np.max(theta_dot) + theta_dot_padding)
         
         # Добавляем цветовую шкалу для времени
         cbar = plt.colorbar(scatter, ax=ax_phase)
@@ -128,9 +211,10 @@ class Plotter:
         
         # 4. Energy Plot (Bottom Full Width)
         if self.E_kin_history is not None:
-            ax_energy.plot(self.t, self.E_kin_history, label='Kinetic Energy', color='blue', alpha=0.7)
-            ax_energy.plot(self.t, self.E_pot_history, label='Potential Energy', color='green', alpha=0.7)
-            ax_energy.plot(self.t, self.E_tot_history, label='Total Energy', color='red', linewidth=2)
+            idx = self._lod_indices(ax_energy, np.column_stack([self.E_kin_history, self.E_pot_history, self.E_tot_history]), lod)
+            ax_energy.plot(self.t[idx], self.E_kin_history[idx], label='Kinetic Energy', color='blue', alpha=0.7)
+            ax_energy.plot(self.t[idx], self.E_pot_history[idx], label='Potential Energy', color='green', alpha=0.7)
+            ax_energy.plot(self.t[idx], self.E_tot_history[idx], label='Total Energy', color='red', linewidth=2)
             
             if self.E_des is not None:
                 ax_energy.axhline(y=self.E_des, color='black', linestyle='--', label='Desired Energy')
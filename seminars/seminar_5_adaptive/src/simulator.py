@@ -5,9 +5,39 @@ import typing # Import typing for Type hint
 from .system import System
 from .controller import Controller
 from .plotter import Plotter
+from .ensemble import EnsembleSimulator
+from .integrators import Integrator, get_integrator
+from . import jit_kernels
+from .parallel import run_chunks_parallel
+from .history import HistorySink, CallbackSink, ChunkedHistoryWriter
+from .cache import SimulationCache, UncacheableError, make_key, get_cache
+from .live import LivePlotter
+from .controller_adaptive import AdaptiveSystem
+from .adaptation_logger import AdaptationLogger
+from .metrics import Metric, MetricsSink, evaluate_metrics
+from .termination import TerminationCondition, check_termination
+
+# Event function g(t, state); an event occurs when g changes sign
+EventFunction = typing.Callable[[float, np.ndarray], float]
 
 class Simulator:
-    def __init__(self, system: System, controller: Controller, dt: float, num_steps: int):
+    def __init__(self, system: System, controller: Controller, dt: float, num_steps: int,
+                 integrator: Integrator | str | None = None,
+                 events: list[EventFunction] | None = None,
+                 controller_events: bool = False,
+                 event_tol: float = 1e-10,
+                 max_events_per_step: int = 10,
+                 jit: bool = False,
+                 history_sink: HistorySink | None = None,
+                 chunk_size: int = 65536,
+                 decimation: int = 1,
+                 cache: SimulationCache | str | None = None,
+                 live: LivePlotter | None = None,
+                 metrics: list[Metric] | None = None,
+                 store_history: bool = True,
+                 termination: list[TerminationCondition] | None = None,
+                 termination_interval: int = 1,
+                 adaptation_logger: AdaptationLogger | None = None):
         """
         Initializes the Simulation.
 
@@ -16,11 +46,95 @@ class Simulator:
             controller: The controller to use.
             dt: Simulation time step.
             num_steps: Total number of simulation steps.
+            integrator: Integration scheme, as an Integrator instance or a name from
+                        integrators.INTEGRATORS ('euler', 'rk4', 'semi_implicit_euler',
+                        'verlet', 'rk45'). Default: None (the system's own Euler step).
+            events: Optional event functions g(t, state). When one of them changes sign
+                    inside a step, the crossing time is located by bisection, the system
+                    is advanced to it and the control is recomputed there.
+            controller_events: If True, the switching surfaces returned by
+                               controller.get_event_functions are used as events as well.
+            event_tol: Time tolerance for locating events.
+            max_events_per_step: Maximum number of events handled within one step
+                                 (protects against chattering on a sliding surface).
+            jit: If True, run() uses the compiled closed-loop kernel from jit_kernels.py
+                 when the configuration supports it (Pendulum with EnergyControl,
+                 LinearFeedbackController or EnergyPDController, Euler, no events).
+                 Other configurations use the regular loop. Default: False.
+            history_sink: Optional destination for streamed histories (see history.py).
+                          If given, no full-length histories are allocated: run() buffers
+                          chunk_size samples at a time and flushes them to the sink, so
+                          memory stays constant whatever num_steps is.
+            chunk_size: Number of samples per flushed chunk in streaming mode.
+            decimation: In streaming mode, keep every decimation-th sample (the final
+                        sample is always kept). Default: 1 (all samples).
+            cache: Optional SimulationCache (or its directory). run() then looks up the
+                   histories by a hash of the system, controller, integrator, dt and
+                   num_steps, and only simulates on a miss. A hit restores the histories,
+                   event_history and the final system state, not the internal state of
+                   the controller. Configurations with user event functions and
+                   streaming runs are never cached.
+            live: Optional LivePlotter (see live.py). Every step is published to its ring
+                  buffer and the figure is refreshed at its capped frame rate while the run
+                  is in progress. A live run always simulates (the cache is only written)
+                  and does not use the compiled kernel.
+            metrics: Optional metrics (see metrics.py), evaluated on the run. Their values
+                     are returned by get_metrics(). In streaming mode they are fed chunk by
+                     chunk (every sample, independent of decimation) while run() is in progress.
+            store_history: If False, no histories are kept at all: run() streams the samples
+                           to the metrics (and to history_sink if given) only, so memory does
+                           not grow with num_steps. Default: True.
+            termination: Optional termination conditions (see termination.py). When one of
+                         them holds at a sample, that sample becomes the final one: the run
+                         stops, the histories end there (get_results returns the shorter
+                         arrays, sinks receive fewer samples) and termination_time and
+                         termination_reason are set. Runs with termination conditions are
+                         not cached and do not use the compiled kernel.
+            termination_interval: Check the conditions every termination_interval steps
+                                  (the hold time of Converged is then measured on this grid).
+            adaptation_logger: Optional AdaptationLogger for the estimates of an AdaptiveSystem
+                               (see AdaptiveController.make_logger). run() hands the estimates
+                               to it in blocks of chunk_size samples while the run is in
+                               progress and closes it at the end.
         """
         self.system = system
         self.controller = controller
         self.dt = dt
         self.num_steps = num_steps
+        self.integrator = get_integrator(integrator)
+        self.events = list(events) if events is not None else []
+        self.controller_events = controller_events
+        self.event_tol = event_tol
+        self.max_events_per_step = max_events_per_step
+        self.jit = jit
+        self.history_sink = history_sink
+        self.chunk_size = chunk_size
+        self.decimation = decimation
+        self.cache = get_cache(cache)
+        self.live = live
+        self.metrics = list(metrics) if metrics is not None else []
+        self.store_history = store_history
+        self.metric_values = None
+        self.termination = list(termination) if termination is not None else []
+        self.termination_interval = termination_interval
+        if adaptation_logger is not None and not isinstance(system, AdaptiveSystem):
+            raise TypeError("adaptation_logger requires an AdaptiveSystem (plant augmented with the estimates).")
+        self.adaptation_logger = adaptation_logger
+        self._num_logged = 0 # Samples handed to adaptation_logger
+        # Time of the final sample and name of the condition if the run ended early
+        self.termination_time = None
+        self.termination_reason = None
+        # Located events as (time, event_index, control_value_after_event)
+        self.event_history = []
+
+        if self.history_sink is not None or not store_history:
+            # Streaming mode: histories go to the sink (or only to the metrics) chunk by chunk
+            self.time_vector = None
+            self.state_history = None
+            self.control_history = None
+            self.time_history = None
+            return
+
         self.time_vector = np.linspace(0, dt * num_steps, num_steps + 1)
 
         # History storage
@@ -33,60 +147,339 @@ class Simulator:
         self.control_history = np.full((num_steps, 2), np.nan) 
         self.time_history = np.zeros(num_steps + 1)
 
-    def run(self):
-        """Runs the simulation loop."""
+    def _compute_control(self, t: float) -> tuple[float, np.ndarray]:
+        """
+        Queries the controller and normalizes its output.
+
+        Returns:
+            Tuple of (control_input, [control_value, controller_index or nan]).
+        """
+        # Controller can return scalar (control_value) or 2-element array/list [control_value, index]
+        control_output = self.controller.compute_control(self.system, t)
+        
+        # Ensure control_output is a numpy array for consistent handling
+        control_output = np.asarray(control_output)
+
+        if control_output.ndim == 0: # Scalar control value
+            control_input = control_output.item() # Extract scalar value
+            return control_input, np.array([control_input, np.nan]) # Index remains nan
+        elif control_output.ndim == 1 and control_output.shape == (2,): # [control_value, index]
+            return control_output[0], control_output
+        else:
+             raise ValueError(f"Controller must return a scalar or a 2-element vector [control, index]. Got: {control_output}")
+
+    def _integrate(self, state: np.ndarray, t: float, h: float, control_input: float) -> np.ndarray:
+        """Integrates from state at time t over h with the control held constant, without touching the system."""
+        f = lambda t_, s: self.system.get_state_derivative(control_input, s, t_)
+        if self.integrator is None:
+            return state + f(t, state) * h
+        return self.integrator.step(f, t, state, h, self.system.num_positions)
+
+    def _get_event_functions(self) -> list[EventFunction]:
+        """Returns the user events followed by the controller switching surfaces (if enabled)."""
+        if self.controller_events:
+            return self.events + self.controller.get_event_functions(self.system)
+        return self.events
+
+    def _find_first_event(self, state: np.ndarray, t: float, h: float, control_input: float,
+                          new_state: np.ndarray) -> tuple[float, int] | None:
+        """
+        Finds the earliest sign change of the event functions within [t, t + h].
+
+        Returns:
+            Tuple (tau, event_index) where tau is the offset from t just past the
+            crossing, or None if no event occurs in this interval.
+        """
+        first_event = None
+        for k, g in enumerate(self._get_event_functions()):
+            g_start = g(t, state)
+            g_end = g(t + h, new_state)
+            if g_start == 0 or np.sign(g_start) == np.sign(g_end):
+                continue
+            # Bisection on the step size: lo keeps the sign of g_start, hi the opposite one
+            lo, hi = 0.0, h
+            while hi - lo > self.event_tol:
+                mid = 0.5 * (lo + hi)
+                if np.sign(g(t + mid, self._integrate(state, t, mid, control_input))) == np.sign(g_start):
+                    lo = mid
+                else:
+                    hi = mid
+            if first_event is None or hi < first_event[0]:
+                first_event = (hi, k)
+        return first_event
+
+    def _step_with_events(self, t: float, control_input: float):
+        """
+        Advances the system over one step dt, stopping at every event inside the step
+        to recompute the control. Between events the control is held constant.
+        """
+        t_end = t + self.dt
+        state = self.system.get_state()
+        num_events = 0
+        while True:
+            h = t_end - t
+            new_state = self._integrate(state, t, h, control_input)
+            if num_events >= self.max_events_per_step or h <= self.event_tol:
+                break
+            event = self._find_first_event(state, t, h, control_input, new_state)
+            if event is None:
+                break
+
+            # Move to the event and let the controller react to the new side of the surface
+            tau, event_index = event
+            state = self._integrate(state, t, tau, control_input)
+            t += tau
+            self.system.set_state(state)
+            control_input, _ = self._compute_control(t)
+            self.event_history.append((t, event_index, control_input))
+            num_events += 1
+
+        self.system.set_state(new_state)
+
+    def _step(self, current_time: float) -> np.ndarray:
+        """
+        Computes the control at current_time and advances the system by dt.
+
+        Returns:
+            The stored control vector [control_value, controller_index or nan].
+        """
+        # 1. Compute control input (value at the start of the step is stored)
+        control_input, control_vector = self._compute_control(current_time)
+
+        # 2. Apply control and step the system
+        if self.events or self.controller_events:
+            # Zero-order hold between located switching events
+            self._step_with_events(current_time, control_input)
+        else:
+            self.system.step(self.dt, control_input, self.integrator, current_time)
+        return control_vector
+
+    def run(self, progress: bool = True):
+        """
+        Runs the simulation loop.
+
+        Args:
+            progress: Show a tqdm progress bar (if tqdm is available). Default: True.
+        """
+        if self.state_history is None:
+            self._run_streaming(progress)
+            return
+
+        # The key must be computed before the run changes the system state
+        cache_key = self._cache_key()
+        self._num_logged = 0
+        try:
+            if cache_key is not None and self.live is None and self._load_from_cache(cache_key):
+                self._log_estimates(len(self.time_history))
+                self._evaluate_metrics()
+                return
+            self._run_in_memory(progress)
+            self._log_estimates(len(self.time_history))
+        finally:
+            if self.adaptation_logger is not None:
+                self.adaptation_logger.close()
+        self._evaluate_metrics()
+
+        if cache_key is not None:
+            self.cache.put(cache_key,
+                           time_history=self.time_history,
+                           state_history=self.state_history,
+                           control_history=self.control_history,
+                           event_history=np.array(self.event_history, dtype=float).reshape(-1, 3))
+
+    def _cache_key(self) -> str | None:
+        """Content hash of the run configuration, or None if the run cannot be cached."""
+        if self.cache is None or self.events or self.termination:
+            return None
+        try:
+            # jit is left out: the compiled kernel reproduces the regular loop exactly
+            return make_key("Simulator.run", self.system, self.controller, self.integrator,
+                            self.dt, self.num_steps, self.controller_events,
+                            self.event_tol, self.max_events_per_step)
+        except UncacheableError:
+            return None
+
+    def _load_from_cache(self, cache_key: str) -> bool:
+        """Fills the histories from the cache. Returns False on a miss."""
+        entry = self.cache.get(cache_key)
+        if entry is None or entry['state_history'].shape != self.state_history.shape:
+            return False
+        self.time_history[:] = entry['time_history']
+        self.state_history[:] = entry['state_history']
+        self.control_history[:] = entry['control_history']
+        self.event_history = [(t, int(k), u) for t, k, u in entry['event_history']]
+        self.system.set_state(self.state_history[-1].copy())
+        return True
+
+    def _run_in_memory(self, progress: bool = True):
+        """Runs the simulation loop into the preallocated histories."""
         # Store initial state
         self.state_history[0, :] = self.system.get_state()
         self.time_history[0] = 0
+        self._reset_termination()
+
+        if self.jit and self.live is None and not self.termination and self.integrator is None \
+                and not (self.events or self.controller_events) \
+                and jit_kernels.supports_jit(self.system, self.controller):
+            jit_kernels.run_closed_loop(self.system, self.controller, self.time_vector, self.dt,
+                                        self.state_history, self.control_history, self.time_history)
+            return
 
         # Use tqdm range description if tqdm is available
         step_range = range(self.num_steps)
-        if 'tqdm' in globals():
+        if progress and 'tqdm' in globals():
             step_range = tqdm(step_range, desc="Simulation Progress", leave=False) # leave=False for nested loops
 
+        live = self.live
+        if live is not None:
+            live.open(self.time_vector[-1], self.state_history.shape[1])
+            published = 0 # Samples before this index were published
+
         for i in step_range:
             current_time = self.time_vector[i]
-            # 1. Compute control input 
-            # Controller can return scalar (control_value) or 2-element array/list [control_value, index]
-            control_output = self.controller.compute_control(self.system, current_time)
-            
-            # Ensure control_output is a numpy array for consistent handling
-            control_output = np.asarray(control_output)
-
-            if control_output.ndim == 0: # Scalar control value
-                control_input = control_output.item() # Extract scalar value
-                self.control_history[i, 0] = control_input
-                # Index remains np.nan as initialized
-            elif control_output.ndim == 1 and control_output.shape == (2,): # [control_value, index]
-                control_input = control_output[0]
-                self.control_history[i, :] = control_output # Store both value and index
-            else:
-                 raise ValueError(f"Controller must return a scalar or a 2-element vector [control, index]. Got: {control_output}")
+            if self._terminated(i, self.time_history[i], self.state_history[i]):
+                # Sample i is the final one. Copies, so that the full-length buffers are released
+                self.time_history = self.time_history[:i + 1].copy()
+                self.state_history = self.state_history[:i + 1].copy()
+                self.control_history = self.control_history[:i].copy()
+                break
+            self.control_history[i, :] = self._step(current_time)
 
-            # 2. Apply control and step the system
-            self.system.step(self.dt, control_input)
-
-            # 3. Store results
+            # Store results
             self.state_history[i + 1, :] = self.system.get_state()
             self.time_history[i + 1] = current_time + self.dt
 
+            if self.adaptation_logger is not None and i + 1 - self._num_logged >= self.chunk_size:
+                self._log_estimates(i + 1)
+
+            if live is not None and i + 1 - published >= live.block_size:
+                live.publish_many(self.time_history[published:i + 1], self.state_history[published:i + 1],
+                                  self.control_history[published:i + 1])
+                published = i + 1
+
+        if live is not None:
+            live.publish_many(self.time_history[published:-1], self.state_history[published:-1],
+                              self.control_history[published:])
+            live.publish(self.time_history[-1], self.state_history[-1], None)
+            live.close()
+
+    def _log_estimates(self, stop: int):
+        """Hands the estimates of the samples up to stop (exclusive) to adaptation_logger."""
+        if self.adaptation_logger is not None and stop > self._num_logged:
+            estimates = self.system.split_state(self.state_history[self._num_logged:stop])[1]
+            self.adaptation_logger.log_many(self.time_history[self._num_logged:stop], estimates)
+            self._num_logged = stop
+
+    def _reset_termination(self):
+        for condition in self.termination:
+            condition.reset(1)
+        self.termination_time = None
+        self.termination_reason = None
+
+    def _terminated(self, i: int, t: float, state: np.ndarray) -> bool:
+        """Checks the termination conditions at sample i; records the reason if one holds."""
+        if not self.termination or i % self.termination_interval != 0:
+            return False
+        terminated, condition_index = check_termination(self.termination, t, state[None, :], self.system)
+        if not terminated[0]:
+            return False
+        self.termination_time = t
+        self.termination_reason = self.termination[condition_index[0]].name
+        return True
+
+    def _evaluate_metrics(self):
+        """Evaluates the metrics on the stored histories."""
+        if self.metrics:
+            self.metric_values = evaluate_metrics(self.metrics, self.time_history, self.state_history,
+                                                  self.control_history, self.system, self.chunk_size)
+
+    def _run_streaming(self, progress: bool = True):
+        """Runs the simulation loop and streams the histories to self.history_sink and the metrics."""
+        state_dim = self.system.get_state().shape[0]
+        writers = []
+        if self.history_sink is not None:
+            writers.append(ChunkedHistoryWriter(self.history_sink, self.num_steps, state_dim,
+                                                chunk_size=self.chunk_size, decimation=self.decimation))
+        if self.metrics:
+            # Metrics see every sample, whatever the decimation of the stored history
+            writers.append(ChunkedHistoryWriter(MetricsSink(self.metrics, self.system), self.num_steps,
+                                                state_dim, chunk_size=self.chunk_size))
+        logger = self.adaptation_logger
+        if logger is not None:
+            estimate_sink = CallbackSink(lambda times, states, controls:
+                                         logger.log_many(times, self.system.split_state(states)[1]))
+            writers.append(ChunkedHistoryWriter(estimate_sink, self.num_steps, state_dim, chunk_size=self.chunk_size))
+        # Same grid as np.linspace(0, dt * num_steps, num_steps + 1), without storing it
+        time_step = (self.dt * self.num_steps) / self.num_steps if self.num_steps > 0 else 0.0
+
+        step_range = range(self.num_steps)
+        if progress and 'tqdm' in globals():
+            step_range = tqdm(step_range, desc="Simulation Progress", leave=False)
+
+        live = self.live
+        if live is not None:
+            live.open(time_step * self.num_steps, state_dim)
+        self._reset_termination()
+
+        try:
+            sample_time = 0.0
+            final_index = self.num_steps
+            for i in step_range:
+                current_time = i * time_step
+                if self._terminated(i, sample_time, self.system.get_state()):
+                    final_index = i
+                    break
+                state = self.system.get_state().copy()
+                control_vector = self._step(current_time)
+                for writer in writers:
+                    writer.append(i, sample_time, state, control_vector)
+                if live is not None:
+                    live.publish(sample_time, state, control_vector)
+                sample_time = current_time + self.dt
+            for writer in writers:
+                writer.append(final_index, sample_time, self.system.get_state(), None, final=True)
+            if live is not None:
+                live.publish(sample_time, self.system.get_state(), None)
+        finally:
+            for writer in writers:
+                writer.close()
+            if logger is not None:
+                logger.close()
+            if live is not None:
+                live.close()
+
     def plot_results(self):
         """Plots the simulation results."""
+        if self.state_history is None:
+            raise ValueError("Histories were not kept in memory (history_sink or store_history=False); "
+                             "load them from the sink to plot.")
+        state_history, system = self.state_history, self.system
+        if isinstance(system, AdaptiveSystem):
+            # The estimates are extra state columns; the Plotter shows the plant only
+            state_history, system = system.split_state(state_history)[0], system.plant
         # Pass the entire control history (value and index) to the Plotter.
         # Note: Plotter class must be updated to handle the 2D control_history array.
         plotter = Plotter(
             self.time_history, 
-            self.state_history, 
+            state_history, 
             self.control_history, # Pass the combined [control_value, controller_index] history
-            self.system
+            system
             # Removed separate index argument
         )
         plotter.plot_results()
 
     def get_results(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
         """Returns the simulation results (time, state, control_vector)."""
+        if self.state_history is None:
+            raise ValueError("Histories were streamed to history_sink (or not stored) and are not kept in memory.")
         return self.time_history, self.state_history, self.control_history
 
+    def get_metrics(self) -> dict[str, float]:
+        """Returns the value of every metric of the last run, by metric name."""
+        if self.metric_values is not None:
+            return dict(self.metric_values)
+        return {metric.name: float(metric.result()[0]) for metric in self.metrics}
+
     @classmethod
     def run_multiple(
         cls,
@@ -96,7 +489,12 @@ class Simulator:
         controller_class: typing.Type[Controller],
         controller_args: dict,
         dt: float,
-        num_steps: int
+        num_steps: int,
+        batched: bool = True,
+        integrator: str | None = None,
+        workers: int | None = None,
+        chunk_size: int | None = None,
+        cache: SimulationCache | str | None = None
     ) -> list[tuple[np.ndarray, np.ndarray]]:
         """
         Runs multiple simulations for a list of initial states.
@@ -112,23 +510,112 @@ class Simulator:
             controller_args: Dictionary of arguments to pass to the controller constructor.
             dt: Simulation time step.
             num_steps: Total number of simulation steps for each trajectory.
+            batched: If True and the controller implements compute_control_batch,
+                     all initial states are stepped together by EnsembleSimulator.
+                     Otherwise each initial state is simulated separately. Default: True.
+            integrator: Name of the integration scheme (see integrators.INTEGRATORS).
+                        Default: None (explicit Euler).
+            workers: Number of worker processes. If greater than 1, chunks of initial states
+                     are simulated in a process pool (see parallel.py). Default: None (this process).
+            chunk_size: Number of initial states per chunk when workers > 1.
+                        Default: None (about four chunks per worker).
+            cache: Optional SimulationCache (or its directory). The histories are looked up
+                   by a hash of the classes, their arguments, dt, num_steps, batched,
+                   integrator and the initial states; workers and chunk_size do not
+                   change the result and are not part of the key.
 
         Returns:
             A list of tuples, where each tuple contains (time_history, state_history)
             for one simulation run.
         """
-        results_list = []
         print(f"Running {len(initial_states_list)} simulations...")
+        if len(initial_states_list) == 0:
+            print("0 simulations finished.")
+            return []
+
+        for i, initial_state in enumerate(initial_states_list):
+            if not isinstance(initial_state, np.ndarray) or initial_state.ndim != 1:
+                raise ValueError(f"Element {i} in initial_states_list is not a 1D NumPy array.")
+        if len({initial_state.shape for initial_state in initial_states_list}) != 1:
+            raise ValueError("All initial states in initial_states_list must have the same shape.")
+        initial_states = np.asarray(initial_states_list, dtype=float)
+
+        simulate_args = (system_class, system_args, controller_class, controller_args, dt, num_steps, batched, integrator)
+
+        cache = get_cache(cache)
+        cache_key = None
+        if cache is not None:
+            try:
+                cache_key = make_key("Simulator.run_multiple", cls, initial_states, *simulate_args)
+            except UncacheableError:
+                cache_key = None
+        entry = cache.get(cache_key) if cache_key is not None else None
+
+        if entry is not None:
+            time_hist, state_hist = entry['time_history'], entry['state_history']
+        else:
+            if workers is not None and workers > 1 and len(initial_states) > 1:
+                time_hist, state_hist = run_chunks_parallel(
+                    cls._simulate_states, initial_states, num_steps, workers, chunk_size, simulate_args)
+            else:
+                time_hist, state_hist = cls._simulate_states(initial_states, *simulate_args)
+            if cache_key is not None:
+                cache.put(cache_key, time_history=time_hist, state_history=state_hist)
+
+        results_list = [(time_hist, state_hist[i]) for i in range(len(initial_states))]
+        print(f"{len(initial_states_list)} simulations finished.")
+        return results_list
+
+    @classmethod
+    def _simulate_states(
+        cls,
+        initial_states: np.ndarray,
+        system_class: typing.Type[System],
+        system_args: dict,
+        controller_class: typing.Type[Controller],
+        controller_args: dict,
+        dt: float,
+        num_steps: int,
+        batched: bool = True,
+        integrator: str | None = None,
+        progress: bool = True
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Simulates every row of initial_states (shape (N, state_dim)) in this process.
+        Arguments are as in run_multiple; progress toggles the tqdm bars.
+
+        Returns:
+            Tuple (time_history, state_history) with state_history of shape (N, num_steps + 1, state_dim).
+        """
+        # --- Vectorized path: one system/controller, all states as an (N, state_dim) array ---
+        if batched and system_class.__name__ != 'LightHouseKeeper' \
+                and controller_class.compute_control_batch is not Controller.compute_control_batch:
+            current_system_args = system_args.copy()
+            current_system_args['initial_state'] = initial_states[0]
+            system = system_class(**current_system_args)
+            controller = controller_class(**controller_args)
+
+            ensemble = EnsembleSimulator(
+                system=system,
+                controller=controller,
+                initial_states=initial_states,
+                dt=dt,
+                num_steps=num_steps,
+                integrator=integrator
+            )
+            ensemble.run(progress=progress)
+            time_hist, state_hist, _ = ensemble.get_results()
+            return time_hist, state_hist
+
+        state_history = np.zeros((initial_states.shape[0], num_steps + 1, initial_states.shape[1]))
 
         # Use tqdm for the outer loop if available
-        outer_loop_range = range(len(initial_states_list))
-        if 'tqdm' in globals():
+        outer_loop_range = range(len(initial_states))
+        if progress and 'tqdm' in globals():
              outer_loop_range = tqdm(outer_loop_range, desc="Overall Progress")
 
         for i in outer_loop_range:
-            initial_state = initial_states_list[i]
-            if not isinstance(initial_state, np.ndarray) or initial_state.ndim != 1:
-                raise ValueError(f"Element {i} in initial_states_list is not a 1D NumPy array.")
+            initial_state = initial_states[i]
 
             # Prepare arguments for system constructor
             current_system_args = system_args.copy()
@@ -155,15 +642,13 @@ class Simulator:
                 system=system,
                 controller=controller,
                 dt=dt,
-                num_steps=num_steps
+                num_steps=num_steps,
+                integrator=integrator
             )
 
-            # Run the individual simulation (no progress bar here)
-            simulation.run() # Consider adding a quiet mode to sim.run()
-            # Get results, control_history now contains vectors
+            # Run the individual simulation
+            simulation.run(progress=progress)
             time_hist, state_hist, _ = simulation.get_results()
+            state_history[i] = state_hist
 
-            results_list.append((time_hist, state_hist))
-
-        print(f"{len(initial_states_list)} simulations finished.")
-        return results_list 
\ No newline at end of file
+        return time_hist, state_history
@@ -0,0 +1,160 @@
+import itertools
+import typing
+import numpy as np
+from tqdm import tqdm # Optional: for progress bar
+
+from .system import System
+from .controller import Controller
+from .controller_adaptive import AdaptiveControllerBase, AdaptiveSystem
+from .ensemble import EnsembleSimulator
+from .integrators import Integrator
+from .metrics import Metric, default_metrics
+from .termination import TerminationCondition
+
+# Parameter sets are dicts of equally long 1D arrays, one entry per parameter combination
+ParameterSet = dict[str, np.ndarray]
+
+def grid(**values: typing.Sequence[float]) -> ParameterSet:
+    """
+    Full factorial grid, e.g. grid(alpha=[0.01, 0.1], max_torque=[0.5, 1.0]) gives 4 combinations
+    (the last parameter varies fastest).
+    """
+    names = list(values)
+    combinations = list(itertools.product(*(np.asarray(values[name], dtype=float) for name in names)))
+    columns = np.array(combinations, dtype=float).reshape(len(combinations), len(names))
+    return {name: columns[:, k] for k, name in enumerate(names)}
+
+def _scale(unit_samples: np.ndarray, bounds: dict[str, tuple[float, float]]) -> ParameterSet:
+    """Maps samples from the unit cube to the parameter bounds."""
+    return {name: low + unit_samples[:, k] * (high - low) for k, (name, (low, high)) in enumerate(bounds.items())}
+
+def latin_hypercube(bounds: dict[str, tuple[float, float]], num_samples: int, seed: int | None = None) -> ParameterSet:
+    """
+    Latin hypercube sample: every parameter range is split into num_samples equal strata
+    and every stratum is used exactly once per parameter.
+
+    Args:
+        bounds: (low, high) of every parameter.
+        num_samples: Number of parameter combinations.
+        seed: Seed of the random generator.
+    """
+    rng = np.random.default_rng(seed)
+    strata = np.argsort(rng.random((num_samples, len(bounds))), axis=0)
+    unit_samples = (strata + rng.random((num_samples, len(bounds)))) / num_samples
+    return _scale(unit_samples, bounds)
+
+def sobol(bounds: dict[str, tuple[float, float]], num_samples: int, seed: int | None = None) -> ParameterSet:
+    """
+    Scrambled Sobol sequence (requires scipy). Use a power of two for num_samples to
+    keep the balance properties of the sequence.
+
+    Args:
+        bounds: (low, high) of every parameter.
+        num_samples: Number of parameter combinations.
+        seed: Seed of the scrambling.
+    """
+    try:
+        from scipy.stats import qmc
+    except ImportError as error:
+        raise ImportError("sobol() requires scipy; use latin_hypercube() instead.") from error
+    return _scale(qmc.Sobol(d=len(bounds), scramble=True, seed=seed).random(num_samples), bounds)
+
+def run_sweep(
+    system: System,
+    controller_factory: typing.Callable[..., Controller],
+    parameters: ParameterSet,
+    initial_states: np.ndarray,
+    dt: float,
+    num_steps: int,
+    metrics: list[Metric] | None = None,
+    vectorized: bool = True,
+    batch_size: int = 4096,
+    integrator: Integrator | str | None = None,
+    termination: list[TerminationCondition] | None = None,
+    progress: bool = True
+) -> np.ndarray:
+    """
+    Simulates every parameter combination from every initial state and reduces each
+    run to its metrics while it is simulated (no histories are stored).
+
+    Args:
+        system: The plant (e.g. Pendulum). Used only as the model. For adaptive
+                controllers it is wrapped into an AdaptiveSystem automatically.
+        controller_factory: Builds a controller from keyword arguments named like the
+                            parameters, e.g. lambda alpha, max_torque: AdaptiveController(max_torque, alpha).
+                            Must return a controller with compute_control_batch.
+        parameters: Parameter combinations (see grid, latin_hypercube, sobol).
+        initial_states: Initial plant states, shape (S, state_dim) or (state_dim,).
+        dt: Simulation time step.
+        num_steps: Number of simulation steps of every run.
+        metrics: Metrics of every run (see metrics.py). Default: metrics.default_metrics().
+        vectorized: If True, the factory receives arrays with one value per run and
+                    up to batch_size runs (of different parameters) are simulated as one
+                    ensemble; the controller must accept per-trajectory parameters.
+                    If False, it receives scalars and every parameter combination is one
+                    ensemble over the initial states.
+        batch_size: Maximum number of runs per ensemble when vectorized.
+        integrator: Integration scheme (see integrators.INTEGRATORS). Default: None (explicit Euler).
+        termination: Optional termination conditions (see termination.py). Runs that meet
+                     one of them are dropped from their ensemble; the table then gets the
+                     fields 'termination_time' and 'termination_reason'.
+        progress: Show a tqdm progress bar over the ensembles.
+
+    Returns:
+        Structured array with one row per run (parameter combination major, initial
+        state minor) and the fields: the parameter names, 'initial_state' (index into
+        initial_states) and the metric names. pandas.DataFrame(table) converts it.
+    """
+    metrics = list(metrics) if metrics is not None else default_metrics()
+    initial_states = np.atleast_2d(np.asarray(initial_states, dtype=float))
+    names = list(parameters)
+    columns = [np.asarray(parameters[name], dtype=float) for name in names]
+    num_combinations = len(columns[0]) if columns else 1
+    if any(column.shape != (num_combinations,) for column in columns):
+        raise ValueError("All parameter arrays must be 1D and of equal length.")
+    num_states = initial_states.shape[0]
+    num_runs = num_combinations * num_states
+
+    fields = [(name, float) for name in names] + [('initial_state', np.int64)] + [(metric.name, float) for metric in metrics]
+    if termination:
+        fields += [('termination_time', float), ('termination_reason', 'U32')]
+    table = np.zeros(num_runs, dtype=fields)
+    run_index = np.arange(num_runs)
+    for k, name in enumerate(names):
+        table[name] = columns[k][run_index // num_states]
+    table['initial_state'] = run_index % num_states
+
+    # Runs of one ensemble: vectorized over parameters and states, or one combination at a time
+    if vectorized:
+        batches = [run_index[start:start + batch_size] for start in range(0, num_runs, batch_size)]
+    else:
+        batches = [run_index[c * num_states:(c + 1) * num_states] for c in range(num_combinations)]
+
+    batch_range = batches
+    if progress and 'tqdm' in globals():
+        batch_range = tqdm(batches, desc="Sweep Progress")
+
+    for runs in batch_range:
+        combination = runs // num_states
+        if vectorized:
+            kwargs = {name: columns[k][combination] for k, name in enumerate(names)}
+        else:
+            kwargs = {name: columns[k][combination[0]].item() for k, name in enumerate(names)}
+        controller = controller_factory(**kwargs)
+        states = initial_states[runs % num_states]
+        ensemble_system = system
+        if isinstance(controller, AdaptiveControllerBase):
+            # Initial estimates may be per-run arrays, so the ensemble states get them from augment
+            ensemble_system = AdaptiveSystem(system, controller, np.zeros(len(controller.estimate_names)))
+            states = ensemble_system.augment(states, controller.initial_estimate())
+        ensemble = EnsembleSimulator(ensemble_system, controller, states, dt, num_steps,
+                                     integrator=integrator, metrics=metrics, store_history=False,
+                                     termination=termination)
+        ensemble.run(progress=False)
+        for name, values in ensemble.get_metrics().items():
+            table[name][runs] = values
+        if termination:
+            table['termination_time'][runs] = ensemble.termination_times
+            table['termination_reason'][runs] = ensemble.termination_reasons
+
+    return table
@@ -1,7 +1,12 @@
 from abc import ABC, abstractmethod
 import numpy as np
+from .integrators import Integrator
 
 class System(ABC):
+    # State layout [positions, velocities, other states] for the symplectic integrators:
+    # number of positions, or None for a state of [positions, velocities] halves
+    num_positions: int | None = None
+
     @abstractmethod
     def get_state(self) -> np.ndarray:
         """Returns the current state vector."""
@@ -18,8 +23,31 @@ class System(ABC):
         pass
 
     @abstractmethod
-    def step(self, dt: float, control_input: float):
-        """Performs one simulation step using the Euler method."""
+    def get_state_derivative_batch(self, control_input: np.ndarray, states: np.ndarray, t: float | None = None) -> np.ndarray:
+        """
+        Computes the state derivatives for a batch of states.
+
+        Args:
+            control_input: Control inputs, shape (N,) or a scalar applied to all states.
+            states: Array of state vectors, shape (N, d).
+            t: Current time.
+
+        Returns:
+            Array of state derivatives, shape (N, d).
+        """
+        pass
+
+    @abstractmethod
+    def step(self, dt: float, control_input: float, integrator: Integrator | None = None, t: float = 0.0):
+        """
+        Performs one simulation step with the control input held constant.
+
+        Args:
+            dt: Time step.
+            control_input: Control input.
+            integrator: Integration scheme. If None, the explicit Euler method is used.
+            t: Time at the beginning of the step.
+        """
         pass
 
     @abstractmethod
@@ -59,4 +87,56 @@ class System(ABC):
         Returns:
             Total energy.
         """
-        pass 
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def get_kinetic_energy_batch(self, states: np.ndarray) -> np.ndarray:
+        """
+        Computes the kinetic energy for a batch of states.
+
+        Args:
+            states: Array of state vectors, shape (N, d).
+
+        Returns:
+            Kinetic energies, shape (N,).
+        """
+        pass
+
+    @abstractmethod
+    def get_potential_energy_batch(self, states: np.ndarray) -> np.ndarray:
+        """
+        Computes the potential energy for a batch of states.
+
+        Args:
+            states: Array of state vectors, shape (N, d).
+
+        Returns:
+            Potential energies, shape (N,).
+        """
+        pass
+
+    @abstractmethod
+    def get_energy_batch(self, states: np.ndarray) -> np.ndarray:
+        """
+        Computes the total energy for a batch of states.
+
+        Args:
+            states: Array of state vectors, shape (N, d).
+
+        Returns:
+            Total energies, shape (N,).
+        """
+        pass
+
+    def select(self, index: np.ndarray) -> 'System':
+        """
+        Returns the model for a subset of the trajectories of an ensemble. Used by
+        EnsembleSimulator to drop finished trajectories (see termination.py).
+
+        Args:
+            index: Indices of the kept trajectories among the current ones.
+
+        Returns:
+            Default: self (the model parameters are shared by all trajectories).
+        """
+        return self
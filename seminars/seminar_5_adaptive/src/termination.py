@@ -0,0 +1,149 @@
+from abc import ABC, abstractmethod
+import time
+import numpy as np
+from .system import System
+from .metrics import wrap_angle
+
+class TerminationCondition(ABC):
+    """
+    Predicate that ends a run (Simulator) or a single trajectory (EnsembleSimulator)
+    before num_steps. It is checked on the samples of the run, in time order; the
+    first sample for which it holds becomes the final sample of the trajectory.
+
+    Conditions with per-trajectory state keep it for all N trajectories of the run.
+    EnsembleSimulator passes only the trajectories that are still running, together
+    with their indices, so that the state can be updated in place.
+    """
+
+    # Reported as the termination reason
+    name: str = "terminated"
+
+    def reset(self, num_trajectories: int):
+        """Starts a run of num_trajectories trajectories. Called before the first check."""
+        self.num_trajectories = num_trajectories
+
+    @abstractmethod
+    def check(self, t: float, states: np.ndarray, system: System, index: np.ndarray | None = None) -> np.ndarray:
+        """
+        Checks the sample at time t.
+
+        Args:
+            t: Time of the sample.
+            states: States of the running trajectories, shape (n, state_dim).
+            system: The simulated system (model parameters, energies).
+            index: Trajectory indices of the rows of states, shape (n,). None: all N trajectories.
+
+        Returns:
+            Boolean array of shape (n,): True where the trajectory ends at this sample.
+        """
+        pass
+
+class Converged(TerminationCondition):
+    name = "converged"
+
+    def __init__(self, target_state: np.ndarray, tolerance: float | np.ndarray = 0.01,
+                 hold_time: float = 1.0, wrap: bool = True):
+        """
+        Ends a trajectory once it has stayed within tolerance of target_state (every
+        component, angle difference modulo 2*pi if wrap) for hold_time seconds.
+
+        Args:
+            target_state: Target state, e.g. [pi, 0].
+            tolerance: Tolerance per component (scalar or array like target_state).
+            hold_time: Time the state has to stay within the tolerance (s).
+            wrap: Treat the first component as an angle.
+        """
+        self.target_state = np.asarray(target_state, dtype=float)
+        self.tolerance = tolerance
+        self.hold_time = hold_time
+        self.wrap = wrap
+
+    def reset(self, num_trajectories: int):
+        super().reset(num_trajectories)
+        # Time the trajectory last entered the tolerance band, NaN while it is outside
+        self._entered = np.full(num_trajectories, np.nan)
+
+    def check(self, t, states, system, index=None):
+        rows = slice(None) if index is None else index
+        error = states[:, :len(self.target_state)] - self.target_state
+        if self.wrap:
+            error[:, 0] = wrap_angle(error[:, 0])
+        inside = np.all(np.abs(error) <= self.tolerance, axis=1)
+        entered = self._entered[rows]
+        entered = np.where(inside, np.where(np.isnan(entered), t, entered), np.nan)
+        self._entered[rows] = entered
+        return inside & (t - entered >= self.hold_time)
+
+class Diverged(TerminationCondition):
+    name = "diverged"
+
+    def __init__(self, max_abs_state: float | np.ndarray = 1e6):
+        """
+        Ends a trajectory whose state is not finite (NaN or inf) or leaves the box
+        |state| <= max_abs_state.
+
+        Args:
+            max_abs_state: Bound per component (scalar or array of shape (state_dim,)).
+                           Use np.inf for a component (e.g. an unwrapped angle) without a bound.
+        """
+        self.max_abs_state = max_abs_state
+
+    def check(self, t, states, system, index=None):
+        # NaN compares False, so ~(|x| <= bound) catches it together with the bound
+        return ~np.all(np.abs(states) <= self.max_abs_state, axis=1)
+
+class EnergyBlowUp(TerminationCondition):
+    name = "energy_blow_up"
+
+    def __init__(self, factor: float = 10.0, max_energy: float | None = None):
+        """
+        Ends a trajectory whose total energy exceeds max_energy, by default
+        factor * |E_des| (requires system.get_desired_energy). A non-finite energy
+        counts as a blow-up.
+
+        Args:
+            factor: Multiple of the desired energy used when max_energy is None.
+            max_energy: Absolute energy bound.
+        """
+        self.factor = factor
+        self.max_energy = max_energy
+
+    def check(self, t, states, system, index=None):
+        max_energy = self.max_energy
+        if max_energy is None:
+            max_energy = self.factor * abs(system.get_desired_energy())
+        return ~(system.get_energy_batch(states) <= max_energy)
+
+class WallClockBudget(TerminationCondition):
+    name = "wall_clock_budget"
+
+    def __init__(self, seconds: float):
+        """
+        Ends all trajectories once the run has taken seconds of wall-clock time
+        (measured from reset, i.e. the start of the run).
+
+        Args:
+            seconds: Wall-clock budget (s).
+        """
+        self.seconds = seconds
+
+    def reset(self, num_trajectories: int):
+        super().reset(num_trajectories)
+        self._start = time.perf_counter()
+
+    def check(self, t, states, system, index=None):
+        return np.full(states.shape[0], time.perf_counter() - self._start > self.seconds)
+
+def check_termination(conditions: list[TerminationCondition], t: float, states: np.ndarray, system: System,
+                      index: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Checks all conditions (every one of them, so that their state stays current).
+
+    Returns:
+        Tuple (terminated, reason): a boolean array of shape (n,) and the position in
+        conditions of the first condition that holds (-1 where none does).
+    """
+    reason = np.full(states.shape[0], -1)
+    for k, condition in reversed(list(enumerate(conditions))):
+        reason[condition.check(t, states, system, index)] = k
+    return reason >= 0, reason
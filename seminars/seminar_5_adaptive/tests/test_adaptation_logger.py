@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+from src.adaptation_logger import AdaptationLogger, load_adaptation_log
+
+def test_log_rejects_wrong_number_of_values(tmp_path):
+    prefix = str(tmp_path / "log")
+    with AdaptationLogger(prefix, fields=("a", "b"), capacity=4) as logger:
+        logger.log(0.0, 1.0, 2.0)
+        with pytest.raises(ValueError):
+            logger.log(0.1, 1.0)
+        with pytest.raises(ValueError):
+            logger.log(0.2, 1.0, 2.0, 3.0)
+        with pytest.raises(ValueError):
+            logger.log_many([0.3, 0.4], [1.0, 2.0])
+        logger.log(0.5, 3.0, 4.0)
+    _, samples = load_adaptation_log(prefix)
+    np.testing.assert_array_equal(samples['t'], [0.0, 0.5])
+    np.testing.assert_array_equal(samples['b'], [2.0, 4.0])
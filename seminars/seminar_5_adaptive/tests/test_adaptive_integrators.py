@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from src.pendulum import Pendulum
+from src.controller_adaptive import AdaptiveController, AdaptiveSystem
+from src.integrators import INTEGRATORS, get_integrator
+from src.simulator import Simulator
+from src.ensemble import EnsembleSimulator
+
+def make_system():
+    controller = AdaptiveController(0.3, 0.5)
+    plant = Pendulum(damping=0.1, initial_state=np.array([0.1, 0.0]))
+    return AdaptiveSystem(plant, controller), controller
+
+def reference_history(dt, num_steps):
+    system, controller = make_system()
+    simulator = Simulator(system, controller, dt / 10, num_steps * 10, integrator='rk4')
+    simulator.run(progress=False)
+    return simulator.get_results()[1][::10]
+
+@pytest.mark.parametrize("name", sorted(INTEGRATORS))
+def test_adaptive_system_runs_with_every_integrator(name):
+    dt, num_steps = 0.01, 300
+    system, controller = make_system()
+    simulator = Simulator(system, controller, dt, num_steps, integrator=name)
+    simulator.run(progress=False)
+    _, state_history, _ = simulator.get_results()
+    assert state_history.shape == (num_steps + 1, 3)
+    # Plant and estimate follow a fine RK4 solution (first-order schemes less closely)
+    np.testing.assert_allclose(state_history, reference_history(dt, num_steps), atol=5e-3)
+
+@pytest.mark.parametrize("name", sorted(INTEGRATORS))
+def test_ensemble_matches_simulator_for_every_integrator(name):
+    dt, num_steps = 0.01, 100
+    system, controller = make_system()
+    ensemble = EnsembleSimulator(system, controller, system.augment(np.array([[0.1, 0.0], [1.0, 0.0]])),
+                                 dt, num_steps, integrator=name)
+    ensemble.run(progress=False)
+    simulator = Simulator(system, controller, dt, num_steps, integrator=name)
+    simulator.run(progress=False)
+    np.testing.assert_allclose(ensemble.get_results()[1][0], simulator.get_results()[1], rtol=1e-9, atol=1e-12)
+
+@pytest.mark.parametrize("name", ["semi_implicit_euler", "verlet"])
+def test_symplectic_schemes_reject_odd_states_without_layout(name):
+    integrator = get_integrator(name)
+    with pytest.raises(ValueError):
+        integrator.step(lambda t, s: -s, 0.0, np.ones(3), 0.01)